@@ -6,8 +6,10 @@ from tkinter import ttk, messagebox
 from datetime import datetime
 from utils import getPath, centerWindow
 from ui_components import Colors, PrimaryButton, IconButton
-from create_paper import CreatePaper
+from create_paper import CreatePaper, PasswordDialog
 from cloud_export import CloudPublishUI
+from job_runner import run_with_progress
+from workspace_rotation import rotate_workspace
 
 class AdminPanel(ctk.CTkToplevel):
     def __init__(self, subject_db):
@@ -239,6 +241,11 @@ class AdminPanel(ctk.CTkToplevel):
                  command=lambda p=user[2]: self._load_workspace(p))
         file_btn.pack(side="left", padx=5)
         file_btn.configure(text="📂")
+
+        rotate_btn = IconButton(btn_frame,
+                 command=lambda p=user[2]: self._rotate_workspace(p))
+        rotate_btn.pack(side="left", padx=5)
+        rotate_btn.configure(text="🔑")
         
         delete_btn = IconButton(btn_frame, 
                  command=lambda u=user: self._delete_user(u[0]))
@@ -265,6 +272,40 @@ class AdminPanel(ctk.CTkToplevel):
             except sqlite3.Error as e:
                 messagebox.showerror("Database Error", str(e))
 
+    def _rotate_workspace(self, path):
+        if not os.path.isdir(path):
+            messagebox.showerror("Workspace Missing", f"Workspace folder not found:\n{path}")
+            return
+
+        current = PasswordDialog(self, mode="decrypt")
+        self.wait_window(current)
+        if not current.password:
+            return
+
+        new = PasswordDialog(self, mode="encrypt")
+        self.wait_window(new)
+        if not new.password and not messagebox.askyesno(
+                "Re-key Workspace",
+                "No new passcode was set.\nRe-encrypt every paper with the current passcode and this machine's key settings?"):
+            return
+
+        self._set_status(f"Rotating workspace: {path}")
+        run_with_progress(
+            self, lambda job: rotate_workspace(path, current.password, new.password, progress=job.report),
+            title="Rotating Passcodes", message="Re-encrypting workspace papers...",
+            on_done=self._on_workspace_rotated,
+            on_error=lambda e: (self._set_status("Workspace rotation failed"), messagebox.showerror("Rotation Failed", str(e))),
+            on_cancel=lambda: self._set_status("Workspace rotation cancelled")
+        )
+
+    def _on_workspace_rotated(self, report):
+        counts = report.counts()
+        self._set_status(f"Rotated {counts['rotated']} papers, {counts['failed']} failed")
+        if report.failures:
+            messagebox.showwarning("Rotation Finished With Errors", report.summary())
+        else:
+            messagebox.showinfo("Rotation Complete", report.summary())
+
     def _load_workspace(self, path):
         self.tab_view.set("📁 Workspaces")
         self._set_status(f"Loading workspace: {path}")
@@ -0,0 +1,24 @@
+# ==========================================================
+#  * Package : brainy_core - Brainy Studio Core Library
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Everything the app does to a paper, with no tkinter or
+#      customtkinter import anywhere in the package: the paper
+#      model, file serialization, encryption, exam packaging
+#      and result aggregation. The CTk pages, the command line
+#      and worker processes all call into this package.
+#
+#        model         : Question, Paper, validation, totals
+#        serialization : .enc papers, Excel banks, bank import
+#        crypto        : container format, KDFs, key cache
+#        packaging     : PDF papers and cloud exam packages
+#        results       : cloud exam results and workbooks
+#        dedup         : near-duplicate question detection
+#        assembly      : random papers drawn to a blueprint
+#        roster        : per-student shuffled PDF sets
+# ==========================================================
+
+from .crypto import InvalidPasscode, PaperCryptoError, PaperTampered
+from .model import Paper, Question, QUESTION_TYPES, total_duration, total_marks, validate_paper, validate_question
+from .serialization import load_paper, save_paper
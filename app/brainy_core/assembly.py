@@ -0,0 +1,247 @@
+# ==========================================================
+#  * Module : brainy_core/assembly.py - Random Paper Assembly
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Draws papers from the question bank to a blueprint:
+#      how many questions of each type, the total marks, a
+#      minimum count per tag and a difficulty mix. The bank
+#      has no difficulty column, so difficulty is read from
+#      the easy / medium / hard tags.
+#
+#      Each attempt is greedy: tag quotas are filled first,
+#      scarcest tag first, the type counts are topped up at
+#      random, then same-type swaps walk the total towards the
+#      target marks without breaking a quota. An attempt that
+#      gets stuck is thrown away and retried with fresh random
+#      choices. Candidates are plain tuples, so nothing here
+#      touches the database.
+# ==========================================================
+
+import random
+from dataclasses import dataclass, field
+
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+ATTEMPTS = 25
+PROBES = 64
+REPAIR_ROUNDS = 40
+
+
+class BlueprintError(ValueError):
+    pass
+
+
+@dataclass
+class Blueprint:
+    # ** Question type -> how many questions of that type
+    types: dict
+    total_marks: int = None
+    # ** Tag -> minimum number of questions carrying it
+    tags: dict = field(default_factory=dict)
+    # ** easy / medium / hard -> share of the paper, 0 to 1
+    difficulty: dict = field(default_factory=dict)
+    exclude_recent_days: int = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        try:
+            return cls(
+                types={q_type: int(count) for q_type, count in data.get("types", {}).items() if int(count)},
+                total_marks=int(data["total_marks"]) if data.get("total_marks") not in (None, "") else None,
+                tags={tag.strip().casefold(): int(count) for tag, count in data.get("tags", {}).items() if int(count)},
+                difficulty={level.casefold(): float(share) for level, share in data.get("difficulty", {}).items()
+                            if float(share)},
+                exclude_recent_days=int(data.get("exclude_recent_days") or 0),
+            )
+        except (TypeError, ValueError, AttributeError) as e:
+            raise BlueprintError(f"Invalid blueprint: {e}")
+
+    def to_dict(self):
+        return {"types": dict(self.types), "total_marks": self.total_marks, "tags": dict(self.tags),
+                "difficulty": dict(self.difficulty), "exclude_recent_days": self.exclude_recent_days}
+
+    @property
+    def question_count(self):
+        return sum(self.types.values())
+
+    def quotas(self):
+        # ** Tag quotas and the difficulty mix as one tag -> minimum count map; shares round by largest remainder
+        count = self.question_count
+        shares = {level: share * count for level, share in self.difficulty.items()}
+        counts = {level: int(exact) for level, exact in shares.items()}
+        spare = round(sum(shares.values())) - sum(counts.values())
+        for level in sorted(shares, key=lambda level: shares[level] - counts[level], reverse=True)[:max(spare, 0)]:
+            counts[level] += 1
+
+        quotas = dict(self.tags)
+        for level, minimum in counts.items():
+            quotas[level] = max(quotas.get(level, 0), minimum)
+        return {tag: minimum for tag, minimum in quotas.items() if minimum > 0}
+
+    def validate(self):
+        if not self.types or self.question_count <= 0:
+            raise BlueprintError("The blueprint asks for no questions")
+        if any(count < 0 for count in self.types.values()) or any(count < 0 for count in self.tags.values()):
+            raise BlueprintError("Question counts cannot be negative")
+        unknown = set(self.difficulty) - set(DIFFICULTY_LEVELS)
+        if unknown:
+            raise BlueprintError(f"Unknown difficulty level {', '.join(sorted(unknown))}")
+        if any(share < 0 for share in self.difficulty.values()) or sum(self.difficulty.values()) > 1.0001:
+            raise BlueprintError("The difficulty shares must be positive and add up to at most 100%")
+        if self.total_marks is not None and self.total_marks <= 0:
+            raise BlueprintError("Total marks must be positive")
+        for tag, minimum in self.tags.items():
+            if minimum > self.question_count:
+                raise BlueprintError(f"Tag {tag} needs {minimum} questions but the paper only has {self.question_count}")
+
+
+class _Pool:
+    # ** Candidates are (question_id, question_type, marks, tags) with tags a set of casefolded names
+    def __init__(self, candidates, blueprint, quotas):
+        self.by_type = {q_type: [] for q_type in blueprint.types}
+        self.by_tag = {tag: [] for tag in quotas}
+        self.by_type_marks = {}
+        for candidate in candidates:
+            question_id, q_type, marks, tags = candidate
+            if q_type not in self.by_type:
+                continue
+            self.by_type[q_type].append(candidate)
+            self.by_type_marks.setdefault((q_type, marks), []).append(candidate)
+            for tag in tags & self.by_tag.keys():
+                self.by_tag[tag].append(candidate)
+        self.marks_by_type = {q_type: sorted({marks for t, marks in self.by_type_marks if t == q_type})
+                              for q_type in self.by_type}
+
+    def check(self, blueprint, quotas):
+        for q_type, count in blueprint.types.items():
+            if len(self.by_type[q_type]) < count:
+                raise BlueprintError(f"The bank has {len(self.by_type[q_type])} usable {q_type} questions, "
+                                     f"the blueprint needs {count}")
+        for tag, minimum in quotas.items():
+            usable = sum(1 for candidate in self.by_tag[tag] if blueprint.types.get(candidate[1]))
+            if usable < minimum:
+                raise BlueprintError(f"The bank has {usable} usable questions tagged {tag}, the blueprint needs {minimum}")
+        if blueprint.total_marks is None:
+            return
+        # ** The lightest and heaviest papers the type counts allow bound the reachable totals
+        lowest = highest = 0
+        for q_type, count in blueprint.types.items():
+            marks = sorted(candidate[2] for candidate in self.by_type[q_type])
+            lowest += sum(marks[:count])
+            highest += sum(marks[-count:]) if count else 0
+        if not lowest <= blueprint.total_marks <= highest:
+            raise BlueprintError(f"Total marks must be between {lowest} and {highest} for these question counts")
+
+
+def _probe(rng, candidates, accept, avoid):
+    # ** Random probes find a fit fast in a big pool; a full pass from a random start settles small or tight ones
+    if not candidates:
+        return None
+    for _ in range(PROBES):
+        candidate = candidates[rng.randrange(len(candidates))]
+        if candidate[0] not in avoid and accept(candidate):
+            return candidate
+    start = rng.randrange(len(candidates))
+    for offset in range(len(candidates)):
+        candidate = candidates[(start + offset) % len(candidates)]
+        if accept(candidate):
+            return candidate
+    return None
+
+
+def _attempt(pool, blueprint, quotas, rng, used):
+    chosen = {}
+    remaining = dict(blueprint.types)
+    have = dict.fromkeys(quotas, 0)
+
+    def take(candidate):
+        chosen[candidate[0]] = candidate
+        remaining[candidate[1]] -= 1
+        for tag in candidate[3] & have.keys():
+            have[tag] += 1
+
+    # ** Fill the tag quotas first, scarcest tag first, while every type still has room
+    for tag in sorted(quotas, key=lambda tag: len(pool.by_tag[tag])):
+        while have[tag] < quotas[tag]:
+            candidate = _probe(rng, pool.by_tag[tag],
+                               lambda c: c[0] not in chosen and remaining.get(c[1], 0) > 0, used)
+            if candidate is None:
+                return None
+            take(candidate)
+
+    for q_type, count in blueprint.types.items():
+        for _ in range(remaining[q_type]):
+            candidate = _probe(rng, pool.by_type[q_type], lambda c: c[0] not in chosen, used)
+            if candidate is None:
+                return None
+            take(candidate)
+
+    if blueprint.total_marks is not None and not _repair_marks(pool, blueprint, quotas, rng, chosen, have, used):
+        return None
+    return chosen
+
+
+def _repair_marks(pool, blueprint, quotas, rng, chosen, have, used):
+    total = sum(candidate[2] for candidate in chosen.values())
+    selected = list(chosen.values())
+    for _ in range(REPAIR_ROUNDS * len(selected)):
+        gap = blueprint.total_marks - total
+        if gap == 0:
+            return True
+        index = rng.randrange(len(selected))
+        out = selected[index]
+        # ** A tag at exactly its quota has to come back with the replacement
+        keep = {tag for tag in out[3] & have.keys() if have[tag] <= quotas[tag]}
+        wanted = out[2] + gap
+        marks_options = pool.marks_by_type[out[1]]
+        # ** Close the whole gap if that mark exists, otherwise the nearest step in the right direction
+        steps = [marks for marks in marks_options if marks != out[2] and (marks - out[2]) * gap > 0]
+        if not steps:
+            continue
+        marks = min(steps, key=lambda marks: abs(marks - wanted))
+        replacement = _probe(rng, pool.by_type_marks[(out[1], marks)],
+                             lambda c: c[0] not in chosen and keep <= c[3], used)
+        if replacement is None:
+            continue
+        del chosen[out[0]]
+        chosen[replacement[0]] = replacement
+        selected[index] = replacement
+        for tag in out[3] & have.keys():
+            have[tag] -= 1
+        for tag in replacement[3] & have.keys():
+            have[tag] += 1
+        total += replacement[2] - out[2]
+    return total == blueprint.total_marks
+
+
+def assemble(candidates, blueprint, variants=1, seed=None):
+    # ** Returns `variants` lists of question IDs, grouped by type in blueprint order; no two lists are the same set
+    blueprint.validate()
+    quotas = blueprint.quotas()
+    for tag, minimum in quotas.items():
+        if minimum > blueprint.question_count:
+            raise BlueprintError(f"{tag} needs {minimum} questions but the paper only has {blueprint.question_count}")
+
+    pool = _Pool(candidates, blueprint, quotas)
+    pool.check(blueprint, quotas)
+    rng = random.Random(seed)
+    type_order = {q_type: position for position, q_type in enumerate(blueprint.types)}
+
+    papers, seen, used = [], set(), set()
+    for _ in range(variants):
+        for _ in range(ATTEMPTS):
+            # ** Later variants steer away from questions earlier ones already used, when the bank allows
+            chosen = _attempt(pool, blueprint, quotas, rng, used)
+            if chosen is not None and frozenset(chosen) not in seen:
+                break
+        else:
+            raise BlueprintError(f"Could not fit a paper to this blueprint after {ATTEMPTS} attempts"
+                                 + (f" (variant {len(papers) + 1})" if papers else "")
+                                 + "; try relaxing the total marks or the quotas")
+        seen.add(frozenset(chosen))
+        used.update(chosen)
+        selection = list(chosen.values())
+        rng.shuffle(selection)
+        selection.sort(key=lambda candidate: type_order[candidate[1]])
+        papers.append([candidate[0] for candidate in selection])
+    return papers
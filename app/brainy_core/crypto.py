@@ -0,0 +1,636 @@
+# ==========================================================
+#  * Module : brainy_core/crypto.py - Paper Encryption
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Shared key derivation, encryption and decryption for
+#      .enc question papers. Derived keys are kept in a small
+#      in-process LRU cache so re-opening the same paper in
+#      the editor, PDF and Excel pages runs PBKDF2 only once.
+#
+#      .enc v2 container layout (big endian):
+#        prelude : magic "BSEC" | version (u8) | header length (u16)
+#        header  : cipher (u8) | kdf (u8) | kdf cost (u32) | salt (16) | iv (16)
+#                  | key check (16) | compression (u8)
+#                  | kdf memory (u32) | kdf lanes (u8)
+#        body    : [chunk length (u32) | ciphertext] ... | 0 (u32)
+#      New header fields are only ever appended, so readers use
+#      the header length to skip fields they do not know about.
+#      v1 files (base64 fields inside a JSON object) still read.
+#
+#      AES-GCM papers seal every chunk on its own. The nonce is
+#      the IV prefix plus the chunk index, and the header, index
+#      and a last-chunk flag are bound in as associated data, so
+#      edited, reordered or cut-off chunks fail their tag. The key
+#      check lets a wrong passcode be refused right after key
+#      derivation, before any ciphertext is read.
+#
+#      The JSON payload can be compressed (zlib, or zstd when the
+#      optional zstandard package is installed) before it is
+#      encrypted; the algorithm is recorded in the header.
+#
+#      Key derivation is PBKDF2-SHA256, scrypt or Argon2id (when
+#      the installed cryptography provides it). Its parameters
+#      travel in the header, so every paper re-derives with the
+#      cost it was written with:
+#        pbkdf2   : cost = iterations
+#        scrypt   : cost = N, memory = r, lanes = p
+#        argon2id : cost = passes, memory = KiB, lanes = lanes
+#      calibrate_kdf picks parameters that take about a target
+#      time on this machine; the result is saved once and then
+#      used for new papers. rekey_paper rewrites a paper with new
+#      parameters or a new passcode.
+#
+#      read_paper takes an optional progress(done, total) callback
+#      that is called with byte offsets as chunks are decrypted.
+#      A callback may raise to abandon the read part way through.
+# ==========================================================
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+from cryptography.hazmat.primitives import hashes, padding
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import InvalidKey, InvalidTag
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+except ImportError:
+    Argon2id = None
+
+KDF_ITERATIONS = 100000
+KEY_LENGTH = 32
+KEY_CACHE_SIZE = 16
+KEY_CACHE_TTL = 15 * 60
+
+MAGIC = b"BSEC"
+CONTAINER_VERSION = 2
+CHUNK_SIZE = 64 * 1024
+CIPHER_AES_CBC = 1
+CIPHER_AES_GCM = 2
+KDF_PBKDF2_SHA256 = 1
+KDF_SCRYPT = 2
+KDF_ARGON2ID = 3
+KDF_NAMES = {KDF_PBKDF2_SHA256: "pbkdf2-sha256", KDF_SCRYPT: "scrypt", KDF_ARGON2ID: "argon2id"}
+KDF_TARGET_SECONDS = 0.5
+KDF_MAX_MEMORY = 256 * 1024 * 1024
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+DEFAULT_COMPRESSION = COMPRESSION_ZLIB
+DEFAULT_COMPRESSION_LEVEL = 6
+
+_PRELUDE = struct.Struct(">4sBH")
+_HEADER_V2 = struct.Struct(">BBI16s16s")
+_KEY_CHECK = struct.Struct(">16s")
+_COMPRESSION = struct.Struct(">B")
+_KDF_MEMORY = struct.Struct(">I")
+_KDF_LANES = struct.Struct(">B")
+# ** Fields after the fixed v2 header, in file order; older papers simply stop early
+_APPENDED_FIELDS = (
+    ("key_check", _KEY_CHECK),
+    ("compression", _COMPRESSION),
+    ("kdf_memory", _KDF_MEMORY),
+    ("kdf_lanes", _KDF_LANES),
+)
+
+KdfParams = namedtuple("KdfParams", "kdf cost memory lanes")
+LEGACY_KDF = KdfParams(KDF_PBKDF2_SHA256, KDF_ITERATIONS, 0, 0)
+_CHUNK_LEN = struct.Struct(">I")
+_CHUNK_AAD = struct.Struct(">I?")
+
+
+class PaperCryptoError(ValueError):
+    pass
+
+
+class InvalidPasscode(PaperCryptoError):
+    pass
+
+
+class PaperTampered(PaperCryptoError):
+    pass
+
+
+class KeyCache:
+    def __init__(self, max_entries=KEY_CACHE_SIZE, ttl=KEY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # ** Per-process secret so the cache never holds a plain digest of the passcode
+        self._secret = os.urandom(32)
+
+    def _cache_key(self, password, salt, params):
+        digest = hmac.new(self._secret, password.encode(), hashlib.sha256).digest()
+        return (digest, bytes(salt), tuple(params))
+
+    @staticmethod
+    def _wipe(key):
+        for i in range(len(key)):
+            key[i] = 0
+
+    def get(self, password, salt, params):
+        cache_key = self._cache_key(password, salt, params)
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(cache_key)
+            return bytes(entry[0])
+
+    def put(self, password, salt, params, key):
+        cache_key = self._cache_key(password, salt, params)
+        with self._lock:
+            old = self._entries.pop(cache_key, None)
+            if old is not None:
+                self._wipe(old[0])
+            self._entries[cache_key] = (bytearray(key), time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._wipe(evicted)
+
+    def clear(self):
+        with self._lock:
+            for key, _ in self._entries.values():
+                self._wipe(key)
+            self._entries.clear()
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for k in expired:
+            self._wipe(self._entries.pop(k)[0])
+
+
+key_cache = KeyCache()
+
+
+def kdf_available(kdf):
+    if kdf == KDF_ARGON2ID:
+        return Argon2id is not None
+    return kdf in (KDF_PBKDF2_SHA256, KDF_SCRYPT)
+
+
+def _kdf_memory_bytes(params):
+    if params.kdf == KDF_SCRYPT:
+        return 128 * params.cost * params.memory * params.lanes
+    if params.kdf == KDF_ARGON2ID:
+        return params.memory * 1024
+    return 0
+
+
+def validate_kdf(params):
+    # ! Parameters come from the file header, so refuse anything that would hang or exhaust memory
+    if not kdf_available(params.kdf):
+        raise ValueError(f"Key derivation {KDF_NAMES.get(params.kdf, params.kdf)} is not available")
+    if _kdf_memory_bytes(params) > 4 * KDF_MAX_MEMORY:
+        raise ValueError("Key derivation parameters need too much memory")
+    if params.kdf == KDF_PBKDF2_SHA256 and not 1000 <= params.cost <= 100_000_000:
+        raise ValueError("PBKDF2 iteration count is out of range")
+    if params.kdf == KDF_SCRYPT:
+        if params.cost < 2 or params.cost & (params.cost - 1) or not params.memory or not params.lanes:
+            raise ValueError("scrypt parameters are invalid")
+    if params.kdf == KDF_ARGON2ID:
+        if not 1 <= params.cost <= 64 or not params.lanes or params.memory < 8 * params.lanes:
+            raise ValueError("Argon2id parameters are invalid")
+    return params
+
+
+def _derive(password, salt, params):
+    if params.kdf == KDF_SCRYPT:
+        kdf = Scrypt(salt=salt, length=KEY_LENGTH, n=params.cost, r=params.memory, p=params.lanes,
+                     backend=default_backend())
+    elif params.kdf == KDF_ARGON2ID:
+        kdf = Argon2id(salt=salt, length=KEY_LENGTH, iterations=params.cost, lanes=params.lanes,
+                       memory_cost=params.memory)
+    else:
+        # ! Credits ! Tech with tim & Neuraline YT
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=KEY_LENGTH,
+            salt=salt,
+            iterations=params.cost,
+            backend=default_backend()
+        )
+    return kdf.derive(password.encode())
+
+
+def derive_key(password, salt, params=LEGACY_KDF):
+    cached = key_cache.get(password, salt, params)
+    if cached is not None:
+        return cached
+
+    key = _derive(password, salt, params)
+    key_cache.put(password, salt, params, key)
+    return key
+
+
+def _time_kdf(params):
+    started = time.perf_counter()
+    _derive("calibration", os.urandom(16), params)
+    return time.perf_counter() - started
+
+
+def calibrate_kdf(kdf=None, target=KDF_TARGET_SECONDS):
+    if kdf is None:
+        kdf = KDF_ARGON2ID if kdf_available(KDF_ARGON2ID) else KDF_SCRYPT
+
+    if kdf == KDF_PBKDF2_SHA256:
+        params = KdfParams(kdf, 10_000, 0, 0)
+        elapsed = _time_kdf(params)
+        # ** Time a run long enough that timer noise does not skew the extrapolation
+        while elapsed < target / 4:
+            params = params._replace(cost=params.cost * 2)
+            elapsed = _time_kdf(params)
+        iterations = int(params.cost * target / elapsed) // 1000 * 1000
+        # ** Never calibrate below the count older papers were written with
+        return KdfParams(kdf, max(iterations, KDF_ITERATIONS), 0, 0)
+
+    if kdf == KDF_SCRYPT:
+        # ** N must be a power of two, so keep doubling until one more step would overshoot
+        params = KdfParams(kdf, 2 ** 14, 8, 1)
+        elapsed = _time_kdf(params)
+        while elapsed * 2 <= target:
+            bigger = params._replace(cost=params.cost * 2)
+            if _kdf_memory_bytes(bigger) > KDF_MAX_MEMORY:
+                break
+            params, elapsed = bigger, _time_kdf(bigger)
+        return params
+
+    if kdf == KDF_ARGON2ID:
+        lanes = max(1, min(4, os.cpu_count() or 1))
+        params = KdfParams(kdf, 1, 64 * 1024, lanes)
+        elapsed = _time_kdf(params)
+        # ** Slow machines trade memory for time, down to the 19 MiB floor OWASP recommends
+        while elapsed > target and params.memory > 19 * 1024:
+            params = params._replace(memory=max(19 * 1024, params.memory // 2))
+            elapsed = _time_kdf(params)
+        passes = max(1, min(64, int(target / elapsed)))
+        return params._replace(cost=passes)
+
+    raise ValueError(f"Unknown key derivation {kdf}")
+
+
+_default_kdf = LEGACY_KDF
+
+
+def default_kdf():
+    return _default_kdf
+
+
+def set_default_kdf(params):
+    global _default_kdf
+    _default_kdf = validate_kdf(params)
+
+
+def save_kdf_settings(path, params, target=KDF_TARGET_SECONDS):
+    settings = {
+        "kdf": KDF_NAMES[params.kdf],
+        "cost": params.cost,
+        "memory": params.memory,
+        "lanes": params.lanes,
+        "target_seconds": target,
+        "calibrated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(settings, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def load_kdf_settings(path):
+    try:
+        with open(path, "r") as f:
+            settings = json.load(f)
+        kdf = {name: kdf for kdf, name in KDF_NAMES.items()}[settings["kdf"]]
+        return validate_kdf(KdfParams(kdf, int(settings["cost"]), int(settings["memory"]), int(settings["lanes"])))
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+
+def ensure_kdf_calibrated(path, target=KDF_TARGET_SECONDS):
+    params = load_kdf_settings(path)
+    if params is None:
+        params = calibrate_kdf(target=target)
+        save_kdf_settings(path, params, target)
+    set_default_kdf(params)
+    return params
+
+
+def decrypt_data(encrypted_data, password):
+    # ! Credits ! Tech with tim & Neuraline YT
+    # ** v1 papers are only ever read; everything is written as a v2 container
+    try:
+        salt = base64.b64decode(encrypted_data['salt'])
+        iv = base64.b64decode(encrypted_data['iv'])
+        ciphertext = base64.b64decode(encrypted_data['ciphertext'])
+
+        key = derive_key(password, salt, LEGACY_KDF)
+        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
+        decryptor = cipher.decryptor()
+
+        plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+        pad_len = plaintext[-1]
+        return plaintext[:-pad_len].decode()
+    except (InvalidKey, ValueError, InvalidTag):
+        return None
+
+
+class PaperHeader:
+    def __init__(self, cipher, kdf, kdf_cost, salt, iv, key_check=b"", compression=COMPRESSION_NONE,
+                 kdf_memory=0, kdf_lanes=0):
+        self.cipher = cipher
+        self.kdf = kdf
+        self.kdf_cost = kdf_cost
+        self.salt = salt
+        self.iv = iv
+        self.key_check = key_check
+        self.compression = compression
+        self.kdf_memory = kdf_memory
+        self.kdf_lanes = kdf_lanes
+        self.raw = b""
+
+    @classmethod
+    def new(cls, cipher, kdf_params, compression=COMPRESSION_NONE):
+        return cls(cipher, kdf_params.kdf, kdf_params.cost, os.urandom(16), os.urandom(16),
+                   compression=compression, kdf_memory=kdf_params.memory, kdf_lanes=kdf_params.lanes)
+
+    @property
+    def kdf_params(self):
+        return KdfParams(self.kdf, self.kdf_cost, self.kdf_memory, self.kdf_lanes)
+
+    def pack(self):
+        header = _HEADER_V2.pack(self.cipher, self.kdf, self.kdf_cost, self.salt, self.iv)
+        for name, field in _APPENDED_FIELDS:
+            header += field.pack(getattr(self, name))
+        self.raw = _PRELUDE.pack(MAGIC, CONTAINER_VERSION, len(header)) + header
+        return self.raw
+
+    @classmethod
+    def read(cls, fp):
+        prelude = fp.read(_PRELUDE.size)
+        if len(prelude) < _PRELUDE.size or prelude[:len(MAGIC)] != MAGIC:
+            return None
+
+        _, version, header_len = _PRELUDE.unpack(prelude)
+        if version != CONTAINER_VERSION:
+            raise ValueError(f"Unsupported paper format version {version}")
+
+        body = fp.read(header_len)
+        if len(body) < header_len or header_len < _HEADER_V2.size:
+            raise ValueError("Paper header is truncated")
+
+        header = cls(*_HEADER_V2.unpack_from(body))
+        offset = _HEADER_V2.size
+        for name, field in _APPENDED_FIELDS:
+            if header_len < offset + field.size:
+                break
+            (value,) = field.unpack_from(body, offset)
+            setattr(header, name, value)
+            offset += field.size
+        if header.cipher not in (CIPHER_AES_CBC, CIPHER_AES_GCM):
+            raise ValueError("Paper uses an unsupported cipher")
+        validate_kdf(header.kdf_params)
+
+        header.raw = prelude + body
+        return header
+
+
+def _subkeys(key):
+    paper_key = hmac.new(key, b"brainy-studio/paper-key", hashlib.sha256).digest()
+    key_check = hmac.new(key, b"brainy-studio/key-check", hashlib.sha256).digest()[:_KEY_CHECK.size]
+    return paper_key, key_check
+
+
+def _chunk_nonce(iv, index):
+    return iv[:8] + struct.pack(">I", index)
+
+
+def _compressor(compression, level):
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compressobj(level)
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Unknown compression {compression}")
+
+
+def _decompressor(compression):
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompressobj()
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise ValueError("This paper is zstd compressed; install the zstandard package to open it")
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unknown compression {compression}")
+
+
+def _iter_compressed(chunks, compression, level):
+    if compression == COMPRESSION_NONE:
+        yield from chunks
+        return
+    compressor = _compressor(compression, level)
+    for chunk in chunks:
+        yield compressor.compress(chunk)
+    yield compressor.flush()
+
+
+def _iter_plaintext_chunks(pieces, size=CHUNK_SIZE):
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        data = piece.encode() if isinstance(piece, str) else piece
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _with_last_flag(chunks):
+    chunks = iter(chunks)
+    previous = next(chunks, b"")
+    for chunk in chunks:
+        yield previous, False
+        previous = chunk
+    yield previous, True
+
+
+def _write_chunk(fp, chunk):
+    if chunk:
+        fp.write(_CHUNK_LEN.pack(len(chunk)))
+        fp.write(chunk)
+
+
+def _read_chunk(fp):
+    raw = fp.read(_CHUNK_LEN.size)
+    if len(raw) < _CHUNK_LEN.size:
+        raise PaperTampered("Paper file is truncated")
+    (length,) = _CHUNK_LEN.unpack(raw)
+    if length == 0:
+        return None
+    chunk = fp.read(length)
+    if len(chunk) < length:
+        raise PaperTampered("Paper file is truncated")
+    return chunk
+
+
+def _iter_ciphertext_chunks(fp, progress=None):
+    total = os.fstat(fp.fileno()).st_size if progress else 0
+    chunk = _read_chunk(fp)
+    while chunk is not None:
+        following = _read_chunk(fp)
+        yield chunk, following is None
+        if progress:
+            progress(fp.tell(), total)
+        chunk = following
+
+
+def _check_passcode(header, password):
+    key = derive_key(password, header.salt, header.kdf_params)
+    if header.cipher != CIPHER_AES_GCM:
+        return key
+    paper_key, key_check = _subkeys(key)
+    if not hmac.compare_digest(key_check, header.key_check):
+        raise InvalidPasscode("Incorrect passcode")
+    return paper_key
+
+
+def verify_passcode(path, password):
+    with open(path, "rb") as fp:
+        header = PaperHeader.read(fp)
+    # ** Older papers carry no key check, so they can only be verified by decrypting them
+    if header is None or header.cipher != CIPHER_AES_GCM:
+        return None
+    try:
+        _check_passcode(header, password)
+        return True
+    except InvalidPasscode:
+        return False
+
+
+def write_paper(path, questions, password, compression=DEFAULT_COMPRESSION, level=DEFAULT_COMPRESSION_LEVEL,
+                kdf=None):
+    header = PaperHeader.new(CIPHER_AES_GCM, validate_kdf(kdf or _default_kdf), compression)
+    key = derive_key(password, header.salt, header.kdf_params)
+    paper_key, header.key_check = _subkeys(key)
+    raw_header = header.pack()
+
+    aead = AESGCM(paper_key)
+    pieces = json.JSONEncoder(separators=(",", ":")).iterencode(questions)
+    payload = _iter_plaintext_chunks(_iter_compressed(_iter_plaintext_chunks(pieces), compression, level))
+
+    # ** Write next to the target and swap in, so a failed save never leaves half a paper behind
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as fp:
+            fp.write(raw_header)
+            chunks = _with_last_flag(payload)
+            for index, (chunk, last) in enumerate(chunks):
+                aad = raw_header + _CHUNK_AAD.pack(index, last)
+                _write_chunk(fp, aead.encrypt(_chunk_nonce(header.iv, index), chunk, aad))
+            fp.write(_CHUNK_LEN.pack(0))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _decrypt_cbc_chunks(fp, header, key, progress=None):
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(header.iv), backend=default_backend()).decryptor()
+    unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+
+    plaintext = bytearray()
+    for chunk, _ in _iter_ciphertext_chunks(fp, progress):
+        plaintext += unpadder.update(decryptor.update(chunk))
+    try:
+        plaintext += unpadder.update(decryptor.finalize())
+        plaintext += unpadder.finalize()
+        return plaintext.decode()
+    except ValueError:
+        raise InvalidPasscode("Incorrect passcode or corrupted paper")
+
+
+def _decrypt_gcm_chunks(fp, header, paper_key, progress=None):
+    aead = AESGCM(paper_key)
+    decompressor = None
+    if header.compression != COMPRESSION_NONE:
+        decompressor = _decompressor(header.compression)
+
+    plaintext = bytearray()
+    sealed = False
+    for index, (chunk, last) in enumerate(_iter_ciphertext_chunks(fp, progress)):
+        aad = header.raw + _CHUNK_AAD.pack(index, last)
+        try:
+            data = aead.decrypt(_chunk_nonce(header.iv, index), chunk, aad)
+        except InvalidTag:
+            raise PaperTampered(f"Paper chunk {index + 1} failed its integrity check")
+        plaintext += decompressor.decompress(data) if decompressor else data
+        sealed = last
+    if not sealed:
+        raise PaperTampered("Paper has no sealed final chunk")
+    if decompressor:
+        plaintext += decompressor.flush()
+    return plaintext.decode()
+
+
+def read_paper(path, password, progress=None):
+    with open(path, "rb") as fp:
+        header = PaperHeader.read(fp)
+        if header is None:
+            fp.seek(0)
+            plaintext = decrypt_data(json.load(fp), password)
+            if plaintext is None:
+                raise InvalidPasscode("Incorrect passcode or corrupted paper")
+            if progress:
+                progress(fp.tell(), fp.tell())
+            return plaintext
+
+        key = _check_passcode(header, password)
+        if progress:
+            progress(fp.tell(), os.fstat(fp.fileno()).st_size)
+        if header.cipher == CIPHER_AES_GCM:
+            return _decrypt_gcm_chunks(fp, header, key, progress)
+        return _decrypt_cbc_chunks(fp, header, key, progress)
+
+
+def load_questions(path, password, progress=None):
+    return json.loads(read_paper(path, password, progress))
+
+
+def read_header(path):
+    with open(path, "rb") as fp:
+        return PaperHeader.read(fp)
+
+
+def rekey_paper(path, password, new_password=None, kdf=None, compression=DEFAULT_COMPRESSION):
+    questions = load_questions(path, password)
+    write_paper(path, questions, new_password or password, compression=compression, kdf=kdf)
+
+
+def iter_workspace_papers(folder):
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if name.lower().endswith(".enc"):
+                yield os.path.join(root, name)
@@ -0,0 +1,162 @@
+# ==========================================================
+#  * Module : brainy_core/dedup.py - Near-Duplicate Detection
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Finds questions that are worded almost the same without
+#      comparing every pair. Each question's normalised text is
+#      cut into character shingles and reduced to a MinHash
+#      signature; an LSH index buckets signatures band by band
+#      so only questions sharing a bucket are ever compared.
+# ==========================================================
+
+import numpy as np
+from .model import normalize_text
+
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+SIGNATURE_BATCH = 1000
+# ** What a bank import does with a row that is a near-duplicate of a stored question
+NEAR_DUPLICATE_MODES = ("skip", "merge")
+
+_rng = np.random.default_rng(0x5EED)
+# ** Fixed seed so signatures from different runs and processes are comparable
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint32) | np.uint32(1)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint32)
+_WEIGHTS = np.array([pow(1000003, i, 1 << 32) for i in range(SHINGLE_SIZE)], dtype=np.uint32)
+
+
+def _shingle_hashes(codepoints):
+    # ** Polynomial hash of every SHINGLE_SIZE-character window, then an integer mix; uint32 arithmetic wraps
+    hashes = np.lib.stride_tricks.sliding_window_view(codepoints, SHINGLE_SIZE) @ _WEIGHTS
+    hashes ^= hashes >> np.uint32(15)
+    hashes *= np.uint32(0x2C1B3C6D)
+    hashes ^= hashes >> np.uint32(12)
+    return hashes
+
+
+def signatures(texts):
+    # ** MinHash signatures for a batch of texts in a handful of numpy calls; None for texts with no words
+    texts = [normalize_text(text) for text in texts]
+    # ** Very short questions are padded so they still make one shingle
+    texts = [text.ljust(SHINGLE_SIZE, "\0") if text else "" for text in texts]
+    present = [i for i, text in enumerate(texts) if text]
+    result = [None] * len(texts)
+    if not present:
+        return result
+
+    lengths = np.array([len(texts[i]) for i in present])
+    codepoints = np.frombuffer("".join(texts[i] for i in present).encode("utf-32-le"), dtype=np.uint32)
+    hashes = _shingle_hashes(codepoints)
+    # ** Drop the windows that straddle two texts
+    ends = np.cumsum(lengths)
+    keep = np.ones(len(hashes), dtype=bool)
+    for offset in range(1, SHINGLE_SIZE):
+        keep[ends[:-1] - offset] = False
+    hashes = hashes[keep]
+
+    counts = lengths - SHINGLE_SIZE + 1
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    permuted = np.outer(_A, hashes) + _B[:, None]
+    minimums = np.minimum.reduceat(permuted, starts, axis=1)
+    for column, i in enumerate(present):
+        result[i] = minimums[:, column].copy()
+    return result
+
+
+def signature(text):
+    return signatures([text])[0]
+
+
+def similarity(sig_a, sig_b):
+    # ** The share of matching MinHash slots estimates the Jaccard similarity of the shingle sets
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+class DuplicateIndex:
+    def __init__(self, threshold=DEFAULT_THRESHOLD, bands=BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.signatures = {}
+        self.texts = {}
+        self._buckets = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _band_keys(self, sig):
+        # ** Each band of rows is viewed as one opaque bytes value, usable directly as a dict key
+        return enumerate(np.ascontiguousarray(sig).view(f"V{self.rows * sig.itemsize}").tolist())
+
+    def add_many(self, items):
+        # ** items are (key, text); signatures are computed SIGNATURE_BATCH at a time
+        items = list(items)
+        for start in range(0, len(items), SIGNATURE_BATCH):
+            chunk = items[start:start + SIGNATURE_BATCH]
+            for (key, text), sig in zip(chunk, signatures([text for _, text in chunk])):
+                self.add(key, text, sig)
+
+    def add(self, key, text, sig=None):
+        sig = signature(text) if sig is None else sig
+        if sig is None:
+            return None
+        self.signatures[key] = sig
+        self.texts[key] = text
+        for band, bucket_key in self._band_keys(sig):
+            self._buckets[band].setdefault(bucket_key, []).append(key)
+        return sig
+
+    def candidates(self, sig):
+        found = set()
+        for band, bucket_key in self._band_keys(sig):
+            found.update(self._buckets[band].get(bucket_key, ()))
+        return found
+
+    def query(self, text, sig=None, exclude=None):
+        # ** Returns [(key, similarity)] for indexed questions at or above the threshold, best first
+        sig = signature(text) if sig is None else sig
+        if sig is None:
+            return []
+        matches = []
+        for key in self.candidates(sig):
+            if key == exclude:
+                continue
+            score = similarity(sig, self.signatures[key])
+            if score >= self.threshold:
+                matches.append((key, score))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def clusters(self):
+        # ** Union-find over candidate pairs that clear the threshold; singletons are left out
+        parent = {key: key for key in self.signatures}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for key, sig in self.signatures.items():
+            for other in self.candidates(sig):
+                if other != key and find(other) != find(key) \
+                        and similarity(sig, self.signatures[other]) >= self.threshold:
+                    parent[find(other)] = find(key)
+
+        groups = {}
+        for key in self.signatures:
+            groups.setdefault(find(key), []).append(key)
+        return sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
+
+
+def find_duplicate_clusters(items, threshold=DEFAULT_THRESHOLD, progress=None):
+    # ** items is an iterable of (key, text); keys can be anything hashable, e.g. (paper path, question id)
+    index = DuplicateIndex(threshold)
+    items = list(items)
+    for start in range(0, len(items), SIGNATURE_BATCH):
+        index.add_many(items[start:start + SIGNATURE_BATCH])
+        if progress:
+            progress(min(start + SIGNATURE_BATCH, len(items)), len(items))
+    return index, index.clusters()
@@ -0,0 +1,243 @@
+# ==========================================================
+#  * Module : brainy_core/model.py - Paper Model
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      The question record shared by every page, with the
+#      validation rules the editor applies before saving.
+#      Papers travel as lists of plain dicts (the .enc JSON
+#      payload); Question converts to and from that shape.
+#      The editor keeps the paper being edited as a Paper of
+#      Question objects, so saving, searching, totals and
+#      validation never have to read the widgets.
+# ==========================================================
+
+import hashlib
+import random
+import string
+import unicodedata
+from dataclasses import dataclass, field
+
+QUESTION_TYPES = ("MCQ", "True/False", "One Word")
+MCQ_OPTION_COUNT = 4
+TRUE_FALSE_ANSWERS = ("1", "0", "true", "false")
+
+_PUNCTUATION = str.maketrans({c: " " for c in string.punctuation + "“”‘’–—…¿¡«»।"})
+
+
+@dataclass(slots=True)
+class Question:
+    id: str
+    type: str
+    text: str
+    tags: str
+    # ** None while the marks field is empty in the editor
+    marks: int = None
+    options: list = field(default_factory=list)
+    correct: str = ""
+
+    @classmethod
+    def from_dict(cls, data):
+        marks = str(data.get("marks", "")).strip()
+        return cls(
+            id=data.get("id"),
+            type=data.get("type", "MCQ"),
+            text=data.get("text", ""),
+            tags=data.get("tags", ""),
+            marks=int(marks) if marks.isdigit() else None,
+            options=list(data.get("options", [])),
+            correct=data.get("correct", ""),
+        )
+
+    def to_dict(self):
+        # ** Same keys and value types the editor has always written, so older readers keep working
+        data = {"id": self.id, "type": self.type, "text": self.text, "tags": self.tags,
+                "marks": "" if self.marks is None else str(self.marks)}
+        if self.type == "MCQ":
+            data["options"] = list(self.options)
+        data["correct"] = self.correct
+        return data
+
+    def validate(self):
+        return _validation_errors(self.text, "" if self.marks is None else str(self.marks), self.type,
+                                  self.options, self.correct, self.tags)
+
+    def matches(self, query):
+        # ** query is already lowercased by the search box
+        if not query:
+            return True
+        return (query in self.text.lower() or query in str(self.correct).lower()
+                or any(query in tag.strip() for tag in self.tags.lower().split(",")))
+
+
+class Paper:
+    # ** The questions of the paper being edited, in order; editor frames write each edit straight into them
+    __slots__ = ("questions",)
+
+    def __init__(self, questions=()):
+        self.questions = list(questions)
+
+    @classmethod
+    def from_dicts(cls, questions):
+        return cls(Question.from_dict(data) for data in questions)
+
+    def to_dicts(self):
+        return [question.to_dict() for question in self.questions]
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __iter__(self):
+        return iter(self.questions)
+
+    def __getitem__(self, index):
+        return self.questions[index]
+
+    def append(self, question):
+        self.questions.append(question)
+
+    def remove(self, questions):
+        # ** By identity: two questions with equal fields are still different questions
+        doomed = {id(question) for question in questions}
+        self.questions = [question for question in self.questions if id(question) not in doomed]
+
+    def total_marks(self):
+        return sum(question.marks or 0 for question in self.questions)
+
+    def errors(self):
+        # ** [(position, [messages])] for the questions that cannot be saved, positions counted from 1
+        errors_by_question = []
+        for idx, question in enumerate(self.questions, 1):
+            errors = question.validate()
+            if errors:
+                errors_by_question.append((idx, [message for _, message in errors]))
+        return errors_by_question
+
+    def matching(self, query):
+        return [question for question in self.questions if question.matches(query)]
+
+
+def generate_question_id():
+    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+
+
+def validate_question(data):
+    # ** Returns (field, message) pairs so the editor can highlight the widget behind each problem
+    return _validation_errors(data.get("text", ""), str(data.get("marks", "")).strip(), data.get("type"),
+                              data.get("options", []), data.get("correct", ""), data.get("tags", ""))
+
+
+def _validation_errors(text, marks, q_type, options, correct, tags):
+    errors = []
+    if not str(text).strip():
+        errors.append(("text", "Question text cannot be empty"))
+
+    if not marks:
+        errors.append(("marks", "Marks cannot be empty"))
+    elif not marks.isdigit():
+        errors.append(("marks", "Marks must be a valid number"))
+
+    if q_type == "MCQ":
+        if not correct:
+            errors.append(("correct", "Please select correct answer"))
+        for i in range(MCQ_OPTION_COUNT):
+            if i >= len(options) or not str(options[i]).strip():
+                errors.append((f"option:{i}", f"Option {i+1} cannot be empty"))
+    elif q_type == "One Word":
+        if not str(correct).strip():
+            errors.append(("correct", "Correct answer cannot be empty"))
+    elif q_type not in QUESTION_TYPES:
+        errors.append(("type", f"Unknown question type {q_type}"))
+
+    if not str(tags).strip():
+        errors.append(("tags", "At least one tag is required"))
+
+    return errors
+
+
+def format_paper_errors(errors_by_question):
+    return "\n\n".join(
+        f"Question {idx}:\n" + "\n".join(f" • {message}" for message in messages)
+        for idx, messages in errors_by_question
+    )
+
+
+def validate_paper(questions):
+    errors_by_question = []
+    for idx, data in enumerate(questions, 1):
+        errors = validate_question(data)
+        if errors:
+            errors_by_question.append((idx, [message for _, message in errors]))
+    return errors_by_question
+
+
+def total_marks(questions):
+    return sum(int(q['marks']) for q in questions)
+
+
+def total_duration(questions, minutes_per_question):
+    return round(minutes_per_question * len(questions), 1)
+
+
+def question_from_bank_row(row):
+    # ** Bank rows are (id, text, tags, marks, options, type, answer) with options joined by ", "
+    question_id, question_text, tags, marks, options, q_type, answer = row
+    try:
+        marks = int(float(marks))
+    except (TypeError, ValueError):
+        marks = 0
+    question = Question(id=question_id, type=q_type, text=question_text, tags=tags, marks=marks)
+    if q_type == "MCQ":
+        question.options = options.split(", ") if options else []
+        question.correct = answer.strip()
+    elif q_type == "True/False":
+        question.correct = "True" if str(answer).strip().lower() in ("1", "true") else "False"
+    else:
+        question.correct = answer
+    return question
+
+
+def normalize_text(text):
+    # ** Case, punctuation and spacing differences do not make a different question
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.casefold().translate(_PUNCTUATION).split())
+
+
+def text_key(text):
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def validate_bank_row(row):
+    # ** Checks a (id, text, tags, marks, options, type, answer) bank row; returns (field, message) pairs
+    question_id, question_text, tags, marks, options, q_type, answer = row
+    errors = []
+    if not question_id:
+        errors.append(("Question ID", "Question ID is empty"))
+    if not question_text:
+        errors.append(("Question", "Question text is empty"))
+    if not tags:
+        errors.append(("Tags", "At least one tag is required"))
+    try:
+        if float(marks) <= 0 or not float(marks).is_integer():
+            raise ValueError
+    except (TypeError, ValueError):
+        errors.append(("Marks", f"Marks must be a positive whole number, got {marks!r}"))
+
+    if q_type == "MCQ":
+        option_list = [option.strip() for option in options.split(", ")] if options else []
+        # ! Older banks have options that contain ", " themselves, so extra pieces are tolerated
+        if len(option_list) < MCQ_OPTION_COUNT or not all(option_list):
+            errors.append(("Options", f"MCQ needs {MCQ_OPTION_COUNT} non-empty options separated by \", \""))
+        elif answer.strip() not in option_list:
+            errors.append(("Answer", "Answer must be one of the options"))
+    elif q_type == "True/False":
+        if answer.strip().lower() not in TRUE_FALSE_ANSWERS:
+            errors.append(("Answer", "True/False answer must be 1, 0, True or False"))
+    elif q_type == "One Word":
+        if not answer:
+            errors.append(("Answer", "Answer is empty"))
+    else:
+        errors.append(("Question Type", f"Unknown question type {q_type!r}"))
+    return errors
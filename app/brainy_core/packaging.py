@@ -0,0 +1,173 @@
+# ==========================================================
+#  * Module : brainy_core/packaging.py - Exam Packaging
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Turns a paper into what leaves the app: a printable PDF
+#      or an encrypted cloud exam package with its answer key
+#      kept apart from the questions. reportlab, dropbox and
+#      firebase are imported only by the functions that use
+#      them.
+# ==========================================================
+
+import json
+import sqlite3
+from math import floor
+from random import random
+from .crypto import write_paper
+from .model import total_duration, total_marks
+
+DEFAULT_MINUTES_PER_QUESTION = 5.0
+
+
+def build_subject_details(title, subject_code, subject_name, subject_date, minutes_per_question, questions, instructions):
+    return {
+        'title': title,
+        'subject_code': subject_code,
+        'subject_name': subject_name,
+        'subject_date': subject_date,
+        'time_duration': f"{total_duration(questions, minutes_per_question)} minutes",
+        'total_marks': total_marks(questions),
+        'instructions': instructions
+    }
+
+
+def generate_paper_pdf(questions, file_path, subject_details, logo_path, enrollment_no="______",
+                       include_header=True, include_footer=True, show_answers=False, typeset_notation=True):
+    from pdf_template import GeneratePDF
+
+    generator = GeneratePDF(
+        title=subject_details['title'],
+        subject_details=subject_details,
+        instructions=subject_details['instructions'],
+        questions=questions,
+        enrollment_no=enrollment_no,
+        logo_path=logo_path,
+        include_header=include_header,
+        include_footer=include_footer,
+        show_answers=show_answers,
+        typeset_notation=typeset_notation
+    )
+    generator.generate_pdf(file_path)
+    return file_path
+
+
+def generate_exam_id():
+    idx = ""
+    characters = "123456789"
+
+    for i in range(4):
+        idx += characters[floor(random() * len(characters))]
+
+    return f"BS{idx}"
+
+
+def generate_access_code():
+    characters = "123456789"
+    access_code = ""
+
+    for i in range(4):
+        access_code += characters[floor(random() * len(characters))]
+
+    return f"CE{access_code}"
+
+
+def remove_correct_answers(parsed_questions):
+    question_dict = {}
+
+    for index, question in enumerate(parsed_questions, start=1):
+        question_id = f"Q{index}"
+        question_copy = question.copy()
+
+        if "correct" in question_copy:
+            question_copy.pop("correct")
+
+        question_dict[question_id] = question_copy
+
+    return question_dict
+
+
+def extract_correct_answers(parsed_questions):
+    correct_answers_dict = {}
+
+    for index, question in enumerate(parsed_questions, start=1):
+        if "correct" in question:
+            question_id = f"Q{index}"
+            correct_answers_dict[question_id] = question["correct"]
+
+    return correct_answers_dict
+
+
+def create_question_id_mapping(parsed_questions):
+    question_id_mapping = {}
+
+    for index, question in enumerate(parsed_questions, start=1):
+        if "id" in question:
+            question_id_mapping[f"Q{index}"] = question["id"]
+
+    return question_id_mapping
+
+
+def build_exam_package(questions, exam_id, access_code, exam_title, subject_code, subject_name, instructions,
+                       minutes_per_question, registration_times, registration_date):
+    return {
+        "brainy-studio": {
+            "version": "1.2.0 (beta)"
+        },
+        "auth_data": {
+            "exam-id": exam_id,
+            "access-code": access_code,
+            "registration_time": registration_times[0],
+            "registration_end_time": registration_times[1],
+            "registration_date": registration_date
+        },
+        "subject_details": {
+            "subject_name": subject_name,
+            "subject_code": subject_code,
+            "time_duration": total_duration(questions, minutes_per_question),
+            "registration_time": registration_times[0],
+            "registration_end_time": registration_times[1],
+            "exam_start_time": registration_times[1],
+            "instructions": instructions,
+            "subject_date": registration_date,
+            "total_marks": str(total_marks(questions)),
+            "exam_title": exam_title
+        },
+        "questions": remove_correct_answers(questions),
+        "question-mapping": create_question_id_mapping(questions),
+        "answer-key": extract_correct_answers(questions)
+    }
+
+
+def publish_exam(exam_paper, file_path, dropbox_config_path, cloud_root):
+    from dropbox_backend import DropboxBackend
+    from firebase_backend import FirebaseBackend
+
+    auth_data = exam_paper["auth_data"]
+    exam_id, access_code = auth_data["exam-id"], auth_data["access-code"]
+    write_paper(file_path, exam_paper, access_code)
+
+    with open(dropbox_config_path, "r") as f:
+        data = json.load(f)
+
+    dbx_backend = DropboxBackend(refresh_token=data["refresh_token"], app_key=data["app_key"],
+                                 app_secret=data["app_secret"], root_path=cloud_root)
+    if not dbx_backend.upload_file(file_path, f"/uploads/{exam_id}.enc"):
+        raise RuntimeError(f"Uploading {exam_id} to Dropbox failed")
+
+    if not FirebaseBackend().create_exam(exam_id=exam_id, access_code=access_code,
+                                         subject_details=exam_paper["subject_details"]):
+        raise RuntimeError(f"Registering {exam_id} with Firebase failed")
+
+
+def save_exam_record(db_path, exam_id, access_code, subject_code, exam_title, reg_start, reg_end, reg_date):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('''
+            INSERT INTO exams (exam_id, access_code, subject_code, exam_title,
+                             registration_start, registration_end, registration_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (exam_id, access_code, subject_code, exam_title, reg_start, reg_end, reg_date))
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,105 @@
+# ==========================================================
+#  * Module : brainy_core/results.py - Exam Results
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Aggregates the per-student results a cloud exam stores
+#      in Firestore into result rows, and writes the formatted
+#      results workbook.
+# ==========================================================
+
+RESULT_COLUMNS = ["Enrollment No", "Marks Obtained", "Total Marks", "Negative Marks", "Not Attempted"]
+
+
+def parse_exam_results(exam_data):
+    subject_details = exam_data.get('subject_details', {})
+    total_marks = int(subject_details.get('total_marks', 0))
+    students_data = exam_data.get('students', {})
+
+    results = []
+    for enrollment_no, student_data in students_data.items():
+        results.append({
+            "enrollment_no": enrollment_no,
+            "marks_obtained": student_data.get('total_score', 0),
+            "total_marks": total_marks,
+            "negative_marks": student_data.get('marks_wrong', 0),
+            "not_attempted": student_data.get('not_attempted', 0)
+        })
+    return subject_details, results
+
+
+def results_title(subject_details):
+    return f"{subject_details.get('subject_name')} | {subject_details.get('subject_date')} | Result"
+
+
+def results_to_frame(results):
+    import pandas as pd
+
+    if not results:
+        raise ValueError("No results data to process")
+
+    processed = []
+    for result in results:
+        processed.append({
+            "Enrollment No": result.get("enrollment_no", ""),
+            "Marks Obtained": result.get("marks_obtained", 0),
+            "Total Marks": result.get("total_marks", 0),
+            "Negative Marks": result.get("negative_marks", 0),
+            "Not Attempted": result.get("not_attempted", 0)
+        })
+    return pd.DataFrame(processed, columns=RESULT_COLUMNS)
+
+
+def write_results_workbook(df, title, file_path):
+    import pandas as pd
+
+    writer = pd.ExcelWriter(file_path, engine='xlsxwriter')
+    df.to_excel(writer, index=False, sheet_name='Results', startrow=1)
+
+    workbook = writer.book
+    worksheet = writer.sheets['Results']
+
+    title_format = workbook.add_format({
+        'bold': True,
+        'font_size': 14,
+        'align': 'center',
+        'valign': 'vcenter',
+        'fg_color': '#D9E1F2'
+    })
+    worksheet.merge_range(0, 0, 0, len(df.columns) - 1, title, title_format)
+
+    header_format = workbook.add_format({
+        'bold': True,
+        'text_wrap': True,
+        'valign': 'top',
+        'fg_color': '#4F81BD',
+        'font_color': 'white',
+        'border': 1
+    })
+
+    normal_format = workbook.add_format({
+        'border': 1,
+        'valign': 'top',
+    })
+    alt_format = workbook.add_format({
+        'bg_color': '#F2F2F2',
+        'border': 1,
+        'valign': 'top',
+    })
+
+    for col_num, column_name in enumerate(df.columns.values):
+        worksheet.write(1, col_num, column_name, header_format)
+
+    for row_num, row_data in enumerate(df.values, start=2):
+        for col_num, cell_data in enumerate(row_data):
+            fmt = alt_format if (row_num - 2) % 2 == 0 else normal_format
+            worksheet.write(row_num, col_num, cell_data, fmt)
+
+    for i, column in enumerate(df.columns):
+        max_len = max(df[column].astype(str).map(len).max(), len(column))
+        worksheet.set_column(i, i, max_len + 2)
+
+    worksheet.freeze_panes(2, 0)
+
+    writer.close()
+    return file_path
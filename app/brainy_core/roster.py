@@ -0,0 +1,259 @@
+# ==========================================================
+#  * Module : brainy_core/roster.py - Per-Student Paper Sets
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Renders one PDF per enrollment number in a roster, each
+#      with its own question and option order and answer key.
+#      Orders are drawn here from a seed and the enrollment
+#      number, so a run can be reproduced from its manifest;
+#      the PDFs are rendered across a process pool whose
+#      workers receive the paper and register fonts once.
+#
+#      A run writes, next to the PDFs:
+#        manifest.json    : seed, files and question order
+#        answer-keys.xlsx : one key row per student
+# ==========================================================
+
+import json
+import os
+import random
+import re
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .serialization import _cell
+
+ROSTER_COLUMN = "Enrollment No"
+MANIFEST_NAME = "manifest.json"
+ANSWER_KEY_NAME = "answer-keys.xlsx"
+
+STATUS_RENDERED = "rendered"
+STATUS_FAILED = "failed"
+
+
+def read_roster(path):
+    # ** Enrollment numbers from the "Enrollment No" column, or the first column; blanks and repeats are dropped
+    if path.lower().endswith(".csv"):
+        import csv
+
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+    else:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = list(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+
+    if not rows:
+        raise ValueError("The roster is empty")
+    header = [_cell(name).casefold() for name in rows[0]]
+    column = header.index(ROSTER_COLUMN.casefold()) if ROSTER_COLUMN.casefold() in header else 0
+
+    enrollments = {}
+    for row in rows[1:]:
+        value = _cell(row[column]) if column < len(row) else ""
+        if value:
+            enrollments.setdefault(value, None)
+    if not enrollments:
+        raise ValueError(f"No enrollment numbers found under '{ROSTER_COLUMN}' or in the first column")
+    return list(enrollments)
+
+
+def student_order(questions, seed, enrollment_no):
+    # ** [(question index, option order or None)]; only MCQ options move, True/False keeps its order
+    rng = random.Random(f"{seed}:{enrollment_no}")
+    order = list(range(len(questions)))
+    rng.shuffle(order)
+    result = []
+    for index in order:
+        options = questions[index].get("options") or []
+        if questions[index].get("type") == "MCQ" and len(options) > 1:
+            option_order = list(range(len(options)))
+            rng.shuffle(option_order)
+            result.append((index, option_order))
+        else:
+            result.append((index, None))
+    return result
+
+
+def apply_order(questions, order):
+    ordered = []
+    for index, option_order in order:
+        question = questions[index]
+        if option_order is not None:
+            question = dict(question, options=[question["options"][i] for i in option_order])
+        ordered.append(question)
+    return ordered
+
+
+def answer_key(questions):
+    # ** (position, question ID, key, correct answer); MCQ keys are the letters printed in the option bubbles
+    from pdf_layout import OPTION_LABELS
+
+    key = []
+    for number, question in enumerate(questions, start=1):
+        correct = str(question.get("correct", ""))
+        options = question.get("options") or []
+        label = correct
+        if question.get("type") == "MCQ" and correct in options[:len(OPTION_LABELS)]:
+            label = OPTION_LABELS[options.index(correct)]
+        key.append((number, question.get("id", f"Q{number}"), label, correct))
+    return key
+
+
+def _file_name(enrollment_no):
+    return re.sub(r"[^\w.-]+", "_", enrollment_no).strip("._") or "student"
+
+
+# ** Set once per worker process by _init_worker, so each task only carries an enrollment number and an order
+_worker = {}
+
+
+def _init_worker(questions, subject_details, logo_path, include_header, include_footer, typeset_notation):
+    from font_registry import register_fonts
+    from pdf_template import measure_questions
+
+    register_fonts()
+    measure_questions(questions, typeset_notation=typeset_notation)
+    _worker.update(questions=questions, subject_details=subject_details, logo_path=logo_path,
+                   include_header=include_header, include_footer=include_footer, typeset_notation=typeset_notation)
+
+
+def _render_student(enrollment_no, order, path):
+    from .packaging import generate_paper_pdf
+
+    started = time.perf_counter()
+    try:
+        generate_paper_pdf(apply_order(_worker["questions"], order), path, _worker["subject_details"],
+                           logo_path=_worker["logo_path"], enrollment_no=enrollment_no,
+                           include_header=_worker["include_header"], include_footer=_worker["include_footer"],
+                           typeset_notation=_worker["typeset_notation"])
+        return enrollment_no, STATUS_RENDERED, "", time.perf_counter() - started
+    except Exception as e:
+        return enrollment_no, STATUS_FAILED, str(e) or type(e).__name__, time.perf_counter() - started
+
+
+class RosterReport:
+    def __init__(self, folder, questions, subject_details, seed):
+        self.folder = folder
+        self.questions = questions
+        self.subject_details = subject_details
+        self.seed = seed
+        self.students = {}
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.elapsed = 0.0
+
+    def add(self, enrollment_no, file_name, order):
+        self.students[enrollment_no] = {"enrollment_no": enrollment_no, "file": file_name, "order": order,
+                                        "status": None, "detail": "", "seconds": 0.0}
+
+    def finish(self, enrollment_no, status, detail="", seconds=0.0):
+        self.students[enrollment_no].update(status=status, detail=detail, seconds=round(seconds, 3))
+
+    @property
+    def failures(self):
+        return [student for student in self.students.values() if student["status"] == STATUS_FAILED]
+
+    def summary(self):
+        rendered = sum(1 for student in self.students.values() if student["status"] == STATUS_RENDERED)
+        lines = [
+            f"Folder: {self.folder}",
+            f"Students: {len(self.students)} in {self.elapsed:.1f}s",
+            f"Rendered: {rendered}",
+            f"Failed: {len(self.failures)}",
+        ]
+        for failure in self.failures:
+            lines.append(f"  - {failure['enrollment_no']}: {failure['detail']}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        students = []
+        for student in self.students.values():
+            ordered = apply_order(self.questions, student["order"])
+            students.append({
+                "enrollment_no": student["enrollment_no"],
+                "file": student["file"],
+                "status": student["status"],
+                "detail": student["detail"],
+                "seconds": student["seconds"],
+                "questions": [question.get("id") for question in ordered],
+                "key": [label for _, _, label, _ in answer_key(ordered)],
+            })
+        return {
+            "title": self.subject_details.get("title"),
+            "subject_code": self.subject_details.get("subject_code"),
+            "subject_date": self.subject_details.get("subject_date"),
+            "seed": self.seed,
+            "started_at": self.started_at,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "question_count": len(self.questions),
+            "students": students,
+        }
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4, ensure_ascii=False)
+
+    def save_answer_keys(self, path):
+        # ** One key row per student in openpyxl's streaming mode; the question order per student is in the manifest
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Answer Keys")
+        sheet.append([ROSTER_COLUMN] + [f"Q{number}" for number in range(1, len(self.questions) + 1)])
+        for student in self.students.values():
+            key = answer_key(apply_order(self.questions, student["order"]))
+            sheet.append([student["enrollment_no"]] + [label for _, _, label, _ in key])
+        workbook.save(path)
+
+
+def render_roster(questions, roster, folder, subject_details, logo_path, seed=None, include_header=True,
+                  include_footer=True, typeset_notation=True, workers=None, progress=None):
+    # ! Orders are drawn in this process, so the manifest and answer keys never depend on worker scheduling
+    if not roster:
+        raise ValueError("The roster is empty")
+    seed = secrets.randbits(32) if seed is None else seed
+    os.makedirs(folder, exist_ok=True)
+    report = RosterReport(folder, questions, subject_details, seed)
+
+    names = set()
+    for enrollment_no in roster:
+        name = _file_name(enrollment_no)
+        # ** Enrollment numbers that clean up to the same file name get a numbered suffix
+        base, suffix = name, 2
+        while name.casefold() in names:
+            name, suffix = f"{base}-{suffix}", suffix + 1
+        names.add(name.casefold())
+        report.add(enrollment_no, name + ".pdf", student_order(questions, seed, enrollment_no))
+
+    # ** Refresh the font metrics cache before the workers start, so none of them parses a TTF just to measure
+    from font_registry import load_metrics
+
+    load_metrics()
+    started = time.perf_counter()
+    if progress:
+        progress(0, len(roster))
+    executor = ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(roster)),
+                                   initializer=_init_worker,
+                                   initargs=(questions, subject_details, logo_path, include_header, include_footer,
+                                             typeset_notation))
+    try:
+        futures = [executor.submit(_render_student, student["enrollment_no"], student["order"],
+                                   os.path.join(folder, student["file"]))
+                   for student in report.students.values()]
+        for done, future in enumerate(as_completed(futures), start=1):
+            report.finish(*future.result())
+            if progress:
+                progress(done, len(roster))
+    finally:
+        # ** PDFs already being written finish cleanly; queued ones are dropped on cancel
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    report.elapsed = time.perf_counter() - started
+    report.save(os.path.join(folder, MANIFEST_NAME))
+    report.save_answer_keys(os.path.join(folder, ANSWER_KEY_NAME))
+    return report
@@ -0,0 +1,127 @@
+# ==========================================================
+#  * Module : brainy_core/serialization.py - Paper Files
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Reading and writing papers: encrypted .enc files, the
+#      Excel question-bank layout and bank imports. pandas is
+#      imported by the functions that need it, so opening an
+#      encrypted paper stays cheap.
+# ==========================================================
+
+import csv
+import os
+from .crypto import load_questions, write_paper
+from .model import format_paper_errors, validate_paper
+
+QUESTION_COLUMNS = ['Question ID', 'Question', 'Tags', 'Marks', 'Options', 'Question Type', 'Answer']
+
+
+def save_paper(path, questions, password, **options):
+    errors = validate_paper(questions)
+    if errors:
+        raise ValueError("Cannot save:\n\n" + format_paper_errors(errors))
+    write_paper(path, questions, password, **options)
+    return path
+
+
+def load_paper(path, password, progress=None):
+    return load_questions(path, password, progress)
+
+
+def questions_to_frame(questions):
+    import pandas as pd
+
+    if not questions or not isinstance(questions, list):
+        raise ValueError("Decrypted question bank is empty or invalid.")
+
+    formatted_data = []
+    for question in questions:
+        if not all(key in question for key in ['id', 'text', 'tags', 'marks', 'type', 'correct']):
+            raise ValueError("Invalid question format in decrypted data")
+
+        formatted_data.append({
+            'Question ID': str(question['id']),
+            'Question': str(question['text']),
+            'Tags': str(question['tags']),
+            'Marks': int(question['marks']),
+            'Options': ', '.join(map(str, question.get('options', []))),
+            'Question Type': str(question['type']),
+            'Answer': str(question['correct'])
+        })
+
+    return pd.DataFrame(formatted_data, columns=QUESTION_COLUMNS)
+
+
+def save_question_frame(df, file_path):
+    engine = 'openpyxl' if file_path.endswith('.xlsx') else 'xlwt'
+    df.to_excel(file_path, index=False, engine=engine)
+
+    if not os.path.exists(file_path):
+        raise IOError("File was not created successfully")
+    return file_path
+
+
+def export_questions_to_excel(questions, file_path):
+    df = questions_to_frame(questions)
+    if df.empty:
+        raise ValueError("No valid questions found after formatting.")
+    save_question_frame(df, file_path)
+    return df
+
+
+def _cell(value):
+    # ** Blank cells come back as None (openpyxl) or NaN, and whole numbers often as floats
+    if value is None or value != value:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class BankReader:
+    # ** Streams bank rows from .xlsx (openpyxl read-only) or .csv without loading the sheet into memory
+    def __init__(self, source_path):
+        self.source_path = source_path
+        self.is_csv = source_path.lower().endswith(".csv")
+        # ** Data rows in the file, or None when the sheet does not record its size
+        self.total = None
+
+    def __iter__(self):
+        # ** Yields (sheet row number, bank row) with cells as stripped strings in QUESTION_COLUMNS order
+        if self.is_csv:
+            yield from self._iter_csv()
+        else:
+            yield from self._iter_xlsx()
+
+    def _columns(self, header):
+        header = [_cell(name) for name in header]
+        missing = [name for name in QUESTION_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"Invalid file format! Missing required columns: {', '.join(missing)}")
+        return [header.index(name) for name in QUESTION_COLUMNS]
+
+    def _rows(self, rows, first_row):
+        columns = self._columns(next(rows, ()))
+        for row_number, values in enumerate(rows, start=first_row):
+            values = list(values) + [None] * (max(columns) + 1 - len(values))
+            row = tuple(_cell(values[i]) for i in columns)
+            if any(row):
+                yield row_number, row
+
+    def _iter_xlsx(self):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.source_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            self.total = sheet.max_row - 1 if sheet.max_row else None
+            yield from self._rows(sheet.iter_rows(values_only=True), 2)
+        finally:
+            workbook.close()
+
+    def _iter_csv(self):
+        with open(self.source_path, "rb") as f:
+            self.total = max(sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b"")) - 1, 0)
+        with open(self.source_path, newline="", encoding="utf-8-sig") as f:
+            yield from self._rows(csv.reader(f), 2)
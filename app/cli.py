@@ -0,0 +1,410 @@
+# ==========================================================
+#  * Module : cli.py - Brainy Studio Command Line
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Headless access to the paper operations, for scripting
+#      bulk work on machines without a display. Nothing here
+#      imports customtkinter; each subcommand imports only the
+#      libraries it needs.
+#
+#      Usage (from the repository root):
+#        python -m app.cli decrypt paper.enc -o paper.json
+#        python -m app.cli pdf papers/*.enc --subject CS101 -o out/
+#        python -m app.cli pdf paper.enc --subject CS101 --roster students.csv -o sets/
+#        python -m app.cli excel paper.enc -o bank.xlsx
+#        python -m app.cli publish paper.enc --subject CS101 --title "Unit Test" --start 10:00 --end 10:30
+#        python -m app.cli bank import questions.xlsx --near-duplicates skip
+#        python -m app.cli dedup --workspace workspace/
+#        python -m app.cli generate blueprint.json --variants 4 -o papers/
+#
+#      The passcode is read from BRAINY_PASSCODE when it is set,
+#      otherwise it is prompted for once per run.
+# ==========================================================
+
+import argparse
+import datetime
+import getpass
+import json
+import os
+import sys
+
+# ** The app modules import each other by bare name, so make them importable under python -m app.cli
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import getPath
+from brainy_core import load_paper, InvalidPasscode, PaperTampered
+from brainy_core import packaging, serialization
+from brainy_core.dedup import DEFAULT_THRESHOLD, NEAR_DUPLICATE_MODES
+
+PASSCODE_ENV = "BRAINY_PASSCODE"
+
+
+class CommandError(Exception):
+    pass
+
+
+def _read_passcode(args):
+    if getattr(args, "passcode", None) is None:
+        args.passcode = os.getenv(PASSCODE_ENV) or getpass.getpass("Passcode: ")
+    return args.passcode
+
+
+def _load(args, paper_path):
+    try:
+        return load_paper(paper_path, _read_passcode(args))
+    except InvalidPasscode:
+        raise CommandError(f"{paper_path}: invalid passcode or corrupted file")
+    except PaperTampered:
+        raise CommandError(f"{paper_path}: this paper has been modified or is corrupted")
+    except (OSError, ValueError) as e:
+        raise CommandError(f"{paper_path}: {e}")
+
+
+def _output_paths(papers, output, extension):
+    # ** One paper may go to a file; several always go to a folder, named after each paper
+    if output and len(papers) == 1 and not os.path.isdir(output):
+        return [output]
+    folder = output
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    paths = []
+    for paper in papers:
+        name = os.path.splitext(os.path.basename(paper))[0] + extension
+        paths.append(os.path.join(folder or os.path.dirname(paper), name))
+    return paths
+
+
+def _subject(subject_code):
+    from subject_store import SubjectDBManager
+
+    db_manager = SubjectDBManager()
+    subject_name = db_manager.get_subject_name(subject_code)
+    if subject_name is None:
+        raise CommandError(f"Unknown subject code {subject_code}")
+    return subject_name[0], db_manager.get_instructions(subject_code) or ""
+
+
+def cmd_decrypt(args):
+    questions = _load(args, args.paper)
+    text = json.dumps(questions, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"{args.paper}: {len(questions)} questions -> {args.output}")
+    else:
+        print(text)
+
+
+def cmd_pdf(args):
+    subject_name, instructions = _subject(args.subject)
+    if args.roster:
+        return _roster_pdfs(args, subject_name, instructions)
+    for paper, output in zip(args.papers, _output_paths(args.papers, args.output, ".pdf")):
+        questions = _load(args, paper)
+        subject_details = packaging.build_subject_details(
+            title=(args.title or subject_name).upper(),
+            subject_code=args.subject,
+            subject_name=subject_name,
+            subject_date=args.date,
+            minutes_per_question=args.minutes_per_question,
+            questions=questions,
+            instructions=instructions
+        )
+        packaging.generate_paper_pdf(
+            questions, output, subject_details,
+            logo_path=getPath(r"assets\images\logo.png"),
+            enrollment_no=args.enrollment,
+            include_header=not args.no_header,
+            include_footer=not args.no_footer,
+            show_answers=args.answers,
+            typeset_notation=not args.plain_text
+        )
+        print(f"{paper} -> {output}")
+
+
+def _roster_pdfs(args, subject_name, instructions):
+    from brainy_core import roster
+
+    if len(args.papers) != 1:
+        raise CommandError("--roster renders one paper per student; give exactly one paper")
+    paper = args.papers[0]
+    try:
+        enrollments = roster.read_roster(args.roster)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"{args.roster}: {e}")
+
+    questions = _load(args, paper)
+    subject_details = packaging.build_subject_details(
+        title=(args.title or subject_name).upper(),
+        subject_code=args.subject,
+        subject_name=subject_name,
+        subject_date=args.date,
+        minutes_per_question=args.minutes_per_question,
+        questions=questions,
+        instructions=instructions
+    )
+    folder = args.output or os.path.splitext(paper)[0] + "-roster"
+
+    def show_progress(done, total):
+        print(f"\r{done}/{total} students", end="", file=sys.stderr, flush=True)
+
+    report = roster.render_roster(
+        questions, enrollments, folder, subject_details,
+        logo_path=getPath(r"assets\images\logo.png"),
+        seed=args.seed,
+        include_header=not args.no_header,
+        include_footer=not args.no_footer,
+        typeset_notation=not args.plain_text,
+        workers=args.workers,
+        progress=show_progress
+    )
+    print(file=sys.stderr)
+    print(report.summary())
+    if report.failures:
+        raise CommandError(f"{len(report.failures)} PDFs failed; see {os.path.join(folder, roster.MANIFEST_NAME)}")
+
+
+def cmd_excel(args):
+    for paper, output in zip(args.papers, _output_paths(args.papers, args.output, ".xlsx")):
+        try:
+            df = serialization.export_questions_to_excel(_load(args, paper), output)
+        except ValueError as e:
+            raise CommandError(f"{paper}: {e}")
+        print(f"{paper}: {len(df)} questions, {df['Marks'].sum()} marks -> {output}")
+
+
+def cmd_publish(args):
+    dropbox_config = os.getenv("DBX_BACKEND")
+    if not args.package_only and (dropbox_config is None or os.getenv("FIREBASE_CONFIG") is None):
+        raise CommandError("Publishing needs the DBX_BACKEND and FIREBASE_CONFIG environment variables")
+
+    subject_name, instructions = _subject(args.subject)
+    questions = _load(args, args.paper)
+    exam_id = packaging.generate_exam_id()
+    access_code = packaging.generate_access_code()
+    exam_paper = packaging.build_exam_package(
+        questions, exam_id, access_code, args.title.upper(),
+        subject_code=args.subject,
+        subject_name=subject_name,
+        instructions=instructions.split("\n"),
+        minutes_per_question=args.minutes_per_question,
+        registration_times=[args.start, args.end],
+        registration_date=args.date
+    )
+
+    file_path = getPath(f"database\\CloudDB\\{exam_id}.enc")
+    if args.package_only:
+        from brainy_core.crypto import write_paper
+        write_paper(file_path, exam_paper, access_code)
+    else:
+        try:
+            packaging.publish_exam(exam_paper, file_path, dropbox_config, getPath(r"database\CloudDB"))
+        except Exception as e:
+            raise CommandError(f"Publishing failed: {e}")
+        packaging.save_exam_record(getPath("database\\brainy-studio.db"), exam_id, access_code, args.subject,
+                                    args.title.upper(), args.start, args.end, args.date)
+    print(f"EXAM-ID: {exam_id}\nACCESS-CODE: {access_code}\nPackage: {file_path}")
+
+
+def cmd_bank_import(args):
+    from question_store import QuestionStore
+
+    def show_progress(done, total):
+        print(f"\r{done}/{total or '?'} rows", end="", file=sys.stderr, flush=True)
+
+    try:
+        report = QuestionStore(args.db).import_file(args.file, show_progress, near_duplicates=args.near_duplicates,
+                                                     threshold=args.threshold)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"{args.file}: {e}")
+    print(file=sys.stderr)
+    print(f"{args.file}: {report.summary()}")
+    if args.report and report.problems:
+        report.save(args.report)
+        print(f"Skipped rows written to {args.report}")
+
+
+def _workspace_questions(args):
+    # ** Papers that cannot be opened with the passcode are reported and left out rather than ending the run
+    from brainy_core.crypto import iter_workspace_papers
+
+    for folder in args.workspace:
+        for paper in iter_workspace_papers(folder):
+            try:
+                questions = _load(args, paper)
+            except CommandError as e:
+                print(f"skipped {e}", file=sys.stderr)
+                continue
+            for number, question in enumerate(questions, start=1):
+                yield (paper, question.get("id") or f"Q{number}"), question.get("text", "")
+
+
+def cmd_dedup(args):
+    from brainy_core.dedup import DuplicateIndex
+
+    if args.no_bank and not args.workspace:
+        raise CommandError("Nothing to check: give --workspace or drop --no-bank")
+    if args.no_bank:
+        index = DuplicateIndex(args.threshold)
+    else:
+        from question_store import QuestionStore
+        # ** Bank questions are keyed by their ID string, paper questions by (paper path, ID)
+        index = QuestionStore(args.db).duplicate_index(args.threshold)
+
+    index.add_many(_workspace_questions(args))
+
+    clusters = index.clusters()
+    for number, cluster in enumerate(clusters, start=1):
+        print(f"Cluster {number} ({len(cluster)} questions)")
+        for key in sorted(cluster, key=lambda key: ("", key) if isinstance(key, str) else key):
+            source, question_id = ("bank", key) if isinstance(key, str) else key
+            text = " ".join(index.texts[key].split())
+            print(f"  {source} [{question_id}] {text[:80]}")
+    print(f"{len(index)} questions checked, {len(clusters)} groups of near-duplicates", file=sys.stderr)
+
+
+def cmd_generate(args):
+    from question_store import QuestionStore
+    from brainy_core.assembly import Blueprint, BlueprintError, assemble
+    from brainy_core.model import question_from_bank_row
+
+    try:
+        with open(args.blueprint, encoding="utf-8") as f:
+            blueprint = Blueprint.from_dict(json.load(f))
+    except (OSError, ValueError) as e:
+        raise CommandError(f"{args.blueprint}: {e}")
+
+    store = QuestionStore(args.db)
+    try:
+        variants = assemble(store.candidate_pool(list(blueprint.types), blueprint.exclude_recent_days),
+                            blueprint, variants=args.variants, seed=args.seed)
+    except BlueprintError as e:
+        raise CommandError(f"{args.blueprint}: {e}")
+
+    extension = ".json" if args.json else ".enc"
+    names = [f"variant-{number}" for number in range(1, len(variants) + 1)]
+    for name, output, question_ids in zip(names, _output_paths(names, args.output, extension), variants):
+        questions = [question_from_bank_row(row).to_dict() for row in store.fetch_by_ids(question_ids)]
+        try:
+            if args.json:
+                with open(output, "w", encoding="utf-8") as f:
+                    json.dump(questions, f, indent=4, ensure_ascii=False)
+            else:
+                serialization.save_paper(output, questions, _read_passcode(args))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"{output}: {e}")
+        print(f"{output}: {len(questions)} questions, {sum(int(q['marks']) for q in questions)} marks")
+        # ** Usage is recorded per written paper so a later run's exclude window sees it
+        if not args.no_record:
+            store.record_usage(question_ids)
+
+
+def _time(value):
+    try:
+        return datetime.datetime.strptime(value, "%H:%M").strftime("%H:%M")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HH:MM, got {value!r}")
+
+
+def _threshold(value):
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = -1
+    if not 0 < threshold <= 1:
+        raise argparse.ArgumentTypeError(f"expected a number between 0 and 1, got {value!r}")
+    return threshold
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="brainy", description="Brainy Studio paper tools without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    decrypt = commands.add_parser("decrypt", help="decrypt a paper to JSON")
+    decrypt.add_argument("paper")
+    decrypt.add_argument("-o", "--output", help="JSON file to write (default: stdout)")
+    decrypt.set_defaults(func=cmd_decrypt)
+
+    pdf = commands.add_parser("pdf", help="render papers to PDF")
+    pdf.add_argument("papers", nargs="+")
+    pdf.add_argument("-o", "--output", help="PDF file, or folder when several papers are given")
+    pdf.add_argument("--subject", required=True, help="subject code from the subject database")
+    pdf.add_argument("--title", help="exam title (default: the subject name)")
+    pdf.add_argument("--date", default=datetime.date.today().strftime("%Y-%m-%d"), help="exam date, YYYY-MM-DD")
+    pdf.add_argument("--minutes-per-question", type=float, default=packaging.DEFAULT_MINUTES_PER_QUESTION)
+    pdf.add_argument("--enrollment", default="______", help="enrollment number printed on the paper")
+    pdf.add_argument("--answers", action="store_true", help="mark the correct answers")
+    pdf.add_argument("--no-header", action="store_true")
+    pdf.add_argument("--no-footer", action="store_true")
+    pdf.add_argument("--plain-text", action="store_true",
+                     help="print the question text as typed, without typesetting x^2, a_1, 3/4 or CO2")
+    pdf.add_argument("--roster", help="CSV or Excel roster; renders one shuffled paper per enrollment number into -o")
+    pdf.add_argument("--seed", type=int, help="shuffle seed for --roster (default: random, saved in the manifest)")
+    pdf.add_argument("--workers", type=int, default=None, help="worker processes for --roster (default: one per core)")
+    pdf.set_defaults(func=cmd_pdf)
+
+    excel = commands.add_parser("excel", help="export papers to Excel question banks")
+    excel.add_argument("papers", nargs="+")
+    excel.add_argument("-o", "--output", help="workbook, or folder when several papers are given")
+    excel.set_defaults(func=cmd_excel)
+
+    publish = commands.add_parser("publish", help="package a paper as a cloud exam and publish it")
+    publish.add_argument("paper")
+    publish.add_argument("--subject", required=True, help="subject code from the subject database")
+    publish.add_argument("--title", required=True, help="exam title")
+    publish.add_argument("--start", required=True, type=_time, help="registration start, HH:MM")
+    publish.add_argument("--end", required=True, type=_time, help="registration end and exam start, HH:MM")
+    publish.add_argument("--date", default=datetime.date.today().strftime("%d-%m-%Y"), help="exam date, DD-MM-YYYY")
+    publish.add_argument("--minutes-per-question", type=float, default=packaging.DEFAULT_MINUTES_PER_QUESTION)
+    publish.add_argument("--package-only", action="store_true",
+                         help="write the encrypted exam package without uploading or recording it")
+    publish.set_defaults(func=cmd_publish)
+
+    bank = commands.add_parser("bank", help="question bank tools")
+    bank_commands = bank.add_subparsers(dest="bank_command", required=True)
+    bank_import = bank_commands.add_parser("import", help="add or update question bank rows from an .xlsx or .csv sheet")
+    bank_import.add_argument("file")
+    bank_import.add_argument("--db", default=None, help="database to import into (default: the app database)")
+    bank_import.add_argument("--report", help="write the skipped rows and their problems to this CSV file")
+    bank_import.add_argument("--near-duplicates", choices=NEAR_DUPLICATE_MODES,
+                             help="skip rows similar to a bank question, or merge them into it")
+    bank_import.add_argument("--threshold", type=_threshold, default=DEFAULT_THRESHOLD,
+                             help=f"similarity at which rows count as near-duplicates (default {DEFAULT_THRESHOLD})")
+    bank_import.set_defaults(func=cmd_bank_import)
+
+    dedup = commands.add_parser("dedup", help="list groups of near-duplicate questions in the bank and papers")
+    dedup.add_argument("--workspace", action="append", default=[], metavar="FOLDER",
+                       help="also check every .enc paper under FOLDER (repeatable)")
+    dedup.add_argument("--no-bank", action="store_true", help="check only the workspace papers")
+    dedup.add_argument("--db", default=None, help="question bank database (default: the app database)")
+    dedup.add_argument("--threshold", type=_threshold, default=DEFAULT_THRESHOLD,
+                       help=f"estimated similarity, 0-1, at which questions are grouped (default {DEFAULT_THRESHOLD})")
+    dedup.set_defaults(func=cmd_dedup)
+
+    generate = commands.add_parser("generate", help="draw random papers from the question bank to a blueprint")
+    generate.add_argument("blueprint", help="JSON file with types, total_marks, tags, difficulty and exclude_recent_days")
+    generate.add_argument("-o", "--output", help="paper file, or folder when several variants are drawn")
+    generate.add_argument("--variants", type=int, default=1, help="number of distinct papers to draw (default 1)")
+    generate.add_argument("--seed", type=int, help="random seed, for repeatable draws")
+    generate.add_argument("--db", default=None, help="question bank database (default: the app database)")
+    generate.add_argument("--json", action="store_true", help="write plain JSON papers instead of encrypted .enc")
+    generate.add_argument("--no-record", action="store_true",
+                          help="do not mark the drawn questions as recently used")
+    generate.set_defaults(func=cmd_generate)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except CommandError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
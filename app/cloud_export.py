@@ -1,25 +1,18 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from tkcalendar import DateEntry
-import json
 import sqlite3
 import datetime
 from ui_components import Colors, PrimaryButton, LinkButton
 from create_paper import PasswordDialog
 import customtkinter as ctk
-from math import floor
-from random import random
-import base64
 from utils import getPath, centerWindow
 import os
 from PIL import Image
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import InvalidKey, InvalidTag
-from dropbox_backend import DropboxBackend
-from firebase_backend import FirebaseBackend
+from brainy_core import load_paper, total_marks, InvalidPasscode, PaperTampered
+from brainy_core.packaging import (build_exam_package, generate_access_code, generate_exam_id, publish_exam,
+                                   save_exam_record)
+from job_runner import run_with_progress
 from subject_db import SubjectManagerUI
 import sys
 
@@ -254,8 +247,8 @@ class CloudPublishUI(ctk.CTkFrame):
         self.calculate_total_marks()
     
     def calculate_total_marks(self):
-        total_marks = sum(int(q['marks']) for q in self.parsed_questions) if self.parsed_questions else 0
-        self.detail_labels['total_marks'].configure(text=str(total_marks))
+        marks = total_marks(self.parsed_questions) if self.parsed_questions else 0
+        self.detail_labels['total_marks'].configure(text=str(marks))
 
     def calculate_total_questions(self):
         total_questions = len(self.parsed_questions)
@@ -289,27 +282,32 @@ class CloudPublishUI(ctk.CTkFrame):
         self.update_status('time', valid)
 
     def decrypt_file(self, file_path):
-        pass_dialog = PasswordDialog(self, mode="decrypt")
+        pass_dialog = PasswordDialog(self, mode="decrypt", paper_path=file_path)
         self.wait_window(pass_dialog)
         
-        if pass_dialog.password:
-            try:
-                with open(file_path, "r") as f:
-                    encrypted_data = json.load(f)
-                
-                decrypted_text = self._decrypt_data(encrypted_data, pass_dialog.password)
-                if decrypted_text is None:
-                    messagebox.showerror("Error", "Invalid password or corrupted file!")
-                    return
-                
-                self.parsed_questions = json.loads(decrypted_text)
-                self.calculate_total_questions()
-                self.calculate_total_marks()
-                self.validate_file()
-                messagebox.showinfo("Success", "File decrypted successfully!")
-
-            except Exception as e:
-                messagebox.showerror("Error", f"Decryption failed: {str(e)}")
+        if not pass_dialog.password:
+            return
+
+        run_with_progress(
+            self, lambda job: load_paper(file_path, pass_dialog.password, job.report),
+            title="Decrypting", message="Decrypting question paper...",
+            on_done=self._on_decrypted, on_error=self._on_decrypt_failed
+        )
+
+    def _on_decrypted(self, questions):
+        self.parsed_questions = questions
+        self.calculate_total_questions()
+        self.calculate_total_marks()
+        self.validate_file()
+        messagebox.showinfo("Success", "File decrypted successfully!")
+
+    def _on_decrypt_failed(self, error):
+        if isinstance(error, InvalidPasscode):
+            messagebox.showerror("Error", "Invalid password or corrupted file!")
+        elif isinstance(error, PaperTampered):
+            messagebox.showerror("Paper Damaged", "This paper has been modified or is corrupted and cannot be opened.")
+        else:
+            messagebox.showerror("Error", f"Decryption failed: {str(error)}")
     
     def create_widgets(self):
         main_frame = ctk.CTkFrame(self.master, fg_color=Colors.Cards.BACKGROUND, corner_radius=12)
@@ -629,63 +627,6 @@ class CloudPublishUI(ctk.CTkFrame):
         )
         self.validate_time_window()
 
-    @staticmethod
-    def generate_exam_id():
-        idx = ""
-        characters = "123456789"
-
-        for i in range(4):
-            idx += characters[floor(random() * len(characters))]
-
-        return f"BS{idx}"
-
-    @staticmethod
-    def generate_access_code():
-        characters = "123456789"
-        access_code = ""
-
-        for i in range(4):
-            access_code += characters[floor(random() * len(characters))]
-
-        return f"CE{access_code}"
-    
-    @staticmethod
-    def remove_correct_answers(parsed_questions):
-        question_dict = {}
-
-        for index, question in enumerate(parsed_questions, start=1):
-            question_id = f"Q{index}" 
-            question_copy = question.copy()
-
-            if "correct" in question_copy:
-                question_copy.pop("correct")
-
-            question_dict[question_id] = question_copy
-
-        return question_dict
-
-    @staticmethod
-    def extract_correct_answers(parsed_questions):
-        correct_answers_dict = {}
-
-        for index, question in enumerate(parsed_questions, start=1):
-            if "correct" in question:
-                question_id = f"Q{index}"
-                correct_answers_dict[question_id] = question["correct"]
-
-        return correct_answers_dict
-
-    @staticmethod
-    def create_question_id_mapping(parsed_questions):
-        question_id_mapping = {}
-
-        for index, question in enumerate(parsed_questions, start=1):
-            if "id" in question:
-                question_id_mapping[f"Q{index}"] = question["id"]
-
-        return question_id_mapping
-
-
     def export_to_dropbox(self):
         if not all(self.valid_states.values()):
             missing = [k for k, v in self.valid_states.items() if not v]
@@ -701,150 +642,47 @@ class CloudPublishUI(ctk.CTkFrame):
             messagebox.showerror("Error", "Registration time window not set!")
             return
         
-        total_duration = round(self.time_duration_slider.get() * len(self.parsed_questions), 1)
         instructions = self.db_manager.get_instructions(self.subject_combo.get()).split("\n")
-        questions = self.remove_correct_answers(self.parsed_questions)
-        answers = self.extract_correct_answers(self.parsed_questions)
-        questions_blueprint = self.create_question_id_mapping(self.parsed_questions)
-        access_code = self.generate_access_code()
-        exam_id = self.generate_exam_id()
+        access_code = generate_access_code()
+        exam_id = generate_exam_id()
         exam_title = self.exam_title.get().upper()
         if exam_title == "":
             messagebox.showerror("Validation Error", "Exam title cannot be empty!")
             return
 
-        exam_paper = {
-            "brainy-studio": {
-                "version": "1.2.0 (beta)"
-            },
-            "auth_data": {
-                "exam-id": exam_id,
-                "access-code": access_code,
-                "registration_time": self.registration_times[0],
-                "registration_end_time": self.registration_times[1],
-                "registration_date": self.subject_date_picker.get_date().strftime("%d-%m-%Y")
-            },
-            "subject_details": {
-                "subject_name": self.detail_labels["subject_name"].cget("text"),
-                "subject_code": self.subject_combo.get(),
-                "time_duration": total_duration,
-                "registration_time": self.registration_times[0],
-                "registration_end_time": self.registration_times[1],
-                "exam_start_time": self.registration_times[1],
-                "instructions": instructions,
-                "subject_date": self.subject_date_picker.get_date().strftime("%d-%m-%Y"),
-                "total_marks": self.detail_labels["total_marks"].cget("text"),
-                "exam_title": exam_title
-            },
-            "questions": questions,
-            "question-mapping": questions_blueprint,
-            "answer-key": answers
-        }
+        registration_date = self.subject_date_picker.get_date().strftime("%d-%m-%Y")
+        exam_paper = build_exam_package(
+            self.parsed_questions, exam_id, access_code, exam_title,
+            subject_code=self.subject_combo.get(),
+            subject_name=self.detail_labels["subject_name"].cget("text"),
+            instructions=instructions,
+            minutes_per_question=self.time_duration_slider.get(),
+            registration_times=self.registration_times,
+            registration_date=registration_date
+        )
 
-        encrypted_data = self._encrypt_data(exam_paper, access_code)
         file_path = getPath(f"database\\CloudDB\\{exam_id}.enc")
-
-        with open(file_path, 'w') as f:
-            json.dump(encrypted_data, f)
-
-        with open(DBX_PATH, "r") as f:
-            data = json.load(f)
-
-        print(access_code, exam_id)
-
-        access_token = data["refresh_token"]
-        app_key = data["app_key"]
-        app_secret = data["app_secret"]
-        dbx_backend = DropboxBackend(refresh_token=access_token, app_key=app_key, app_secret=app_secret, root_path=getPath(r"database\CloudDB"))
         try:
-            upload_file = dbx_backend.upload_file(file_path, f"/uploads/{exam_id}.enc")
-            if upload_file:
-                result_link = FirebaseBackend()
-                try:
-                    created = result_link.create_exam(exam_id=exam_id, access_code=access_code, subject_details=exam_paper["subject_details"])
-                    if created:
-                        messagebox.showinfo("Paper Generated Successfully!", f"EXAM-ID: {exam_id}, \nACCESS-CODE: {access_code}")
-                        self.save_exam_record(
-                            exam_id=exam_id,
-                            access_code=access_code,
-                            subject_code=self.subject_combo.get(),
-                            exam_title=exam_title,
-                            reg_start=self.registration_times[0],
-                            reg_end=self.registration_times[1],
-                            reg_date=self.subject_date_picker.get_date().strftime("%d-%m-%Y")
-                        )
-                        return
-                except Exception as e:
-                        messagebox.showerror("Something Went Wrong!, Try Again Later!")
+            publish_exam(exam_paper, file_path, DBX_PATH, getPath(r"database\CloudDB"))
         except Exception as e:
             messagebox.showerror("Something Went Wrong!", f"{e}")
-        
-        return
-    
+            return
+
+        messagebox.showinfo("Paper Generated Successfully!", f"EXAM-ID: {exam_id}, \nACCESS-CODE: {access_code}")
+        self.save_exam_record(
+            exam_id=exam_id,
+            access_code=access_code,
+            subject_code=self.subject_combo.get(),
+            exam_title=exam_title,
+            reg_start=self.registration_times[0],
+            reg_end=self.registration_times[1],
+            reg_date=registration_date
+        )
+
     def save_exam_record(self, exam_id, access_code, subject_code, exam_title, reg_start, reg_end, reg_date):
-        db_path = getPath("database\\brainy-studio.db")
-        conn = sqlite3.connect(db_path)
-        
         try:
-            conn.execute('''
-                INSERT INTO exams (exam_id, access_code, subject_code, exam_title, 
-                                 registration_start, registration_end, registration_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (exam_id, access_code, subject_code, exam_title, reg_start, reg_end, reg_date))
-            
-            conn.commit()
+            save_exam_record(getPath("database\\brainy-studio.db"), exam_id, access_code, subject_code,
+                             exam_title, reg_start, reg_end, reg_date)
             messagebox.showinfo("Success", "Exam record saved successfully!")
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Failed to save exam record: {str(e)}")
-        finally:
-            conn.close()
-
-    def _derive_key(self, password, salt):
-        # ! Credits ! Tech with tim & Neuraline YT
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-            backend=default_backend()
-        )
-        return kdf.derive(password.encode())
-
-    def _encrypt_data(self, data, password):
-        salt = os.urandom(16)
-        key = self._derive_key(password, salt)
-        iv = os.urandom(16)
-
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-        encryptor = cipher.encryptor()
-
-        data_str = json.dumps(data)
-
-        pad_len = 16 - (len(data_str) % 16)
-        padded_data = data_str + chr(pad_len) * pad_len
-
-        ciphertext = encryptor.update(padded_data.encode()) + encryptor.finalize()
-
-        return {
-            'salt': base64.b64encode(salt).decode(),
-            'iv': base64.b64encode(iv).decode(),
-            'ciphertext': base64.b64encode(ciphertext).decode()
-        }
-
-
-    def _decrypt_data(self, encrypted_data, password):
-        # ! Credits ! Tech with tim & Neuraline YT
-        try:
-            salt = base64.b64decode(encrypted_data['salt'])
-            iv = base64.b64decode(encrypted_data['iv'])
-            ciphertext = base64.b64decode(encrypted_data['ciphertext'])
-            
-            key = self._derive_key(password, salt)
-            cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-            decryptor = cipher.decryptor()
-            
-            plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-            pad_len = plaintext[-1]
-            return plaintext[:-pad_len].decode()
-        except (InvalidKey, ValueError, InvalidTag):
-            return None
\ No newline at end of file
@@ -1,10 +1,9 @@
 import customtkinter as ctk
 import pyperclip
-import re
 from utils import centerWindow,getPath
 from PIL import Image
 import sys
-import json
+from codex_text import extra_symbols, format_super, to_unicode
 
 class Colors:
     PRIMARY = "#0F172A"
@@ -20,61 +19,6 @@ class Colors:
     BORDER = "#334155"
 
 
-# Unicode mappings
-sup_map = str.maketrans("0123456789+-=()nexyz", "⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾ⁿᴇˣʸᶻ")
-# sub_map = str.maketrans(
-#     "0123456789+-=()exnkrstuhvlampoi",
-#     "₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₑₓₙₖᵣₛₜᵤₕᵥₗₐₘₚₒᵢ"
-# )
-sub_map = str.maketrans(
-    "0123456789+-=()abcdefghijklmnopqrstuvwxyz",
-    "₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₐᵦ𝒸𝒹ₑ𝒻𝓰ₕᵢⱼₖₗₘₙₒₚ𝓺ᵣₛₜᵤᵥ𝓌ₓᵧ𝓏"
-)
-
-
-
-fractions = {
-    r"\b1/4\b": "¼", r"\b1/2\b": "½", r"\b3/4\b": "¾",
-    r"\b1/3\b": "⅓", r"\b2/3\b": "⅔", r"\b1/5\b": "⅕",
-    r"\b2/5\b": "⅖", r"\b3/5\b": "⅗", r"\b4/5\b": "⅘",
-    r"\b1/6\b": "⅙", r"\b5/6\b": "⅚", r"\b1/8\b": "⅛",
-    r"\b3/8\b": "⅜", r"\b5/8\b": "⅝", r"\b7/8\b": "⅞"
-}
-
-try:
-    FILEPATH = getPath(r"database\extras.json")
-    with open(FILEPATH, "r", encoding="utf-8") as f:
-        extra_symbols = json.load(f)["symbols"]
-    
-
-except Exception as e:
-    extra_symbols = {}
-
-symbols = {
-    "int": "∫",
-    "sqrt": "√",
-    "pi": "π",
-    "theta": "θ",
-    "alpha": "α",
-    "beta": "β",
-    "delta": "Δ",
-    "infinity": "∞",
-    "sum": "∑",
-    "d/dx": "∂/∂x",
-    "->": "→",
-    "~=": "≈",
-    "!=" : "≠",
-    "<=" : "≤",
-    ">=" : "≥",
-    "+-" : "±",
-    "therefore": "∴",
-    "e^x": "ᴇˣ",
-    "ln": "𝔬",
-    "log": "log"
-}
-symbols.update(extra_symbols)
-
-
 class CodexFormatter(ctk.CTkToplevel):
     def __init__(self, master=None):
         super().__init__(master)
@@ -147,67 +91,13 @@ class CodexFormatter(ctk.CTkToplevel):
         self.input_entry.focus_set()
 
     def format_expression(self):
-        text = self.input_entry.get()
-
-        # ** Handle fractions
-        for pattern, replacement in fractions.items():
-            text = re.sub(pattern, replacement, text)
-
-        # ** Handle predefined keywords
-        escaped_keys = [re.escape(k) for k in symbols.keys()]
-        text = re.sub(r"\b(" + "|".join(escaped_keys) + r")\b", lambda m: symbols[m.group(0)], text)
-
-        # ** Normalize spacing like 'sqrt (x)' → 'sqrt(x)'
-        text = re.sub(r"(sqrt|int|sum|log)\s+\(", lambda m: m.group(1) + "(", text)
-
-        # ** Superscripts (e.g. ^2, ^(x+1))
-        text = re.sub(r"\^(\([^\)]+\)|\w+)", lambda m: format_super(m.group(1).strip("()")), text)
-
-        # ** Subscripts (e.g. _2, _(12))
-        text = re.sub(r"_(\([^\)]+\)|\w+)", lambda m: format_sub(m.group(1).strip("()")), text)
-
-        # ** Chemistry-style element+number (e.g., CO2 → CO₂)
-        text = re.sub(r"([A-Za-z]{1,2})(\d+)", lambda m: m.group(1) + format_sub(m.group(2)), text)
-
-        # ** Handle log base e
-        text = re.sub(r"log_?e\((.*?)\)", r"ln(\1)", text)
-
-        text = re.sub(
-            r"(\w|\))\^(\(?-?\w+\)?)",
-            lambda m: m.group(1) + format_super(m.group(2).strip("()")),
-            text
-        )
-
-        # ** Handle derivatives like d/dx
-        text = re.sub(r"d/d([a-zA-Z])", r"∂/∂\1", text)
-
-        # ** Limits like lim{x->0}
-        # text = re.sub(r"lim_?\{?([a-zA-Z]+)->([^}]+)\}?", lambda m: f"lim{m.group(1).translate(sub_map)}→{m.group(2).translate(sub_map)}", text)
-        text = re.sub(
-    r"lim_?\{?\s*([a-zA-Z])\s*->\s*([^\}\s]+)\s*\}?",
-    lambda m: f"limit({format_sub(m.group(1))}→{format_sub(m.group(2))})",
-    text
-)
-
-        text = re.sub(
-            r"matrix\(\(([^()]+)\),\(([^()]+)\)\)",
-            lambda m: f"⎡{m.group(1)}⎤\n⎣{m.group(2)}⎦",
-            text
-        )
-
-        # ** Handle determinant pattern: det((1,2),(3,4))
-        text = re.sub(
-            r"det\(\(([^()]+)\),\(([^()]+)\)\)",
-            lambda m: f"|{m.group(1)}|\n|{m.group(2)}|",
-            text
-        )
-
-
+        # ** The conversion lives in codex_text, shared with the PDF typesetting
+        text = to_unicode(self.input_entry.get())
         self.output_entry.delete(0, ctk.END)
         self.output_entry.insert(0, text)
 
     def format_super_expression(self, text):
-        return text.translate(sup_map).replace(" ", "")
+        return format_super(text)
     
     def on_close(self):
         if self.parent is not None:
@@ -308,9 +198,3 @@ class CodexFormatter(ctk.CTkToplevel):
         pyperclip.copy(self.output_entry.get())
         self.copy_btn.configure(text="Copied! ✓")
         self.after(2000, lambda: self.copy_btn.configure(text="Copy to Clipboard"))
-
-def format_super(text):
-    return text.translate(sup_map).replace(" ", "")
-
-def format_sub(text):
-    return text.translate(sub_map).replace(" ", "")
@@ -0,0 +1,292 @@
+# ==========================================================
+#  * Module : codex_text.py - Codex Notation
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      The codex notation (x^2, a_1, 1/2, matrix((1,2),(3,4)),
+#      det(...), lim_{x->0}, d/dx, CO2 and the symbol keywords)
+#      read in one place, with no UI imports.
+#
+#      to_unicode() is the Codex Formatter popup's conversion to
+#      a single line of Unicode text. parse() reads the same
+#      notation into nodes that pdf_layout typesets with real
+#      baseline shifts, stacked fractions and bracketed
+#      matrices:
+#        ("run", text, shift)      : shift 0, 1 (superscript) or -1 (subscript)
+#        ("frac", numerator, denominator)
+#        ("under", text, nodes)    : nodes set under text, as in lim
+#        ("fence", kind, rows)     : "matrix" or "det"; rows of cells of nodes
+#      Question text is mostly prose, so parse() leaves English
+#      words alone: keywords only become symbols in call form,
+#      sqrt(x), or inside notation, x^(pi). A bare slash only
+#      stacks single digits (3/4); anything else needs both sides
+#      in parentheses, (x+1)/(y), so units, abbreviations and
+#      times (m/s, T/F, 24/7) stay as typed. A bare underscore
+#      takes one character after a one-letter base (a_1); longer
+#      subscripts need x_{ij} or x_(ij), so snake_case_name and
+#      file_name.txt stay as typed.
+# ==========================================================
+
+import json
+import re
+from functools import lru_cache
+from utils import getPath
+
+# Unicode mappings
+sup_map = str.maketrans("0123456789+-=()nexyz", "⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾ⁿᴇˣʸᶻ")
+sub_map = str.maketrans(
+    "0123456789+-=()abcdefghijklmnopqrstuvwxyz",
+    "₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₐᵦ𝒸𝒹ₑ𝒻𝓰ₕᵢⱼₖₗₘₙₒₚ𝓺ᵣₛₜᵤᵥ𝓌ₓᵧ𝓏"
+)
+
+fractions = {
+    "1/4": "¼", "1/2": "½", "3/4": "¾",
+    "1/3": "⅓", "2/3": "⅔", "1/5": "⅕",
+    "2/5": "⅖", "3/5": "⅗", "4/5": "⅘",
+    "1/6": "⅙", "5/6": "⅚", "1/8": "⅛",
+    "3/8": "⅜", "5/8": "⅝", "7/8": "⅞"
+}
+
+try:
+    FILEPATH = getPath(r"database\extras.json")
+    with open(FILEPATH, "r", encoding="utf-8") as f:
+        extra_symbols = json.load(f)["symbols"]
+except Exception:
+    extra_symbols = {}
+
+symbols = {
+    "int": "∫",
+    "sqrt": "√",
+    "pi": "π",
+    "theta": "θ",
+    "alpha": "α",
+    "beta": "β",
+    "delta": "Δ",
+    "infinity": "∞",
+    "sum": "∑",
+    "d/dx": "∂/∂x",
+    "->": "→",
+    "~=": "≈",
+    "!=" : "≠",
+    "<=" : "≤",
+    ">=" : "≥",
+    "+-" : "±",
+    "therefore": "∴",
+    "e^x": "ᴇˣ",
+    "ln": "𝔬",
+    "log": "log"
+}
+symbols.update(extra_symbols)
+
+ELEMENTS = frozenset("""
+    H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br Kr
+    Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb
+    Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr Rf
+    Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og
+""".split())
+
+
+def format_super(text):
+    return text.translate(sup_map).replace(" ", "")
+
+
+def format_sub(text):
+    return text.translate(sub_map).replace(" ", "")
+
+
+# ---------- Codex Formatter popup: plain Unicode ----------
+
+_FRACTION_CHARS = re.compile(r"\b(" + "|".join(re.escape(k) for k in fractions) + r")\b")
+_KEYWORDS = re.compile(r"\b(" + "|".join(re.escape(k) for k in symbols) + r")\b")
+_CALL_SPACING = re.compile(r"(sqrt|int|sum|log)\s+\(")
+_SUPER = re.compile(r"\^(\([^\)]+\)|\w+)")
+_SUB = re.compile(r"_(\([^\)]+\)|\w+)")
+_ELEMENT_DIGITS = re.compile(r"([A-Za-z]{1,2})(\d+)")
+_LOG_E = re.compile(r"log_?e\((.*?)\)")
+_SUPER_AFTER = re.compile(r"(\w|\))\^(\(?-?\w+\)?)")
+_DERIVATIVE = re.compile(r"d/d([a-zA-Z])")
+_LIMIT = re.compile(r"lim_?\{?\s*([a-zA-Z])\s*->\s*([^\}\s]+)\s*\}?")
+_MATRIX = re.compile(r"matrix\(\(([^()]+)\),\(([^()]+)\)\)")
+_DETERMINANT = re.compile(r"det\(\(([^()]+)\),\(([^()]+)\)\)")
+
+
+def to_unicode(text):
+    text = _FRACTION_CHARS.sub(lambda m: fractions[m.group(1)], text)
+    text = _KEYWORDS.sub(lambda m: symbols[m.group(0)], text)
+    text = _CALL_SPACING.sub(lambda m: m.group(1) + "(", text)
+    text = _SUPER.sub(lambda m: format_super(m.group(1).strip("()")), text)
+    text = _SUB.sub(lambda m: format_sub(m.group(1).strip("()")), text)
+    # ** Chemistry-style element+number (e.g., CO2 → CO₂)
+    text = _ELEMENT_DIGITS.sub(lambda m: m.group(1) + format_sub(m.group(2)), text)
+    text = _LOG_E.sub(r"ln(\1)", text)
+    text = _SUPER_AFTER.sub(lambda m: m.group(1) + format_super(m.group(2).strip("()")), text)
+    text = _DERIVATIVE.sub(r"∂/∂\1", text)
+    text = _LIMIT.sub(lambda m: f"limit({format_sub(m.group(1))}→{format_sub(m.group(2))})", text)
+    text = _MATRIX.sub(lambda m: f"⎡{m.group(1)}⎤\n⎣{m.group(2)}⎦", text)
+    text = _DETERMINANT.sub(lambda m: f"|{m.group(1)}|\n|{m.group(2)}|", text)
+    return text
+
+
+# ---------- typeset output: nodes ----------
+
+# ** The popup's plain-text stand-ins; typeset text has real scripts and fractions, and keeps ln as ln
+TEXT_ONLY = frozenset({"d/dx", "e^x", "ln", "log"})
+_operators = {key: value for key, value in symbols.items()
+              if not any(char.isalpha() for char in key) and key not in TEXT_ONLY}
+# ! Single letters (R, N, l) and words like "in" are ordinary text in a question, so none apply outside notation
+_words = {key: value for key, value in symbols.items()
+          if any(char.isalpha() for char in key) and len(key) > 1 and key not in TEXT_ONLY}
+
+_OPERATORS = re.compile("|".join(re.escape(k) for k in sorted(_operators, key=len, reverse=True)))
+_WORDS = re.compile(r"\b(" + "|".join(re.escape(k) for k in sorted(_words, key=len, reverse=True)) + r")\b")
+_CALLS = re.compile(r"\b(" + "|".join(re.escape(k) for k in sorted(_words, key=len, reverse=True)) + r")(?=\()")
+
+_STRUCTURES = re.compile(
+    r"(?P<fence>matrix|det)\(\s*(?P<rows>\([^()]*\)(?:\s*,\s*\([^()]*\))*)\s*\)"
+    r"|\blim(?:_|\s*)(?:[{(]\s*(?P<var>[A-Za-z])\s*->\s*(?P<to>[^{}()]+?)\s*[})]"
+    r"|(?P<bare_var>[A-Za-z])\s*->\s*(?P<bare_to>[^\s{}()]+))"
+    r"|\bd/d(?P<wrt>[A-Za-z])\b"
+    r"|(?<![\w/)\]^_.])(?P<num>\d)/(?P<den>\d)(?![\w/(]|\.\d)"
+    r"|(?<![\^_A-Za-z])\((?P<group_num>[^()]*)\)/\((?P<group_den>[^()]*)\)"
+)
+_SCRIPTS = re.compile(
+    r"\^(?:\((?P<sup_group>[^()]*)\)|\{(?P<sup_brace>[^{}]*)\}|(?P<sup>[-+]?[^\W_]+))"
+    r"|(?<=[^\W_)\]])_(?:\((?P<sub_group>[^()]*)\)|\{(?P<sub_brace>[^{}]*)\})"
+    r"|(?<![\w.@])(?P<sub_base>[A-Za-z])_(?P<sub>[^\W_])(?![\w@]|\.\w)"
+    r"|(?<!\w)(?P<formula>(?:[A-Z][a-z]?\d*|\((?:[A-Z][a-z]?\d*)+\)\d*)+)(?!\w)"
+)
+_FORMULA_PART = re.compile(r"([A-Z][a-z]?|[()])(\d*)")
+_ROW = re.compile(r"\(([^()]*)\)")
+_SPACE = re.compile(r"\s+")
+
+
+def _symbols(text, math=False):
+    text = _OPERATORS.sub(lambda m: _operators[m.group(0)], text)
+    if math:
+        return _WORDS.sub(lambda m: _words[m.group(1)], text)
+    return _CALLS.sub(lambda m: _words[m.group(1)], text)
+
+
+def _formula(text):
+    # ** Two or more element symbols with counts, CO2 or Fe2(SO4)3; single symbols (B12, Q1, A4) are left as they are
+    parts = _FORMULA_PART.findall(text)
+    elements = [element for element, _ in parts if element not in "()"]
+    if len(elements) < 2 or not any(count for _, count in parts) or not all(element in ELEMENTS for element in elements):
+        return [("run", text, 0)]
+    # ! Formulas never write a count of 1 or a leading 0, so H1N1 is a code
+    if any(count == "1" or count.startswith("0") for _, count in parts):
+        return [("run", text, 0)]
+    # ! All-caps codes (B2B, POP3, PS5) read as symbols too; such a formula needs H or O and repeats only C, H, O, N
+    if text.isupper():
+        repeated = {element for element in elements if elements.count(element) > 1}
+        if not {"H", "O"} & set(elements) or repeated - {"C", "H", "O", "N"}:
+            return [("run", text, 0)]
+    runs = []
+    for element, count in parts:
+        runs.append(("run", element, 0))
+        if count:
+            runs.append(("run", count, -1))
+    return runs
+
+
+def _inline(text, math=False):
+    text = _symbols(text, math)
+    nodes, position = [], 0
+    for match in _SCRIPTS.finditer(text):
+        if match.start() > position:
+            nodes.append(("run", text[position:match.start()], 0))
+        position = match.end()
+        if match.group("formula") is not None:
+            nodes.extend(_formula(match.group("formula")))
+            continue
+        if match.group("sub_base") is not None:
+            nodes.append(("run", match.group("sub_base"), 0))
+        shift = 1 if match.group(0)[0] == "^" else -1
+        script = next(group for group in match.group("sup_group", "sup_brace", "sup", "sub_group", "sub_brace", "sub")
+                      if group is not None)
+        nodes.append(("run", _symbols(script, math=True), shift))
+    if position < len(text):
+        nodes.append(("run", text[position:], 0))
+    return _merge(nodes)
+
+
+def _merge(nodes):
+    merged = []
+    for node in nodes:
+        if merged and node[0] == "run" and merged[-1][0] == "run" and merged[-1][2] == node[2]:
+            merged[-1] = ("run", merged[-1][1] + node[1], node[2])
+        elif node[0] != "run" or node[1]:
+            merged.append(node)
+    return merged
+
+
+def _math(text):
+    return tuple(_inline(text.strip(), math=True))
+
+
+def _structure(match):
+    if match.group("fence"):
+        rows = tuple(tuple(_math(cell) for cell in row.split(",")) for row in _ROW.findall(match.group("rows")))
+        return ("fence", match.group("fence"), rows)
+    if match.group("var") or match.group("bare_var"):
+        var = match.group("var") or match.group("bare_var")
+        to = match.group("to") if match.group("var") else match.group("bare_to")
+        return ("under", "lim", _math(f"{var} -> {to}"))
+    if match.group("wrt"):
+        return ("frac", (("run", "d", 0),), (("run", "d" + match.group("wrt"), 0),))
+    numerator = match.group("num") if match.group("num") is not None else match.group("group_num")
+    denominator = match.group("den") if match.group("den") is not None else match.group("group_den")
+    return ("frac", _math(numerator), _math(denominator))
+
+
+def _paragraph(text):
+    # ** Flat nodes, with None where the text may break; structures and scripts stay with the word they touch
+    flat, position = [], 0
+    for match in _STRUCTURES.finditer(text):
+        flat.extend(_breakable(text[position:match.start()]))
+        flat.append(_structure(match))
+        position = match.end()
+    flat.extend(_breakable(text[position:]))
+
+    words, word = [], []
+    for node in flat:
+        if node is None:
+            if word:
+                words.append(tuple(_merge(word)))
+            word = []
+        else:
+            word.append(node)
+    if word:
+        words.append(tuple(_merge(word)))
+    return tuple(words)
+
+
+def _breakable(text):
+    nodes = []
+    for node in _inline(text):
+        if node[0] == "run" and node[2] == 0:
+            for index, piece in enumerate(_SPACE.split(node[1])):
+                if index:
+                    nodes.append(None)
+                if piece:
+                    nodes.append(("run", piece, 0))
+        else:
+            nodes.append(node)
+    return nodes
+
+
+@lru_cache(maxsize=16384)
+def parse(text):
+    # ** Paragraphs (one per line of the text) of words, each word a tuple of nodes
+    return tuple(_paragraph(paragraph) for paragraph in str(text).split("\n"))
+
+
+@lru_cache(maxsize=16384)
+def plain_text(text):
+    # ** The text with symbols applied when it has no scripts or structures, else None
+    paragraphs = parse(text)
+    for paragraph in paragraphs:
+        for word in paragraph:
+            if len(word) != 1 or word[0][0] != "run" or word[0][2] != 0:
+                return None
+    return "\n".join(" ".join(word[0][1] for word in paragraph) for paragraph in paragraphs)
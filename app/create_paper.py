@@ -17,26 +17,21 @@
 
 import sys
 import tkinter as tk
-from ui_components import PrimaryButton, SearchButton, ErrorButton, Colors
+from ui_components import PrimaryButton, SearchButton, ErrorButton, Colors, SearchController, BatchBuilder
 import customtkinter as ctk
 from question_bank import QuestionBank
+from paper_generator import BlueprintDialog
 from tkinter import filedialog, messagebox
 from utils import getPath, centerWindow
 from PIL import Image
-import json
 import os
-import random
-import string
-import base64
-import threading
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import InvalidKey, InvalidTag
+from brainy_core import load_paper, save_paper, Paper, Question, QUESTION_TYPES, InvalidPasscode, PaperTampered
+from brainy_core.crypto import verify_passcode
+from brainy_core.model import format_paper_errors, generate_question_id, question_from_bank_row
+from job_runner import run_with_progress, runner
 
 class PasswordDialog(ctk.CTkToplevel):
-    def __init__(self, parent, mode="encrypt"):
+    def __init__(self, parent, mode="encrypt", paper_path=None):
         super().__init__(parent)
         self.attributes("-topmost", True)
         try:
@@ -55,6 +50,8 @@ class PasswordDialog(ctk.CTkToplevel):
         self.configure(fg_color=Colors.BACKGROUND)
 
         self.password = None
+        self.paper_path = paper_path
+        self.checking = False
         
         container = ctk.CTkFrame(self, fg_color="transparent")
         container.pack(padx=20, pady=15, fill="both", expand=True)
@@ -100,6 +97,11 @@ class PasswordDialog(ctk.CTkToplevel):
                                          state="disabled")
         self.confirm_btn.pack(pady=(20, 0))
 
+        self.error_label = ctk.CTkLabel(container, text="",
+                                        font=("Segoe UI", 12),
+                                        text_color=Colors.DANGER)
+        self.error_label.pack(pady=(10, 0))
+
         self.grab_set()
 
         self.after(100, lambda: self.digit_entries[0].focus_set())
@@ -117,32 +119,68 @@ class PasswordDialog(ctk.CTkToplevel):
                 self.digit_entries[idx - 1].delete(0, "end")
 
         passcode = "".join(entry.get() for entry in self.digit_entries)
-        if len(passcode) == 4 and passcode.isdigit():
+        if len(passcode) == 4 and passcode.isdigit() and not self.checking:
             self.confirm_btn.configure(state="normal")
         else:
             self.confirm_btn.configure(state="disabled")
 
     def on_confirm(self):
-        self.password = "".join(entry.get() for entry in self.digit_entries)
+        password = "".join(entry.get() for entry in self.digit_entries)
+        if self.checking:
+            return
+        if not self.paper_path:
+            self.password = password
+            self.destroy()
+            return
+        # ** The key check costs a full key derivation, so it runs on the job runner; the derived key is
+        # ** cached, so the load that follows does not pay for it again
+        self.checking = True
+        self.confirm_btn.configure(state="disabled")
+        self.error_label.configure(text="Checking passcode...", text_color=Colors.Texts.HEADERS)
+        runner.submit(self, self._check_passcode, password,
+                      on_done=lambda rejected: self._on_passcode_checked(password, rejected),
+                      on_error=lambda e: self._on_passcode_checked(password, False))
+
+    def _check_passcode(self, job, password):
+        # ** Only papers with a key check can be refused here; older ones fail later while decrypting
+        try:
+            return verify_passcode(self.paper_path, password) is False
+        except (OSError, ValueError):
+            return False
+
+    def _on_passcode_checked(self, password, rejected):
+        if not self.winfo_exists():
+            return
+        self.checking = False
+        if rejected:
+            self.error_label.configure(text="Incorrect passcode. Please try again.", text_color=Colors.DANGER)
+            for entry in self.digit_entries:
+                entry.delete(0, "end")
+            self.digit_entries[0].focus_set()
+            return
+        self.password = password
         self.destroy()
 
 class QuestionFrame(ctk.CTkFrame):
-    def __init__(self, master, **kwargs):
+    SUMMARY_LENGTH = 90
+
+    def __init__(self, master, question, collapsed=False, on_change=None, **kwargs):
         super().__init__(master, **kwargs)
         self.configure(fg_color=Colors.Cards.BACKGROUND, corner_radius=10, border_width=2, border_color=Colors.Cards.BORDER)
         self.delete_mode = False
         self.master = master
-        self.question_id = None
-        self.question_type = "MCQ"
+        # ** The frame edits this Question in place; every change in the widgets is written straight back to it
+        self.question = question
+        self.on_change = on_change
         self.normal_border = Colors.Cards.BORDER
         self.error_border = Colors.DANGER
         self.option_entries = [] 
         self.answer_vars = []     
         self.correct_answer_var = ctk.StringVar()
-        self._create_widgets()
-        self._add_input_validation()
+        # ** Set while the widgets are being filled from the question, so half-filled widgets are not synced back
+        self._loading = False
+        self.summary_frame = None
 
-    def _create_widgets(self):
         self.grid_columnconfigure(0, minsize=40, weight=0)
         self.grid_columnconfigure(1, weight=1)
 
@@ -151,6 +189,58 @@ class QuestionFrame(ctk.CTkFrame):
         self.select_checkbox.grid(row=0, column=0, padx=10, pady=5, sticky="nsew")
         self.select_checkbox.grid_remove()
 
+        if collapsed:
+            self._create_summary()
+        else:
+            self._create_editor()
+
+    @property
+    def question_id(self):
+        return self.question.id
+
+    @property
+    def question_type(self):
+        return self.question.type
+
+    @property
+    def collapsed(self):
+        return self.summary_frame is not None
+
+    def _create_summary(self):
+        # ** A one-line stand-in with a handful of widgets instead of the full editor's few dozen
+        question = self.question
+        text = " ".join(question.text.split())
+        if len(text) > self.SUMMARY_LENGTH:
+            text = text[:self.SUMMARY_LENGTH] + "..."
+
+        self.summary_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.summary_frame.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
+        summary_label = ctk.CTkLabel(self.summary_frame, text=f"{question.type}  |  {question.marks} marks  |  {text}",
+                                     anchor="w", text_color=Colors.Inputs.TEXT, font=("DejaVuSans", 14))
+        summary_label.pack(side="left", fill="x", expand=True, padx=5, pady=8)
+        edit_label = ctk.CTkLabel(self.summary_frame, text="Click to edit", text_color=Colors.Inputs.PLACEHOLDER,
+                                  font=("DejaVuSansCondensed-BoldOblique", 12, "italic"))
+        edit_label.pack(side="right", padx=10)
+        for widget in (self.summary_frame, summary_label, edit_label):
+            widget.bind("<Button-1>", self.expand)
+
+    def expand(self, event=None):
+        if not self.collapsed:
+            return
+        self.summary_frame.destroy()
+        self.summary_frame = None
+        self._create_editor()
+
+    def _create_editor(self):
+        self._loading = True
+        try:
+            self._create_widgets()
+            self._add_input_validation()
+            self.load_question()
+        finally:
+            self._loading = False
+
+    def _create_widgets(self):
         self.details_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.details_frame.grid(row=0, column=1, padx=5, pady=5, sticky="nsew")
         self.details_frame.grid_columnconfigure(0, weight=1)
@@ -198,6 +288,7 @@ class QuestionFrame(ctk.CTkFrame):
             self.setup_truefalse_options()
         elif q_type == "One Word":
             self.setup_oneword_options()
+        self.sync_question()
 
     def setup_mcq_options(self):
         self.option_entries = []
@@ -246,10 +337,13 @@ class QuestionFrame(ctk.CTkFrame):
             )
             entry.pack(side="left", fill="x", expand=True, padx=(0, 8))
             entry.bind("<KeyRelease>", lambda e, idx=i: self.update_option_state(idx))
+            entry.bind("<KeyRelease>", self.sync_question, add="+")
 
             self.option_entries.append(entry)
             self.answer_vars.append(rb)
 
+        self.correct_answer_var.trace_add("write", self.sync_question)
+
     def __del__(self):
         if hasattr(self, 'correct_answer_var'):
             del self.correct_answer_var
@@ -287,18 +381,25 @@ class QuestionFrame(ctk.CTkFrame):
 
     def setup_truefalse_options(self):
         self.tf_var = ctk.StringVar(value="True")
+        self.tf_var.trace_add("write", self.sync_question)
         ctk.CTkRadioButton(self.options_container, text="True", variable=self.tf_var, value="True").pack(anchor="w", pady=2)
         ctk.CTkRadioButton(self.options_container, text="False", variable=self.tf_var, value="False").pack(anchor="w", pady=2)
 
     def setup_oneword_options(self):
         self.answer_entry = ctk.CTkEntry(self.options_container, placeholder_text="Correct Answer", fg_color=Colors.Inputs.BACKGROUND, text_color=Colors.Inputs.TEXT, placeholder_text_color=Colors.Inputs.PLACEHOLDER, border_color=Colors.Inputs.BORDER)
         self.answer_entry.pack(fill="x", pady=5)
+        self.answer_entry.bind("<KeyRelease>", self.sync_question, add="+")
 
     def _add_input_validation(self):
         self.marks_entry.configure(validate="key", validatecommand=(self.register(self._validate_marks), "%P"))
         self.question_text.bind("<KeyRelease>", lambda e: self._clear_error_highlight(self.question_text))
         self.tag_entry.bind("<KeyRelease>", lambda e: self._clear_error_highlight(self.tag_entry))
+        self.question_text.bind("<KeyRelease>", self.sync_question, add="+")
+        # ** Pasting with the mouse fires no key event
+        self.question_text.bind("<FocusOut>", self.sync_question, add="+")
+        self.tag_entry.bind("<KeyRelease>", self.sync_question, add="+")
         self.marks_entry.bind("<KeyRelease>", lambda e: self._clear_error_highlight(self.marks_entry))
+        self.marks_entry.bind("<KeyRelease>", self.sync_question, add="+")
   
         if hasattr(self, 'answer_entry'):
             self.answer_entry.bind("<KeyRelease>", lambda e: self._clear_error_highlight(self.answer_entry))
@@ -322,65 +423,78 @@ class QuestionFrame(ctk.CTkFrame):
         else:
             widget.configure(border_color=self.normal_border)
 
-    def validate_fields(self):
-        errors = []
-        question_text = self.question_text.get("1.0", "end-1c").strip()
-        if not question_text:
-            errors.append("Question text cannot be empty")
-            self._highlight_error(self.question_text)
-        
+    def _error_widget(self, field):
+        if field.startswith("option:"):
+            return self.option_entries[int(field.split(":")[1])]
+        if field == "correct":
+            return self.mcq_container if self.question_type == "MCQ" else self.answer_entry
+        return {"text": self.question_text, "marks": self.marks_entry, "tags": self.tag_entry}.get(field)
+
+    def show_errors(self):
+        # ** Opens a collapsed frame and highlights the widget behind each problem; returns the messages
+        errors = self.question.validate()
+        if errors:
+            self.expand()
+        for field, message in errors:
+            widget = self._error_widget(field)
+            if widget is not None:
+                self._highlight_error(widget)
+        return [message for _, message in errors]
+
+    def load_question(self):
+        # ** Model to widgets; only called on freshly built, empty widgets
+        question = self.question
+        self.question_text.insert("1.0", question.text)
+        self.tag_entry.insert(0, question.tags)
+        if question.marks is not None:
+            self.marks_entry.insert(0, str(question.marks))
+
+        self.type_combobox.set(question.type)
+        self.setup_question_type(question.type)
+        if question.type == "MCQ":
+            for i, option in enumerate(question.options):
+                if i < len(self.option_entries):
+                    self.option_entries[i].insert(0, option)
+                    self.update_option_state(i)
+
+            try:
+                correct_idx = question.options.index(question.correct)
+                self.correct_answer_var.set(str(correct_idx))
+            except ValueError:
+                self.correct_answer_var.set("")
+
+        elif question.type == "True/False":
+            self.tf_var.set(question.correct)
+        elif question.type == "One Word":
+            self.answer_entry.insert(0, question.correct)
+
+    def sync_question(self, *args):
+        # ** Widgets to model, on every edit
+        if self._loading or self.collapsed:
+            return
+        question = self.question
+        question.text = self.question_text.get("1.0", "end-1c").strip()
+        question.tags = self.tag_entry.get().strip()
         marks = self.marks_entry.get().strip()
-        if not marks:
-            errors.append("Marks cannot be empty")
-            self._highlight_error(self.marks_entry)
-        elif not marks.isdigit():
-            errors.append("Marks must be a valid number")
-            self._highlight_error(self.marks_entry)
-
-        if self.question_type == "MCQ":
-            if not self.correct_answer_var.get():
-                errors.append("Please select correct answer")
-                self._highlight_error(self.mcq_container)
-            for i, entry in enumerate(self.option_entries):
-                if not entry.get().strip():
-                    errors.append(f"Option {i+1} cannot be empty")
-                    self._highlight_error(entry)
-        elif self.question_type == "One Word":
-            answer = self.answer_entry.get().strip()
-            if not answer:
-                errors.append("Correct answer cannot be empty")
-                self._highlight_error(self.answer_entry)
-        
-        if not self.tag_entry.get().strip():
-            errors.append("At least one tag is required")
-            self._highlight_error(self.tag_entry)
-        
-        return errors
-
-    def get_data(self):
-        data = {
-            "id": self.question_id,
-            "type": self.question_type,
-            "text": self.question_text.get("1.0", "end-1c").strip(),
-            "tags": self.tag_entry.get().strip(),
-            "marks": self.marks_entry.get().strip(),
-        }
-        if self.question_type == "MCQ":
-            data["options"] = [entry.get().strip() for entry in self.option_entries]
+        question.marks = int(marks) if marks.isdigit() else None
+        if question.type == "MCQ":
+            question.options = [entry.get().strip() for entry in self.option_entries]
             try:
-                selected_idx = int(self.correct_answer_var.get())
-                data["correct"] = data["options"][selected_idx]
+                question.correct = question.options[int(self.correct_answer_var.get())]
             except (ValueError, IndexError):
-                data["correct"] = ""
-        elif self.question_type == "True/False":
-            data["correct"] = self.tf_var.get()
-        elif self.question_type == "One Word":
-            data["correct"] = self.answer_entry.get().strip()
-        errors = self.validate_fields()
-        return data, errors
+                question.correct = ""
+        elif question.type == "True/False":
+            question.correct = self.tf_var.get()
+        elif question.type == "One Word":
+            question.correct = self.answer_entry.get().strip()
+        if self.on_change:
+            self.on_change(question)
+
+    def matches(self, query):
+        return self.question.matches(query)
 
     def update_question_type(self, choice):
-        self.question_type = choice
+        self.question.type = choice
         self.setup_question_type(choice)
 
     def set_delete_mode(self, mode):
@@ -392,7 +506,9 @@ class CreatePaper(ctk.CTkFrame):
     def __init__(self, master, edit_mode=False, file_path=None, parent=None):
         super().__init__(master)
         self.configure(fg_color="transparent")
+        self.paper = Paper()
         self.question_frames = []
+        self.frame_builder = None
         self.delete_mode = False
         self.current_search_query = ""
         self.file_path = file_path
@@ -418,18 +534,23 @@ class CreatePaper(ctk.CTkFrame):
         PrimaryButton(control_frame, text="Save Paper", command=self.save_paper, width=130, height=42,
                       image=ctk.CTkImage(light_image=Image.open(getPath("assets\\images\\save.png")), size=(20, 20))).pack(side="left", padx=5)
         PrimaryButton(control_frame, text="Question Bank", command=self.open_question_bank, width=130, height=42).pack(side="left", padx=5)
+        PrimaryButton(control_frame, text="Generate Paper", command=self.generate_paper, width=130, height=42).pack(side="left", padx=5)
         ErrorButton(control_frame, text="Delete Questions", command=self.toggle_delete_mode, width=130, height=42,
                     image=ctk.CTkImage(light_image=Image.open(getPath("assets\\images\\delete.png")), size=(20, 20))).pack(side="left", padx=5)
 
         search_frame = ctk.CTkFrame(control_frame, fg_color="transparent")
         search_frame.pack(side="right", padx=10, pady=10)
+
+        self.totals_label = ctk.CTkLabel(control_frame, text="", text_color=Colors.Texts.HEADERS,
+                                         font=("DejaVuSansCondensed-Bold", 14, "bold"))
+        self.totals_label.pack(side="right", padx=10)
         
         self.search_input = ctk.CTkEntry(search_frame, placeholder_text="Search...", width=230, height=42,
                                          fg_color=Colors.Inputs.BACKGROUND,
                                         border_color=Colors.Inputs.BORDER,
                                         placeholder_text_color=Colors.Inputs.PLACEHOLDER)
         self.search_input.pack(side="left", padx=5, expand=True)
-        self.search_input.bind("<KeyRelease>", lambda e: self.perform_search())
+        self.search_controller = SearchController(self.search_input, self.perform_search)
         # self.search_input.pack_propagate(False)
         # SearchButton(search_frame, text="", image=ctk.CTkImage(light_image=Image.open(getPath("assets\\images\\search.png")), size=(30, 30)), command=self.perform_search,width=110, height=42).pack(side="left", padx=5)  
 
@@ -442,132 +563,154 @@ class CreatePaper(ctk.CTkFrame):
             self.load_paper() 
 
     def load_paper_from_recent_projects(self, filepath):
-        if os.path.exists(filepath):
-            pswd = PasswordDialog(self, mode="decrypt")
-            self.wait_window(pswd)
-
-            with open(filepath, "r") as fp:
-                encrypted_data = json.load(fp)
-
-            if pswd.password:
-                    decrypted_data = self._decrypt_data(encrypted_data, pswd.password)
-                    if decrypted_data:
-                        questions = json.loads(decrypted_data)
-                        self._load_questions(questions)
-                        messagebox.showinfo("Question Added", "Questions Loaded Successfully!")
-                        return
-            
-            messagebox.showerror("Incorrect Password", "The given password is incorrect!")
+        if not os.path.exists(filepath):
+            messagebox.showerror("File Not Found", "The file may be deleted or moved by user!")
             self.after(0, lambda: self.parent.redirect("home-page"))
             return
-        
-        messagebox.showerror("File Not Found", "The file may be deleted or moved by user!")
-        self.after(0, lambda: self.parent.redirect("home-page"))
-
+        # ** Opened from the home page, so a paper that does not open sends the user back there
+        self.handle_password(filepath, on_closed=lambda: self.after(0, lambda: self.parent.redirect("home-page")))
 
     def open_question_bank(self):
         self.parent.attributes("-topmost", False)
         QuestionBank(self.parent, parent=self)
         return
     
-    def generate_question_id(self):
-        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    
-    def _derive_key(self, password, salt):
-        # ! Credits ! Tech with tim & Neuraline YT
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-            backend=default_backend()
-        )
-        return kdf.derive(password.encode())
+    def generate_paper(self):
+        self.parent.attributes("-topmost", False)
+        BlueprintDialog(self.parent, on_generated=self._on_paper_generated)
+
+    def _on_paper_generated(self, variants):
+        # ** The first variant opens here; with several, every variant is also saved as its own paper
+        first = [question_from_bank_row(row).to_dict() for row in variants[0]]
+        if len(self.paper) and not messagebox.askyesno(
+                "Generate Paper", "Replace the questions in this paper with the generated ones?\n\nChoose No to add them after the current questions."):
+            self.add_questions_from_bank(variants[0])
+        else:
+            self._load_questions(first)
+        if len(variants) > 1:
+            self._save_variants(variants)
 
-    def _encrypt_data(self, data, password):
-        salt = os.urandom(16)
-        key = self._derive_key(password, salt)
-        iv = os.urandom(16)
-        
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-        encryptor = cipher.encryptor()
-        
-        padded_data = data + (16 - len(data) % 16) * chr(16 - len(data) % 16)
-        ciphertext = encryptor.update(padded_data.encode()) + encryptor.finalize()
-        
-        return {
-            'salt': base64.b64encode(salt).decode(),
-            'iv': base64.b64encode(iv).decode(),
-            'ciphertext': base64.b64encode(ciphertext).decode()
-        }
-
-    def _decrypt_data(self, encrypted_data, password):
-        # ! Credits ! Tech with tim & Neuraline YT
-        try:
-            salt = base64.b64decode(encrypted_data['salt'])
-            iv = base64.b64decode(encrypted_data['iv'])
-            ciphertext = base64.b64decode(encrypted_data['ciphertext'])
-            
-            key = self._derive_key(password, salt)
-            cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-            decryptor = cipher.decryptor()
-            
-            plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-            pad_len = plaintext[-1]
-            return plaintext[:-pad_len].decode()
-        except (InvalidKey, ValueError, InvalidTag):
-            return None
+    def _save_variants(self, variants):
+        pass_dialog = PasswordDialog(self, mode="encrypt")
+        self.wait_window(pass_dialog)
+        if not pass_dialog.password:
+            return
+        folder = filedialog.askdirectory(title="Save Paper Variants To")
+        if not folder:
+            return
 
+        def save_all(job):
+            paths = []
+            for number, rows in enumerate(variants, start=1):
+                path = os.path.join(folder, f"variant-{number}.enc")
+                save_paper(path, [question_from_bank_row(row).to_dict() for row in rows], pass_dialog.password)
+                paths.append(path)
+                job.report(number, len(variants))
+            return paths
+
+        run_with_progress(
+            self, save_all, title="Saving Variants", message=f"Saving {len(variants)} papers...",
+            on_done=lambda paths: messagebox.showinfo("Success", f"{len(paths)} paper variants saved to {folder}"),
+            on_error=lambda e: messagebox.showerror("Error", f"Save failed:\n{str(e)}")
+        )
+
+    def generate_question_id(self):
+        return generate_question_id()
+    
     def add_question(self):
-        qf = QuestionFrame(self.workspace)
-        qf.question_id = self.generate_question_id()
+        question = Question(id=self.generate_question_id(), type="MCQ", text="", tags="")
+        self.paper.append(question)
+        qf = QuestionFrame(self.workspace, question, on_change=self.update_totals)
+        qf.set_delete_mode(self.delete_mode)
         self.question_frames.append(qf)
         qf.pack(fill="x", pady=5, padx=5)
+        self.update_totals()
         self.perform_search()
 
+    def _add_question_frames(self, questions, title="Adding Questions", on_done=None, on_cancel=None):
+        # ** The questions are already in self.paper; only their frames are built, collapsed, a batch per
+        # ** event-loop turn, so a big paper never freezes the window
+        def build(question):
+            qf = QuestionFrame(self.workspace, question, collapsed=True, on_change=self.update_totals)
+            qf.set_delete_mode(self.delete_mode)
+            self.question_frames.append(qf)
+            if qf.matches(self.current_search_query):
+                qf.pack(fill="x", pady=5, padx=5)
+
+        def finished(built):
+            if self.frame_builder is builder:
+                self.frame_builder = None
+            if built < len(questions):
+                if on_cancel:
+                    on_cancel(questions[built:])
+            elif on_done:
+                on_done(built)
+
+        if self.frame_builder is not None:
+            # ! One build at a time: the running one stops, and its finished() still drops what it never built
+            self.frame_builder.cancel()
+        self.update_totals()
+        builder = self.frame_builder = BatchBuilder(self, questions, build, on_done=finished, title=title,
+                                                    message=f"Adding {len(questions)} questions...")
+
+    def _drop_unbuilt(self, questions):
+        # ** A cancelled add keeps only the questions that got a frame, so the paper matches the workspace
+        self.paper.remove(questions)
+        self.update_totals()
+
+    def update_totals(self, question=None):
+        self.totals_label.configure(text=f"{len(self.paper)} questions  |  {self.paper.total_marks()} marks")
+
     def toggle_delete_mode(self):
         self.delete_mode = not self.delete_mode
         for qf in self.question_frames: qf.set_delete_mode(self.delete_mode)
         if not self.delete_mode:
-            for qf in self.workspace.winfo_children():
-                if isinstance(qf, QuestionFrame) and qf.is_selected():
-                    qf.destroy()
-            self.question_frames = [child for child in self.workspace.winfo_children() if isinstance(child, QuestionFrame)]
+            selected = [qf for qf in self.question_frames if qf.is_selected()]
+            self.paper.remove([qf.question for qf in selected])
+            for qf in selected:
+                qf.destroy()
+            self.question_frames = [qf for qf in self.question_frames if qf not in selected]
+            self.update_totals()
             self.perform_search()
 
-    def perform_search(self):
-        self.current_search_query = self.search_input.get().strip().lower()
-        for qf in self.workspace.winfo_children():
-            if isinstance(qf, QuestionFrame):
+    def perform_search(self, query=None):
+        if query is None:
+            query = self.search_input.get().strip().lower()
+        self.current_search_query = query
+
+        # ** Only frames whose visibility changes are packed or forgotten; the rest stay where they are
+        wanted = [(qf, qf.matches(query)) for qf in self.question_frames]
+        for qf, show in wanted:
+            if not show and qf.winfo_manager():
                 qf.pack_forget()
-        
-        for qf in self.question_frames:
-            data, _ = qf.get_data()
-            question_text = data['text'].lower()
-            tags = data['tags'].lower()
-            correct_answer = data.get('correct', '').lower()
-            tag_list = [tag.strip() for tag in tags.split(',')]
-            
-            text_match = self.current_search_query in question_text
-            tag_match = any(self.current_search_query in tag.lower() for tag in tag_list)
-            answer_match = self.current_search_query in correct_answer
-            
-            if not self.current_search_query or text_match or tag_match or answer_match:
-                qf.pack(fill="x", pady=5, padx=5)
 
-    def save_paper(self):
-        all_questions = []
-        all_errors = []
-        for idx, qf in enumerate(self.question_frames, 1):
-            data, errors = qf.get_data()
-            if errors: 
-                all_errors.append(f"Question {idx}:\n" + "\n".join([f" • {e}" for e in errors]))
-            elif data: 
-                all_questions.append(data)
+        following = None
+        for qf, show in reversed(wanted):
+            if not show:
+                continue
+            if not qf.winfo_manager():
+                if following is not None:
+                    qf.pack(fill="x", pady=5, padx=5, before=following)
+                else:
+                    qf.pack(fill="x", pady=5, padx=5)
+            following = qf
 
+    def save_paper(self):
+        if self.frame_builder is not None:
+            messagebox.showwarning("Please Wait", "Questions are still being added to the workspace.\n"
+                                   "Save the paper once they are all in place.")
+            return
+        all_errors = self.paper.errors()
         if all_errors:
-            messagebox.showerror("Validation Errors", "Cannot save:\n\n" + "\n\n".join(all_errors))
+            # ** Frames are found by their question, not by position, so the two orders never need to agree
+            frames = {id(qf.question): qf for qf in self.question_frames}
+            for idx, _ in all_errors:
+                qf = frames.get(id(self.paper[idx - 1]))
+                if qf is not None:
+                    qf.show_errors()
+            messagebox.showerror("Validation Errors", "Cannot save:\n\n" + format_paper_errors(all_errors))
             return
+        all_questions = self.paper.to_dicts()
 
         pass_dialog = PasswordDialog(self, mode="encrypt")
         self.wait_window(pass_dialog)
@@ -584,21 +727,14 @@ class CreatePaper(ctk.CTkFrame):
         if not file_path:
             return
     
-        def save_thread():
-            try:
-                json_data = json.dumps(all_questions, indent=4)
-                encrypted_data = self._encrypt_data(json_data, pass_dialog.password)
-
-                with open(file_path, 'w') as f:
-                    json.dump(encrypted_data, f)
-
-                self.after(0, lambda: messagebox.showinfo("Success", "Paper encrypted and saved successfully!"))
-                self.after(0, lambda: self.parent.redirect("home-page"))
+        def on_saved(_):
+            messagebox.showinfo("Success", "Paper encrypted and saved successfully!")
+            self.parent.redirect("home-page")
 
-            except Exception as error:
-                self.after(0, lambda e=error: messagebox.showerror("Error", f"Save failed:\n{str(e)}"))
-
-        threading.Thread(target=save_thread, daemon=True).start()
+        runner.submit(
+            self, lambda job: save_paper(file_path, all_questions, pass_dialog.password),
+            on_done=on_saved, on_error=lambda e: messagebox.showerror("Error", f"Save failed:\n{str(e)}")
+        )
 
     def load_paper(self):
         file_path = filedialog.askopenfilename(
@@ -608,138 +744,81 @@ class CreatePaper(ctk.CTkFrame):
         if not file_path:
             return
         
-        def load_thread():
-            try:
-                with open(file_path, 'r') as f:
-                    encrypted_data = json.load(f)
-                
-                self.after(0, self.handle_password, encrypted_data)
-                
-            except Exception as e:
-                error = messagebox.askretrycancel("Error", f"Load failed:\n{str(e)}")
-                if error:
-                    self.after(0, self.load_paper())
-        
-        threading.Thread(target=load_thread, daemon=True).start()
+        self.handle_password(file_path)
 
-    def handle_password(self, encrypted_data):
-        pass_dialog = PasswordDialog(self, mode="decrypt")
+    def handle_password(self, file_path, on_closed=None):
+        # ** Decryption and the key derivation run on the job runner; on_closed runs when no paper was opened
+        pass_dialog = PasswordDialog(self, mode="decrypt", paper_path=file_path)
         self.wait_window(pass_dialog)
         
         if not pass_dialog.password:
+            if on_closed:
+                on_closed()
             return
-        
-        def decrypt_thread():
-            try:
-                decrypted_data = self._decrypt_data(encrypted_data, pass_dialog.password)
-                if not decrypted_data:
-                    raise ValueError("Invalid passcode")
-                
-                questions = json.loads(decrypted_data)
-                self.after(0, lambda: self._load_questions(questions))
-                self.after(0, lambda: messagebox.showinfo("Success", "Paper loaded successfully!"))
-                
-            except Exception as e:
-                self.after(0, lambda e=e: messagebox.showerror("Error", f"Load failed:\n{str(e)}"))
-        
-        threading.Thread(target=decrypt_thread, daemon=True).start()
 
-    def _load_questions(self, questions_data):
+        def on_loaded(questions):
+            self._load_questions(questions, on_done=lambda built: messagebox.showinfo(
+                "Success", "Paper loaded successfully!"))
+
+        def on_failed(error):
+            if isinstance(error, InvalidPasscode):
+                messagebox.showerror("Incorrect Password", "The given password is incorrect!")
+            elif isinstance(error, PaperTampered):
+                messagebox.showerror("Paper Damaged", "This paper has been modified or is corrupted and cannot be opened.")
+            else:
+                messagebox.showerror("Error", f"Load failed:\n{str(error)}")
+            if on_closed:
+                on_closed()
+
+        run_with_progress(
+            self, lambda job: load_paper(file_path, pass_dialog.password, job.report),
+            title="Opening Paper", message="Decrypting question paper...",
+            on_done=on_loaded, on_error=on_failed, on_cancel=on_closed
+        )
+
+    def _load_questions(self, questions_data, on_done=None):
+        self._clear_paper()
+        # ** The whole paper is in place before any frame exists, so cancelling can never leave part of it
+        self.paper = Paper.from_dicts(questions_data)
+        self._add_question_frames(list(self.paper.questions), title="Opening Paper", on_done=on_done,
+                                  on_cancel=lambda rest: self._discard_paper())
+
+    def _clear_paper(self):
+        if self.frame_builder is not None:
+            # ! Its questions go with the paper, so it stops without calling back into the next one
+            self.frame_builder.on_done = None
+            self.frame_builder.cancel()
+            self.frame_builder = None
         for qf in self.workspace.winfo_children():
             if isinstance(qf, QuestionFrame):
                 qf.destroy()
+        self.paper = Paper()
         self.question_frames = []
+        self.update_totals()
 
-        for q_data in questions_data:
-            qf = QuestionFrame(self.workspace)
-            qf.question_id = q_data['id']
-
-            qf.question_text.insert("1.0", q_data['text'])
-            qf.tag_entry.insert(0, q_data['tags'])
-            qf.marks_entry.insert(0, q_data['marks'])
-
-            qf.type_combobox.set(q_data['type'])
-            qf.update_question_type(q_data['type'])
-            if q_data['type'] == "MCQ":
-                for i, option in enumerate(q_data['options']):
-                    if i < len(qf.option_entries):
-                        qf.option_entries[i].insert(0, option)
-                        qf.update_option_state(i)
-
-                try:
-                    correct_idx = q_data['options'].index(q_data['correct'])
-                    qf.correct_answer_var.set(str(correct_idx))
-                except ValueError:
-                    qf.correct_answer_var.set("")
-
-            elif q_data['type'] == "True/False":
-                qf.tf_var.set(q_data['correct'])
-            elif q_data['type'] == "One Word":
-                qf.answer_entry.insert(0, q_data['correct'])
-
-            qf.pack(fill="x", pady=5, padx=5)
-            self.question_frames.append(qf)
+    def _discard_paper(self):
+        self._clear_paper()
+        messagebox.showinfo("Loading Cancelled", "Loading was cancelled, so the workspace has been cleared.\nNothing has been changed on disk.")
 
-        self.perform_search()
-    
     def load_existing_paper(self):
         if os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, 'r') as f:
-                    encrypted_data = json.load(f)
-                
-                pass_dialog = PasswordDialog(self, mode="decrypt")
-                self.wait_window(pass_dialog)
-                
-                if pass_dialog.password:
-                    decrypted_data = self._decrypt_data(encrypted_data, pass_dialog.password)
-                    if decrypted_data:
-                        questions = json.loads(decrypted_data)
-                        self._load_questions(questions)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load paper: {str(e)}")
+            self.handle_password(self.file_path)
+        else:
+            messagebox.showerror("File Not Found", "The file may be deleted or moved by user!")
     
     def add_questions_from_bank(self, questions):
-        valid_types = {"MCQ", "True/False", "One Word"}
-
+        valid, invalid = [], []
         for q in questions:
-            question_id, question_text, tags, marks, options, q_type, answer = q
-
-            if q_type not in valid_types:
-                messagebox.showerror("Invalid Question Type", f"Question '{question_text[:30]}...' has an invalid type: {q_type}")
-                continue
-
-            qf = QuestionFrame(self.workspace)
-            qf.question_id = question_id  
-            qf.question_text.insert("1.0", question_text)  
-            qf.tag_entry.insert(0, tags)  
-            qf.marks_entry.insert(0, marks)  
-
-            qf.type_combobox.set(q_type)
-            qf.update_question_type(q_type)
-
-            if q_type == "MCQ":
-                options_list = options.split(", ") if options else []
-
-                for i, opt in enumerate(options_list):
-                    if i < len(qf.option_entries):
-                        qf.option_entries[i].insert(0, opt)
-                        qf.update_option_state(i)
-
-                try:
-                    correct_idx = options_list.index(answer.strip())
-                    qf.correct_answer_var.set(str(correct_idx))
-                except ValueError:
-                    qf.correct_answer_var.set("")
-
-            elif q_type == "True/False":
-                qf.tf_var.set("True" if answer == "1" else "False")
-
-            elif q_type == "One Word":
-                qf.answer_entry.insert(0, answer)
-
-            qf.pack(fill="x", pady=5, padx=5)
-            self.question_frames.append(qf)
-
-        self.perform_search()
+            question = question_from_bank_row(q)
+            if question.type not in QUESTION_TYPES:
+                invalid.append(f"'{question.text[:30]}...' has an invalid type: {question.type}")
+            else:
+                valid.append(question)
+
+        if invalid:
+            messagebox.showerror("Invalid Question Type", "Skipped questions:\n\n" + "\n".join(invalid[:10]) +
+                                 (f"\n...and {len(invalid) - 10} more" if len(invalid) > 10 else ""))
+        for question in valid:
+            self.paper.append(question)
+        self._add_question_frames(valid, on_cancel=self._drop_unbuilt)
         
\ No newline at end of file
@@ -1,10 +1,9 @@
 import pandas as pd
 from ui_components import *
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import InvalidKey, InvalidTag
+from brainy_core import load_paper, InvalidPasscode, PaperTampered
+from brainy_core.serialization import questions_to_frame, save_question_frame
+from brainy_core.results import parse_exam_results, results_title, results_to_frame, write_results_workbook
+from job_runner import run_with_progress
 from create_paper import PasswordDialog
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
@@ -12,9 +11,7 @@ from tkcalendar import DateEntry
 from utils import getPath
 import os
 from PIL import Image
-import base64
 import xlsxwriter
-import json
 from firebase_backend import FirebaseBackend
 
 class ExportToExcelUI(ctk.CTkFrame):
@@ -138,11 +135,7 @@ class ExportToExcelUI(ctk.CTkFrame):
             if not file_path:
                 return None
 
-            engine = 'openpyxl' if file_path.endswith('.xlsx') else 'xlwt'
-            data.to_excel(file_path, index=False, engine=engine)
-
-            if not os.path.exists(file_path):
-                raise IOError("File was not created successfully")
+            save_question_frame(data, file_path)
 
             messagebox.showinfo(
                 "Question Bank Saved Successfully",
@@ -174,27 +167,8 @@ class ExportToExcelUI(ctk.CTkFrame):
             if not self.parsed_questions or not isinstance(self.parsed_questions, list):
                 messagebox.showwarning("No Data", "Decrypted question bank is empty or invalid.")
                 return
-            formatted_data = []
-            for question in self.parsed_questions:
-                if not all(key in question for key in ['id', 'text', 'tags', 'marks', 'type', 'correct']):
-                    raise ValueError("Invalid question format in decrypted data")
-                
-                formatted_data.append({
-                    'Question ID': str(question['id']),
-                    'Question': str(question['text']),
-                    'Tags': str(question['tags']),
-                    'Marks': int(question['marks']),
-                    'Options': ', '.join(map(str, question.get('options', []))),
-                    'Question Type': str(question['type']),
-                    'Answer': str(question['correct'])
-                })
 
-            df = pd.DataFrame(formatted_data)
-            required_columns = ['Question ID', 'Question', 'Tags', 'Marks', 'Options', 'Question Type', 'Answer']
-            if not all(col in df.columns for col in required_columns):
-                raise ValueError("DataFrame missing required columns")
-            df = df[required_columns]
-            
+            df = questions_to_frame(self.parsed_questions)
             if df.empty:
                 messagebox.showwarning("Empty Data", "No valid questions found after formatting.")
                 return
@@ -218,27 +192,11 @@ class ExportToExcelUI(ctk.CTkFrame):
             exam_doc = exam_ref.get()
             if not exam_doc.exists:
                 raise ValueError(f"Exam {exam_id} not found")
-            exam_data = exam_doc.to_dict()
-            subject_details = exam_data.get('subject_details', {})
-            total_marks = int(subject_details.get('total_marks', 0))
-            students_data = exam_data.get('students', {})
-
-            self.parsed_results = []
-            for enrollment_no, student_data in students_data.items():
-                self.parsed_results.append({
-                    "enrollment_no": enrollment_no,
-                    "marks_obtained": student_data.get('total_score', 0),
-                    "total_marks": total_marks,
-                    "negative_marks": student_data.get('marks_wrong', 0),
-                    "not_attempted": student_data.get('not_attempted', 0)
-                })
+            subject_details, self.parsed_results = parse_exam_results(exam_doc.to_dict())
 
             approval = messagebox.askyesno("Success", f"Processed {len(self.parsed_results)} student results!")
             if approval:
-                sub_name = subject_details.get("subject_name")
-                sub_date = subject_details.get("subject_date")
-                title = sub_name + " | " + sub_date + " | " + "Result"
-                self.process_result_data(title)
+                self.process_result_data(results_title(subject_details))
 
         except Exception as e:
             messagebox.showerror("Cloud Error", f"Fetch failed: {str(e)}")
@@ -246,20 +204,7 @@ class ExportToExcelUI(ctk.CTkFrame):
 
     def process_result_data(self, exam_title="Cloud Exam Result"):
         try:
-            if not self.parsed_results:
-                raise ValueError("No results data to process")
-
-            processed = []
-            for result in self.parsed_results:
-                processed.append({
-                    "Enrollment No": result.get("enrollment_no", ""),
-                    "Marks Obtained": result.get("marks_obtained", 0),
-                    "Total Marks": result.get("total_marks", 0),
-                    "Negative Marks": result.get("wrong_marks", 0),
-                    "Not Attempted": result.get("not_attempted", 0)
-                })
-
-            df = pd.DataFrame(processed)
+            df = results_to_frame(self.parsed_results)
             self.save_results_file(df, exam_title)
 
         except Exception as e:
@@ -279,55 +224,7 @@ class ExportToExcelUI(ctk.CTkFrame):
             if not file_path:
                 return
 
-            writer = pd.ExcelWriter(file_path, engine='xlsxwriter')
-            df.to_excel(writer, index=False, sheet_name='Results', startrow=1)
-
-            workbook = writer.book
-            worksheet = writer.sheets['Results']
-
-            title_format = workbook.add_format({
-                'bold': True,
-                'font_size': 14,
-                'align': 'center',
-                'valign': 'vcenter',
-                'fg_color': '#D9E1F2'
-            })
-            worksheet.merge_range(0, 0, 0, len(df.columns) - 1, title, title_format)
-
-            header_format = workbook.add_format({
-                'bold': True,
-                'text_wrap': True,
-                'valign': 'top',
-                'fg_color': '#4F81BD',
-                'font_color': 'white',
-                'border': 1
-            })
-
-            normal_format = workbook.add_format({
-                'border': 1,
-                'valign': 'top',
-            })
-            alt_format = workbook.add_format({
-                'bg_color': '#F2F2F2',
-                'border': 1,
-                'valign': 'top',
-            })
-
-            for col_num, column_name in enumerate(df.columns.values):
-                worksheet.write(1, col_num, column_name, header_format)
-
-            for row_num, row_data in enumerate(df.values, start=2):
-                for col_num, cell_data in enumerate(row_data):
-                    fmt = alt_format if (row_num - 2) % 2 == 0 else normal_format
-                    worksheet.write(row_num, col_num, cell_data, fmt)
-
-            for i, column in enumerate(df.columns):
-                max_len = max(df[column].astype(str).map(len).max(), len(column))
-                worksheet.set_column(i, i, max_len + 2)
-
-            worksheet.freeze_panes(2, 0)
-
-            writer.close()
+            write_results_workbook(df, title, file_path)
             messagebox.showinfo("Success", f"Results exported successfully!\n{len(df)} records saved")
 
         except Exception as e:
@@ -335,53 +232,31 @@ class ExportToExcelUI(ctk.CTkFrame):
 
 
     def decrypt_file(self, file_path):
-        pass_dialog = PasswordDialog(self, mode="decrypt")
+        pass_dialog = PasswordDialog(self, mode="decrypt", paper_path=file_path)
         self.wait_window(pass_dialog)
 
-        if pass_dialog.password:
-            try:
-                with open(file_path, "r") as f:
-                    encrypted_data = json.load(f)
-
-                decrypted_text = self._decrypt_data(encrypted_data, pass_dialog.password)
-                if not decrypted_text:
-                    raise ValueError("Empty decrypted content")
-                
-                self.parsed_questions = json.loads(decrypted_text)
-                
-                if not isinstance(self.parsed_questions, list) or len(self.parsed_questions) == 0:
-                    raise ValueError("Decrypted data is not a valid question list")
-                
-                messagebox.showinfo("Success", f"Successfully decrypted {len(self.parsed_questions)} questions!")
+        if not pass_dialog.password:
+            return
 
-            except Exception as e:
-                messagebox.showerror("Decryption Error", f"Failed to decrypt file:\n{type(e).__name__}: {str(e)}")
-                self.parsed_questions = []
-    
-    def _decrypt_data(self, encrypted_data, password):
-        # ! Credits ! Tech with tim & Neuraline YT
-        try:
-            salt = base64.b64decode(encrypted_data['salt'])
-            iv = base64.b64decode(encrypted_data['iv'])
-            ciphertext = base64.b64decode(encrypted_data['ciphertext'])
-            
-            key = self._derive_key(password, salt)
-            cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-            decryptor = cipher.decryptor()
-            
-            plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-            pad_len = plaintext[-1]
-            return plaintext[:-pad_len].decode()
-        except (InvalidKey, ValueError, InvalidTag):
-            return None
-    
-    def _derive_key(self, password, salt):
-        # ! Credits ! Tech with tim & Neuraline YT
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-            backend=default_backend()
+        run_with_progress(
+            self, lambda job: load_paper(file_path, pass_dialog.password, job.report),
+            title="Decrypting", message="Decrypting question paper...",
+            on_done=self._on_decrypted, on_error=self._on_decrypt_failed
         )
-        return kdf.derive(password.encode())
\ No newline at end of file
+
+    def _on_decrypted(self, questions):
+        if not isinstance(questions, list) or len(questions) == 0:
+            self._on_decrypt_failed(ValueError("Decrypted data is not a valid question list"))
+            return
+
+        self.parsed_questions = questions
+        messagebox.showinfo("Success", f"Successfully decrypted {len(self.parsed_questions)} questions!")
+
+    def _on_decrypt_failed(self, error):
+        if isinstance(error, InvalidPasscode):
+            messagebox.showerror("Decryption Error", "Invalid password or corrupted file!")
+        elif isinstance(error, PaperTampered):
+            messagebox.showerror("Paper Damaged", "This paper has been modified or is corrupted and cannot be opened.")
+        else:
+            messagebox.showerror("Decryption Error", f"Failed to decrypt file:\n{type(error).__name__}: {str(error)}")
+        self.parsed_questions = []
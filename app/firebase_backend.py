@@ -3,7 +3,6 @@ from firebase_admin import credentials, firestore
 import os
 import socket
 import json
-from tkinter import messagebox
 import hashlib
 
 class FirebaseBackend:
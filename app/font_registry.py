@@ -0,0 +1,151 @@
+# ==========================================================
+#  * Module : font_registry.py - Shared PDF Fonts & Metrics
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      One place that knows the paper fonts. Each TTF is parsed
+#      and registered with reportlab at most once per process,
+#      and its glyph widths are kept as a plain table so text
+#      can be measured without going through reportlab.
+#
+#      The tables are also saved to database/font-metrics.json,
+#      keyed by each font file's size and modification time.
+#      Measuring a paper (layout, preview) then needs no TTF
+#      parsing at all; only drawing onto a PDF registers fonts.
+# ==========================================================
+
+import json
+import os
+import threading
+from utils import getPath
+
+FONTS = {
+    "DejaVuSans": r"assets\fonts\DejaVuSansCondensed.ttf",
+    "DejaVuSans-BoldOblique": r"assets\fonts\DejaVuSans-BoldOblique.ttf",
+    "DejaVuSansCondensed-Bold": r"assets\fonts\DejaVuSansCondensed-Bold.ttf",
+}
+METRICS_CACHE = r"database\font-metrics.json"
+METRICS_VERSION = 1
+
+_lock = threading.Lock()
+_registered = set()
+_tables = {}
+
+
+class WidthTable(dict):
+    # ** Character -> advance width in 1/1000 em; characters the font lacks measure as its default width
+    __slots__ = ("default",)
+
+    def __init__(self, widths, default):
+        super().__init__(widths)
+        self.default = default
+
+    def __missing__(self, char):
+        return self.default
+
+
+def _font_path(name):
+    try:
+        return getPath(FONTS[name])
+    except KeyError:
+        raise KeyError(f"Unknown font {name}") from None
+
+
+def _source(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def register_font(name):
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    with _lock:
+        if name in _registered:
+            return
+        font = TTFont(name, _font_path(name))
+        pdfmetrics.registerFont(font)
+        _registered.add(name)
+        # ** The parsed face already holds the widths, so the table comes for free here
+        _tables.setdefault(name, WidthTable({chr(code): width for code, width in font.face.charWidths.items()},
+                                            font.face.defaultWidth))
+
+
+def register_fonts():
+    # ** Fonts that fail to load are reported, as before, and the rest still register
+    for name in FONTS:
+        try:
+            register_font(name)
+        except Exception as e:
+            print(e)
+
+
+def _load_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != METRICS_VERSION:
+        return {}
+    return cache.get("fonts", {})
+
+
+def _save_cache(path, fonts):
+    # ! Written to a temporary file and swapped in, so a second process never reads half a file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"version": METRICS_VERSION, "fonts": fonts}, f, separators=(",", ":"))
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def load_metrics(cache_path=None):
+    # ** Fills the width tables from the disk cache; stale or missing fonts are parsed and the cache rewritten
+    cache_path = cache_path or getPath(METRICS_CACHE)
+    cached = _load_cache(cache_path)
+    changed = False
+    for name in FONTS:
+        if name in _tables:
+            continue
+        try:
+            source = _source(_font_path(name))
+        except OSError:
+            continue
+        entry = cached.get(name)
+        if entry and entry.get("source") == source:
+            with _lock:
+                _tables.setdefault(name, WidthTable(zip(entry["chars"], entry["widths"]), entry["default"]))
+            continue
+        try:
+            register_font(name)
+        except Exception as e:
+            print(e)
+            continue
+        table = _tables[name]
+        cached[name] = {"source": source, "default": table.default,
+                        "chars": "".join(table), "widths": list(table.values())}
+        changed = True
+    if changed:
+        _save_cache(cache_path, cached)
+
+
+def width_table(name):
+    table = _tables.get(name)
+    if table is None:
+        load_metrics()
+        table = _tables.get(name)
+        if table is None:
+            register_font(name)
+            table = _tables[name]
+    return table
+
+
+def string_width(text, name, size):
+    # ** Same result as pdfmetrics.stringWidth for these fonts, without reportlab's per-call encoding work
+    return sum(map(width_table(name).__getitem__, text)) * size / 1000
@@ -1,5 +1,3 @@
-import json
-import base64
 import sys
 import os
 import subprocess
@@ -10,15 +8,17 @@ from utils import getPath
 from PIL import Image
 from ui_components import Colors, PrimaryButton, LinkButton
 from create_paper import PasswordDialog
-from pdf_template import GeneratePDF 
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import InvalidKey, InvalidTag
+from brainy_core import load_paper, total_marks, InvalidPasscode, PaperTampered
+from brainy_core.packaging import build_subject_details, generate_paper_pdf
+from brainy_core.roster import ANSWER_KEY_NAME, read_roster, render_roster
+from pdf_layout import PaperLayout, PageModel
+from pdf_preview import PagePreview
+from job_runner import run_with_progress
 import datetime
 from subject_db import SubjectManagerUI
 
+PREVIEW_DELAY_MS = 150
+
 class GeneratePDFUI(ctk.CTkFrame):
     def __init__(self, master, subject_db, parent, container):
         super().__init__(master)
@@ -30,6 +30,8 @@ class GeneratePDFUI(ctk.CTkFrame):
         self.parsed_questions = []
         self.logo_path = getPath(r"assets\images\logo.png")
         self.answer_checked = ctk.StringVar(value="No")
+        self.preview_model = None
+        self.preview_job = None
         self.main_frame = ctk.CTkFrame(container, fg_color="#1E293B", corner_radius=12)
         self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
         self.valid_states = {
@@ -196,6 +198,7 @@ class GeneratePDFUI(ctk.CTkFrame):
             options_frame, 
             text="Include Header", 
             variable=self.header_var,
+            command=self.schedule_preview,
             fg_color=Colors.Buttons.PRIMARY,
             hover_color=Colors.Buttons.PRIMARY_HOVER
         ).pack(anchor="w", pady=5)
@@ -205,6 +208,17 @@ class GeneratePDFUI(ctk.CTkFrame):
             options_frame, 
             text="Include Footer", 
             variable=self.footer_var,
+            command=self.schedule_preview,
+            fg_color=Colors.Buttons.PRIMARY,
+            hover_color=Colors.Buttons.PRIMARY_HOVER
+        ).pack(anchor="w", pady=5)
+
+        self.notation_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(
+            options_frame, 
+            text="Typeset Notation", 
+            variable=self.notation_var,
+            command=self.schedule_preview,
             fg_color=Colors.Buttons.PRIMARY,
             hover_color=Colors.Buttons.PRIMARY_HOVER
         ).pack(anchor="w", pady=5)
@@ -221,6 +235,7 @@ class GeneratePDFUI(ctk.CTkFrame):
             text="Yes", 
             variable=self.answer_checked, 
             value="Yes",
+            command=self.schedule_preview,
             fg_color=Colors.Buttons.PRIMARY,
             hover_color=Colors.Buttons.PRIMARY_HOVER
         ).pack(side="left", padx=10)
@@ -230,6 +245,7 @@ class GeneratePDFUI(ctk.CTkFrame):
             text="No", 
             variable=self.answer_checked, 
             value="No",
+            command=self.schedule_preview,
             fg_color=Colors.Buttons.PRIMARY,
             hover_color=Colors.Buttons.PRIMARY_HOVER
         ).pack(side="left", padx=10)
@@ -262,14 +278,39 @@ class GeneratePDFUI(ctk.CTkFrame):
         )
         self.generate_btn.pack()
 
+        self.roster_btn = PrimaryButton(
+            master=btn_frame,
+            text="Generate for Roster",
+            command=self.generate_roster_pdfs,
+            width=200,
+            height=45,
+            state="disabled"
+        )
+        self.roster_btn.pack(pady=(10, 0))
+
+        preview_card = ctk.CTkFrame(content_frame, fg_color=Colors.Cards.SECONDARY, corner_radius=8)
+        preview_card.grid(row=0, column=2, sticky="nsew", padx=10, pady=5)
+
+        self.preview_label = ctk.CTkLabel(preview_card,
+                                          text="Preview",
+                                          font=("Arial", 14, "bold"),
+                                          text_color=Colors.Texts.HEADERS)
+        self.preview_label.pack(anchor="w", pady=(10, 5), padx=10)
+        self.preview = PagePreview(preview_card, fg_color="transparent", width=290, height=420,
+                                   scrollbar_button_color=Colors.PRIMARY)
+        self.preview.pack(fill="both", expand=True, padx=5, pady=(0, 10))
+
         content_frame.columnconfigure(0, weight=3)
         content_frame.columnconfigure(1, weight=2)
+        content_frame.columnconfigure(2, weight=3)
         self.master.update_idletasks()
 
     def setup_validations(self):
         self.file_entry.bind("<KeyRelease>", lambda e: self.validate_file())
         self.exam_title_entry.bind("<KeyRelease>", lambda e: self.validate_title())
         self.subject_combo.bind("<<ComboboxSelected>>", lambda e: self.validate_subject())
+        self.exam_title_entry.bind("<KeyRelease>", lambda e: self.schedule_preview(), add="+")
+        self.subject_date_picker.bind("<<DateEntrySelected>>", lambda e: self.schedule_preview())
 
     def create_status_row(self, parent, text):
         frame = ctk.CTkFrame(parent, fg_color="transparent")
@@ -290,6 +331,7 @@ class GeneratePDFUI(ctk.CTkFrame):
             text_color=Colors.Texts.FIELDS if valid else Colors.Texts.MUTED
         )
         self.generate_btn.configure(state="normal" if all(self.valid_states.values()) else "disabled")
+        self.roster_btn.configure(state="normal" if all(self.valid_states.values()) else "disabled")
 
     def validate_file(self):
         valid = bool(self.file_entry.get().strip())
@@ -331,9 +373,52 @@ class GeneratePDFUI(ctk.CTkFrame):
         self.time_duration_slider.set(5.0)
         self.update_time_label(5.0)
         self.validate_subject()
+        self.schedule_preview()
 
     def update_time_label(self, value):
         self.time_duration_label.configure(text=f"{round(value, 1)} min")
+        self.schedule_preview()
+
+    def schedule_preview(self, *args):
+        # ** Slider drags and typing fire many events; only the last one within PREVIEW_DELAY_MS re-lays out
+        if self.preview_job is not None:
+            self.after_cancel(self.preview_job)
+        self.preview_job = self.after(PREVIEW_DELAY_MS, self.refresh_preview)
+
+    def _layout_options(self):
+        title = self.exam_title_entry.get().upper() or self.detail_labels['subject_name'].cget("text")
+        subject_details = self._subject_details(title)
+        return dict(
+            title=title,
+            subject_details=subject_details,
+            instructions=(subject_details['instructions'] or "").strip(),
+            questions=self.parsed_questions,
+            logo_path=self.logo_path,
+            include_header=self.header_var.get(),
+            include_footer=self.footer_var.get(),
+            show_answers=(self.answer_checked.get() == "Yes"),
+            typeset_notation=self.notation_var.get()
+        )
+
+    def refresh_preview(self):
+        self.preview_job = None
+        if not self.parsed_questions:
+            self.preview_model = None
+            self.preview.clear()
+            self.preview_label.configure(text="Preview")
+            return
+        try:
+            options = self._layout_options()
+            # ** A newly decrypted paper starts a fresh page model; anything else only updates the cached one
+            if self.preview_model is None or self.preview_model.layout.questions is not self.parsed_questions:
+                self.preview_model = PageModel(PaperLayout(**options))
+                self.preview.show(self.preview_model)
+            else:
+                self.preview.show(self.preview_model, self.preview_model.update(**options))
+        except Exception as e:
+            self.preview_label.configure(text=f"Preview unavailable: {e}")
+            return
+        self.preview_label.configure(text=f"Preview ({len(self.preview_model)} pages)")
 
     def initiate_generation(self):
         if not all(self.valid_states.values()):
@@ -353,29 +438,34 @@ class GeneratePDFUI(ctk.CTkFrame):
 
 
     def decrypt_file(self, file_path):
-        pass_dialog = PasswordDialog(self, mode="decrypt")
+        pass_dialog = PasswordDialog(self, mode="decrypt", paper_path=file_path)
         self.wait_window(pass_dialog)
 
-        if pass_dialog.password:
-            try:
-                with open(file_path, "r") as f:
-                    encrypted_data = json.load(f)
+        if not pass_dialog.password:
+            return
+
+        run_with_progress(
+            self, lambda job: load_paper(file_path, pass_dialog.password, job.report),
+            title="Decrypting", message="Decrypting question paper...",
+            on_done=self._on_decrypted, on_error=self._on_decrypt_failed
+        )
 
-                decrypted_text = self._decrypt_data(encrypted_data, pass_dialog.password)
-                if decrypted_text is None:
-                    messagebox.showerror("Error", "Invalid password or corrupted file!")
-                    return
+    def _on_decrypted(self, questions):
+        self.parsed_questions = questions
+        self.schedule_preview()
+        messagebox.showinfo("Success", "File decrypted successfully!")
 
-                self.parsed_questions = json.loads(decrypted_text)
-                messagebox.showinfo("Success", "File decrypted successfully!")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Decryption failed: {str(e)}")
+    def _on_decrypt_failed(self, error):
+        if isinstance(error, InvalidPasscode):
+            messagebox.showerror("Error", "Invalid password or corrupted file!")
+        elif isinstance(error, PaperTampered):
+            messagebox.showerror("Paper Damaged", "This paper has been modified or is corrupted and cannot be opened.")
+        else:
+            messagebox.showerror("Error", f"Decryption failed: {str(error)}")
 
     def generate_pdf(self):
         
         try:
-            total_duration = round(self.time_duration_slider.get() * len(self.parsed_questions), 1)
             subject_code = self.subject_combo.get()
             selected_subject = self.db_manager.get_subject_name(subject_code)
             exam_title = self.exam_title_entry.get().upper()
@@ -383,27 +473,7 @@ class GeneratePDFUI(ctk.CTkFrame):
                 exam_title = self.detail_labels['subject_name'].cget("text")
                 return
 
-            subject_details = {
-                'title': exam_title,
-                'subject_code': self.subject_combo.get(),
-                'subject_name': self.detail_labels['subject_name'].cget("text"),
-                'subject_date': self.subject_date_picker.get_date().strftime("%Y-%m-%d"),
-                'time_duration': f"{total_duration} minutes",
-                'total_marks': self.calculate_total_marks(),
-                'instructions': self.db_manager.get_instructions(subject_code)
-            }
-
-            generator = GeneratePDF(
-                title=exam_title,
-                subject_details=subject_details,
-                instructions=subject_details['instructions'], 
-                questions=self.parsed_questions,
-                enrollment_no="______", 
-                logo_path=self.logo_path,
-                include_header=self.header_var.get(),
-                include_footer=self.footer_var.get(),
-                show_answers=(self.answer_checked.get() == "Yes")
-            )
+            subject_details = self._subject_details(exam_title)
 
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".pdf",
@@ -411,12 +481,72 @@ class GeneratePDFUI(ctk.CTkFrame):
             )
 
             if file_path:
-                generator.generate_pdf(file_path)        
+                generate_paper_pdf(
+                    self.parsed_questions, file_path, subject_details,
+                    logo_path=self.logo_path,
+                    include_header=self.header_var.get(),
+                    include_footer=self.footer_var.get(),
+                    show_answers=(self.answer_checked.get() == "Yes"),
+                    typeset_notation=self.notation_var.get()
+                )
                 self.show_popup(file_path)
 
         except Exception as e:
             messagebox.showerror("Error", f"Generation failed: {str(e)}")
 
+    def _subject_details(self, exam_title):
+        subject_code = self.subject_combo.get()
+        return build_subject_details(
+            title=exam_title,
+            subject_code=subject_code,
+            subject_name=self.detail_labels['subject_name'].cget("text"),
+            subject_date=self.subject_date_picker.get_date().strftime("%Y-%m-%d"),
+            minutes_per_question=self.time_duration_slider.get(),
+            questions=self.parsed_questions,
+            instructions=self.db_manager.get_instructions(subject_code)
+        )
+
+    def generate_roster_pdfs(self):
+        # ** One shuffled PDF per enrollment number, plus a manifest and a combined answer-key workbook
+        if not self.parsed_questions:
+            messagebox.showerror("Error", "Please decrypt a paper first!")
+            return
+        roster_path = filedialog.askopenfilename(title="Select Student Roster",
+                                                 filetypes=[("Rosters", "*.xlsx *.csv"), ("Excel Files", "*.xlsx"), ("CSV Files", "*.csv")])
+        if not roster_path:
+            return
+        try:
+            enrollments = read_roster(roster_path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Invalid Roster", str(e))
+            return
+        folder = filedialog.askdirectory(title="Save Student Papers To")
+        if not folder:
+            return
+
+        subject_details = self._subject_details(self.exam_title_entry.get().upper())
+        run_with_progress(
+            self, lambda job: render_roster(
+                self.parsed_questions, enrollments, folder, subject_details,
+                logo_path=self.logo_path,
+                include_header=self.header_var.get(),
+                include_footer=self.footer_var.get(),
+                typeset_notation=self.notation_var.get(),
+                progress=job.report
+            ),
+            title="Generating PDFs", message=f"Rendering papers for {len(enrollments)} students...",
+            on_done=lambda report: self._on_roster_rendered(report, folder),
+            on_error=lambda e: messagebox.showerror("Error", f"Generation failed: {str(e)}")
+        )
+
+    def _on_roster_rendered(self, report, folder):
+        if report.failures:
+            messagebox.showwarning("PDFs Generated", report.summary())
+        else:
+            messagebox.showinfo("PDFs Generated", f"{len(report.students)} papers saved to {folder}\n"
+                                                  f"Answer keys: {ANSWER_KEY_NAME}")
+        self.parent.redirect("home-page")
+
     def calculate_auto_duration(self, choice):
         try:
             total_questions = len(self.parsed_questions)
@@ -437,33 +567,5 @@ class GeneratePDFUI(ctk.CTkFrame):
         if os.name == 'nt':
             os.startfile(file_path)
 
-    def _decrypt_data(self, encrypted_data, password):
-        # ! Credits ! Tech with tim & Neuraline YT
-        try:
-            salt = base64.b64decode(encrypted_data['salt'])
-            iv = base64.b64decode(encrypted_data['iv'])
-            ciphertext = base64.b64decode(encrypted_data['ciphertext'])
-            
-            key = self._derive_key(password, salt)
-            cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
-            decryptor = cipher.decryptor()
-            
-            plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-            pad_len = plaintext[-1]
-            return plaintext[:-pad_len].decode()
-        except (InvalidKey, ValueError, InvalidTag):
-            return None
-    
-    def _derive_key(self, password, salt):
-        # ! Credits ! Tech with tim & Neuraline YT
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-            backend=default_backend()
-        )
-        return kdf.derive(password.encode())
-
     def calculate_total_marks(self):
-        return sum(int(q['marks']) for q in self.parsed_questions)
+        return total_marks(self.parsed_questions)
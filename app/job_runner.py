@@ -0,0 +1,143 @@
+# ==========================================================
+#  * Module : job_runner.py - Background Jobs For Tk Pages
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Runs slow work (key derivation, decryption) on a shared
+#      thread pool so the Tk main loop keeps drawing. Workers
+#      never touch widgets: progress, results and errors are
+#      queued and handed back to the main loop with after(),
+#      so every callback may update the UI directly.
+#
+#      A job function receives its Job as the first argument.
+#      Calling job.report(done, total) publishes progress and
+#      raises JobCancelled once the user has cancelled, which
+#      lets long loops stop at the next checkpoint.
+# ==========================================================
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import TclError
+from ui_components import ProgressDialog
+
+MAX_WORKERS = 2
+POLL_INTERVAL_MS = 50
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, widget, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        self.widget = widget
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.future = None
+        self._cancelled = threading.Event()
+        self._events = queue.Queue()
+        self._progress = None
+        self._progress_lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # ** A job that never started has no worker left to report back, so report for it
+        if self.future is not None and self.future.cancel():
+            self._events.put(("cancelled", None))
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def report(self, done, total=None):
+        # ** Only the latest value matters, so progress is coalesced instead of queued
+        with self._progress_lock:
+            self._progress = (done, total)
+        self.check_cancelled()
+
+    def _take_progress(self):
+        with self._progress_lock:
+            progress, self._progress = self._progress, None
+        return progress
+
+    def _schedule_poll(self):
+        try:
+            self.widget.after(POLL_INTERVAL_MS, self._poll)
+        except (TclError, RuntimeError):
+            # ! The page was closed; drop the result instead of touching dead widgets
+            self._cancelled.set()
+
+    def _poll(self):
+        progress = self._take_progress()
+        if progress is not None and self.on_progress and not self.cancelled:
+            self.on_progress(*progress)
+
+        try:
+            kind, value = self._events.get_nowait()
+        except queue.Empty:
+            self._schedule_poll()
+            return
+
+        if kind == "done" and self.on_done:
+            self.on_done(value)
+        elif kind == "error" and self.on_error:
+            self.on_error(value)
+        elif kind == "cancelled" and self.on_cancel:
+            self.on_cancel()
+
+
+class JobRunner:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="brainy-job")
+
+    def submit(self, widget, fn, *args, on_done=None, on_error=None, on_progress=None, on_cancel=None, **kwargs):
+        job = Job(widget, on_done, on_error, on_progress, on_cancel)
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        job._schedule_poll()
+        return job
+
+    @staticmethod
+    def _run(job, fn, args, kwargs):
+        try:
+            job.check_cancelled()
+            result = fn(job, *args, **kwargs)
+            job.check_cancelled()
+        except JobCancelled:
+            job._events.put(("cancelled", None))
+        except Exception as e:
+            job._events.put(("error", e))
+        else:
+            job._events.put(("done", result))
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+runner = JobRunner()
+
+
+def run_with_progress(parent, fn, *args, title="Please wait", message="Working...", on_done=None, on_error=None, on_cancel=None, **kwargs):
+    dialog = ProgressDialog(parent, title=title, message=message)
+
+    def finish(callback, *values):
+        dialog.close()
+        if callback:
+            callback(*values)
+
+    job = runner.submit(
+        parent, fn, *args,
+        on_done=lambda result: finish(on_done, result),
+        on_error=lambda error: finish(on_error, error),
+        on_progress=dialog.update_progress,
+        on_cancel=lambda: finish(on_cancel),
+        **kwargs
+    )
+    dialog.on_cancel = job.cancel
+    return job
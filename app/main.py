@@ -15,68 +15,68 @@
 #  & CustomTkinter Docs (https://customtkinter.tomschimansky.com/)
 # ==========================================================
 
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import startup_profile
+startup_profile.install_from_env()
+
+import importlib
+import sys
 import threading
+import multiprocessing
 import customtkinter as ctk
 from tkinter import messagebox
 from utils import getPath, centerWindow
 from ui_components import Colors, IconButton, SidebarButton
 from PIL import Image
-import time
 import os
 import datetime
 from users import UserManager, AuthView
-from create_paper import CreatePaper
-from generate_pdf import GeneratePDFUI
-from cloud_export import CloudPublishUI
-from subject_db import SubjectDBManager
-from excel_export import ExportToExcelUI
-from admin_panel import AdminPanel
-from codex_formatter import CodexFormatter
+from subject_store import SubjectDBManager
+from job_runner import runner
 
 subject_db = SubjectDBManager()
 
-class WorkspaceEventHandler(FileSystemEventHandler):
-    def __init__(self, app, observer):
-        self.app = app
-        self.observer = observer
+# ** Pages pull in pandas, reportlab, firebase and friends, so they are imported on first use
+PAGE_CLASSES = {
+    "create_paper": ("create_paper", "CreatePaper"),
+    "pdf_export": ("generate_pdf", "GeneratePDFUI"),
+    "cloud_export": ("cloud_export", "CloudPublishUI"),
+    "excel_export": ("excel_export", "ExportToExcelUI"),
+    "admin_panel": ("admin_panel", "AdminPanel"),
+    "codex_formatter": ("codex_formatter", "CodexFormatter"),
+}
+# ** Imported on a worker thread after login so the first click on a page is instant
+PREWARM_MODULES = ("create_paper", "generate_pdf", "excel_export", "cloud_export", "admin_panel",
+                   "codex_formatter", "pdf_template")
+PREWARM_ENV = "BRAINY_NO_PREWARM"
+
+
+def load_page(key):
+    module_name, class_name = PAGE_CLASSES[key]
+    if module_name not in sys.modules:
+        startup_profile.mark(f"importing {module_name}")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def prewarm_pages(job):
+    for done, module_name in enumerate(PREWARM_MODULES, start=1):
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            # ! A missing optional dependency surfaces again when the page is opened
+            print(f"Pre-warm skipped {module_name}: {e}")
+        job.report(done, len(PREWARM_MODULES))
+    startup_profile.mark("pages pre-warmed")
 
-    def on_created(self, event):
-        if not event.is_directory:
-            self.app.after(0, self.app.load_recent_projects)
 
-    def on_deleted(self, event):
-        workspace_path = self.app.user_manager.user[3]
-
-        if not os.path.exists(workspace_path):
-            self.observer.stop()
-        else:
-            self.app.after(0, self.app.load_recent_projects)
-
-    def on_modified(self, event):
-        pass
+def calibrate_kdf(job):
+    # ** brainy_core.crypto pulls in cryptography, so it is imported on the worker instead of at startup
+    from brainy_core.crypto import ensure_kdf_calibrated
+    return ensure_kdf_calibrated(getPath("database\\kdf.json"))
 
 
 def watch_workspace(app, user):
-    workspace_path = user[3]
-
-    if not os.path.exists(workspace_path):
-        return
-
-    observer = Observer()
-    event_handler = WorkspaceEventHandler(app, observer)
-    observer.schedule(event_handler, workspace_path, recursive=True)
-    observer.start()
-
-    def run_observer():
-        try:
-            observer.join()
-        except KeyboardInterrupt:
-            observer.stop()
-
-    thread = threading.Thread(target=run_observer, daemon=True)
-    thread.start()
+    from workspace_watcher import watch_workspace as start_watcher
+    start_watcher(app, user)
 
 
 class BrainyStudioApp(ctk.CTk):
@@ -130,15 +130,31 @@ class BrainyStudioApp(ctk.CTk):
         self.sidebar.place(relx=self.start_pos, rely=0.14, relwidth=self.width, relheight=0.8)
         self.sidebar.columnconfigure((0, 1), weight=1)
         self.sidebar.rowconfigure(0, weight=1)
+        startup_profile.mark("login window")
+        if startup_profile.enabled():
+            self.after(0, startup_profile.write_report)
         self.auth_view.run()
 
     def on_login_success(self):
         self.auth_view.destroy()
         thread = threading.Thread(target=watch_workspace, args=(self, self.user_manager.user), daemon=True)
         thread.start()
+        # ** Calibration runs once per machine; later launches only read the saved settings
+        runner.submit(self, calibrate_kdf, on_error=self._on_kdf_calibration_failed)
+        if not os.getenv(PREWARM_ENV):
+            runner.submit(self, prewarm_pages, on_error=lambda e: print(f"Pre-warm failed: {e}"),
+                          on_done=lambda _: startup_profile.write_report())
         self.build()
+        startup_profile.mark("home page")
         self.mainloop()
 
+    def _on_kdf_calibration_failed(self, error):
+        messagebox.showwarning(
+            "Key Calibration Failed",
+            f"Passcode key settings could not be calibrated for this machine:\n{error}\n\n"
+            "New papers will use the default key settings until the next launch."
+        )
+
     def build(self):
 
         self.welcome_label = ctk.CTkLabel(
@@ -186,7 +202,7 @@ class BrainyStudioApp(ctk.CTk):
             for widget in self.main_content.winfo_children():
                 widget.destroy()
 
-            self.edit_page = CreatePaper(self.main_content, parent=self, edit_mode=True, file_path=filepath)
+            self.edit_page = load_page("create_paper")(self.main_content, parent=self, edit_mode=True, file_path=filepath)
             self.edit_page.pack(padx=10, pady=10, fill="both", expand=True)
         else:
             self.redirect("edit-page")
@@ -293,7 +309,7 @@ class BrainyStudioApp(ctk.CTk):
 
     def open_admin_panel(self):
         self.attributes("-topmost", False)
-        self.admin_panel = AdminPanel(subject_db=subject_db)
+        self.admin_panel = load_page("admin_panel")(subject_db=subject_db)
 
     def _create_icon_frame(self):
         self.icon_frame = ctk.CTkScrollableFrame(
@@ -496,7 +512,7 @@ class BrainyStudioApp(ctk.CTk):
             if self.edit_page:
                 self.edit_page.pack_forget()
             self.title("Create Paper")
-            self.create_paper = CreatePaper(self.main_content, parent=self)
+            self.create_paper = load_page("create_paper")(self.main_content, parent=self)
             self.create_paper.pack(padx=10, pady=10, anchor="center")
 
         if page_name == "home-page":
@@ -509,7 +525,7 @@ class BrainyStudioApp(ctk.CTk):
             if self.create_paper:
                 self.create_paper.pack_forget()
             self.title("Edit Paper")
-            self.edit_page = CreatePaper(self.main_content, edit_mode=True, parent=self, file_path=filepath)
+            self.edit_page = load_page("create_paper")(self.main_content, edit_mode=True, parent=self, file_path=filepath)
             self.edit_page.pack(padx=10, pady=10, anchor="center")
 
         if page_name == "cloud-expo":
@@ -519,18 +535,20 @@ class BrainyStudioApp(ctk.CTk):
                 self.redirect("home-page")
                 return
             self.title("Export to Cloud")
-            self.cloud_page = CloudPublishUI(self.main_content, parent=self, subject_db=subject_db)
+            self.cloud_page = load_page("cloud_export")(self.main_content, parent=self, subject_db=subject_db)
 
         if page_name == "export-page":
-            self.export_page = GeneratePDFUI(self, subject_db, self, self.main_content)
+            self.export_page = load_page("pdf_export")(self, subject_db, self, self.main_content)
 
         if page_name == "excel-export-page":
-            self.excel_page = ExportToExcelUI(self, self, self.main_content)
+            self.excel_page = load_page("excel_export")(self, self, self.main_content)
 
     def open_codex_formatter(self):
         self.attributes("-topmost", False)
-        CodexFormatter(self)
+        load_page("codex_formatter")(self)
         return
     
 if __name__ == "__main__":
+    # ** Lets the frozen build start worker processes for workspace rotation
+    multiprocessing.freeze_support()
     app = BrainyStudioApp()
@@ -0,0 +1,125 @@
+# ==========================================================
+#  * Module : paper_generator.py - Generate Paper Dialog
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Collects a blueprint (question counts per type, total
+#      marks, tag quotas, difficulty mix and how long used
+#      questions rest) and draws one or more random papers
+#      from the question bank with brainy_core.assembly.
+#      The drawn bank rows are handed back to the caller.
+# ==========================================================
+
+import customtkinter as ctk
+from tkinter import messagebox
+from utils import centerWindow
+from ui_components import PrimaryButton, Colors
+from question_store import QuestionStore
+from brainy_core import QUESTION_TYPES
+from brainy_core.assembly import Blueprint, BlueprintError, DIFFICULTY_LEVELS, assemble
+from job_runner import run_with_progress
+
+
+class BlueprintDialog(ctk.CTkToplevel):
+    def __init__(self, master, on_generated):
+        super().__init__(master=master)
+        # ** on_generated receives one list of bank rows per variant
+        self.on_generated = on_generated
+        self.store = QuestionStore()
+        self.attributes("-topmost", True)
+        self.title("Generate Paper")
+        self.geometry(centerWindow(master, 520, 560, self._get_window_scaling()))
+        self.resizable(False, False)
+        self.configure(fg_color=Colors.BACKGROUND)
+
+        form = ctk.CTkFrame(self, fg_color=Colors.SECONDARY, corner_radius=10)
+        form.pack(fill="both", expand=True, padx=15, pady=15)
+        form.grid_columnconfigure(1, weight=1)
+
+        self.type_entries = {}
+        rows = [(f"{q_type} questions", q_type) for q_type in QUESTION_TYPES]
+        for row, (label, q_type) in enumerate(rows):
+            self.type_entries[q_type] = self._field(form, row, label, "0")
+
+        row = len(rows)
+        self.marks_entry = self._field(form, row, "Total marks", "", placeholder="any")
+        self.tags_entry = self._field(form, row + 1, "Tag quotas", "", placeholder="algebra:5, geometry:3")
+        self.difficulty_entries = {}
+        for offset, level in enumerate(DIFFICULTY_LEVELS, start=2):
+            self.difficulty_entries[level] = self._field(form, row + offset, f"{level.title()} %", "",
+                                                         placeholder=f"share tagged '{level}'")
+        row += 2 + len(DIFFICULTY_LEVELS)
+        self.recent_entry = self._field(form, row, "Skip used in last (days)", "0")
+        self.variants_entry = self._field(form, row + 1, "Variants", "1")
+
+        self.error_label = ctk.CTkLabel(self, text="", text_color=Colors.DANGER, wraplength=480)
+        self.error_label.pack(padx=15)
+        PrimaryButton(self, text="Generate", command=self.generate, width=160, height=42).pack(pady=(5, 15))
+
+    def _field(self, form, row, label, value, placeholder=None):
+        ctk.CTkLabel(form, text=label, text_color=Colors.Texts.HEADERS, anchor="w").grid(
+            row=row, column=0, sticky="w", padx=10, pady=6)
+        entry = ctk.CTkEntry(form, fg_color=Colors.Inputs.BACKGROUND, border_color=Colors.Inputs.BORDER,
+                             text_color=Colors.Inputs.TEXT, placeholder_text=placeholder,
+                             placeholder_text_color=Colors.Inputs.PLACEHOLDER)
+        entry.grid(row=row, column=1, sticky="ew", padx=10, pady=6)
+        if value:
+            entry.insert(0, value)
+        return entry
+
+    def _blueprint(self):
+        tags = {}
+        for part in self.tags_entry.get().split(","):
+            if not part.strip():
+                continue
+            tag, _, count = part.rpartition(":")
+            if not tag.strip():
+                raise BlueprintError(f"Write tag quotas as tag:count, got '{part.strip()}'")
+            tags[tag.strip()] = count.strip()
+
+        blueprint = Blueprint.from_dict({
+            "types": {q_type: entry.get().strip() or 0 for q_type, entry in self.type_entries.items()},
+            "total_marks": self.marks_entry.get().strip(),
+            "tags": tags,
+            "difficulty": {level: float(entry.get().strip() or 0) / 100
+                           for level, entry in self.difficulty_entries.items()},
+            "exclude_recent_days": self.recent_entry.get().strip(),
+        })
+        blueprint.validate()
+        return blueprint
+
+    def generate(self):
+        try:
+            blueprint = self._blueprint()
+            variants = int(self.variants_entry.get().strip() or 1)
+            if variants < 1:
+                raise ValueError("Variants must be at least 1")
+        except ValueError as e:
+            self.error_label.configure(text=str(e))
+            return
+        self.error_label.configure(text="")
+
+        def draw(job):
+            candidates = self.store.candidate_pool(list(blueprint.types), blueprint.exclude_recent_days)
+            papers = assemble(candidates, blueprint, variants=variants)
+            rows = []
+            for number, question_ids in enumerate(papers, start=1):
+                rows.append(self.store.fetch_by_ids(question_ids))
+                job.report(number, len(papers))
+            self.store.record_usage([question_id for question_ids in papers for question_id in question_ids])
+            return rows
+
+        run_with_progress(
+            self, draw, title="Generating", message="Drawing questions from the bank...",
+            on_done=self._on_generated, on_error=self._on_failed
+        )
+
+    def _on_generated(self, rows):
+        self.destroy()
+        self.on_generated(rows)
+
+    def _on_failed(self, error):
+        if isinstance(error, BlueprintError):
+            self.error_label.configure(text=str(error))
+        else:
+            messagebox.showerror("Something went Wrong!", f"Error generating paper: {error}", parent=self)
@@ -0,0 +1,547 @@
+# ==========================================================
+#  * Module : pdf_layout.py - Paper Page Layout
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Lays a paper out in two passes. Pass 1 measures every
+#      block (instructions, each question with its options and
+#      answer) with the font_registry glyph-width tables,
+#      wrapping text to the width it is drawn in. Pass 2 places
+#      the blocks on pages, moving a question that would
+#      straddle a page break to the next page whole, and emits
+#      plain drawing ops. The same ops are replayed onto a PDF
+#      canvas or a preview, so both show identical pages.
+#
+#      Question and option text is read as codex notation
+#      (codex_text) and typeset: scripts are set smaller on a
+#      shifted baseline, fractions and matrices are stacked, and
+#      a line holding something taller than the text is given
+#      the extra room it needs.
+#
+#      Ops are tuples (kind, x, y, *args) in PDF points with y
+#      measured up from the bottom of the page:
+#        text / text_right / text_centred : font, size, color, string
+#        hline  : x2, line width, color
+#        vline  : height, line width, color
+#        circle : radius, stroke color or None, fill color or None
+#        image  : width, height, path
+# ==========================================================
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from reportlab.lib.pagesizes import A4
+from font_registry import string_width
+from codex_text import parse, plain_text
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 50
+PAGE_TOP = PAGE_HEIGHT - 50
+PAGE_BOTTOM = 50
+
+FONT_REGULAR = "DejaVuSans"
+FONT_BOLD = "DejaVuSansCondensed-Bold"
+INK = "#000000"
+HEADING = "#2E3B55"
+FOOTER_INK = "#4A4A4A"
+FOOTER_RULE = "#C1C1C1"
+ANSWER_FILL = "#333333"
+ANSWER_LABEL = "#FFFFFF"
+
+LINE_HEIGHT = 15
+QUESTION_GAP = 7
+OPTION_GAP = 3
+# ** Question numbers hang in their own column so wrapping does not depend on a question's position
+NUMBER_X = MARGIN
+TEXT_X = MARGIN + 30
+OPTION_X = 70
+OPTION_TEXT_X = 90
+# ** MCQ bubbles carry the letters the roster answer keys use
+OPTION_LABELS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+OPTION_LABEL_SIZE = 6
+MARKS_X = PAGE_WIDTH - 50
+
+# ** Typesetting proportions, in ems of the text size
+ASCENT, DESCENT = 0.76, 0.24
+LINE_ABOVE, LINE_BELOW = 0.9, 0.4
+SCRIPT_SCALE = 0.7
+SUPERSCRIPT_RISE, SUBSCRIPT_DROP = 0.36, 0.18
+FRACTION_SCALE = 0.8
+MATRIX_SCALE = 0.85
+MATH_AXIS = 0.3
+RULE = 0.05
+
+
+@lru_cache(maxsize=65536)
+def text_width(text, font, size):
+    return string_width(text, font, size)
+
+
+def _split_word(word, font, size, max_width):
+    # ** A word wider than the line is cut where it stops fitting
+    pieces, piece = [], ""
+    for char in word:
+        if piece and text_width(piece + char, font, size) > max_width:
+            pieces.append(piece)
+            piece = ""
+        piece += char
+    return pieces + [piece]
+
+
+@lru_cache(maxsize=16384)
+def wrap_text(text, font, size, max_width):
+    # ** Greedy wrap on measured word widths; explicit line breaks in the text are kept
+    space = text_width(" ", font, size)
+    lines = []
+    for paragraph in str(text).split("\n"):
+        line, line_width = [], 0.0
+        for word in paragraph.split():
+            width = text_width(word, font, size)
+            if width > max_width:
+                if line:
+                    lines.append(" ".join(line))
+                *full, word = _split_word(word, font, size, max_width)
+                lines.extend(full)
+                line, line_width = [word], text_width(word, font, size)
+                continue
+            if line and line_width + space + width > max_width:
+                lines.append(" ".join(line))
+                line, line_width = [], 0.0
+            line_width += (space if line else 0) + width
+            line.append(word)
+        if line or not lines:
+            lines.append(" ".join(line))
+    return tuple(lines)
+
+
+@dataclass(frozen=True, slots=True)
+class Box:
+    # ** Typeset text: items are ("text", dx, dy, size, string), ("hline", dx, dy, dx2, width)
+    # ** or ("vline", dx, dy, height, width) from the box origin on its baseline
+    width: float
+    above: float
+    below: float
+    items: tuple
+
+
+def _run(text, font, size, dy=0):
+    return Box(text_width(text, font, size), dy + ASCENT * size, DESCENT * size - dy, (("text", 0, dy, size, text),))
+
+
+def _moved(items, dx, dy):
+    moved = []
+    for item in items:
+        if item[0] == "text":
+            moved.append((item[0], item[1] + dx, item[2] + dy) + item[3:])
+        elif item[0] == "hline":
+            moved.append((item[0], item[1] + dx, item[2] + dy, item[3] + dx, item[4]))
+        else:
+            moved.append((item[0], item[1] + dx, item[2] + dy) + item[3:])
+    return moved
+
+
+def _row(boxes, size, gap=0.0):
+    # ** Boxes side by side on one baseline
+    x, above, below, items = 0.0, ASCENT * size, DESCENT * size, []
+    for box in boxes:
+        items.extend(_moved(box.items, x, 0))
+        x += box.width + gap
+        above, below = max(above, box.above), max(below, box.below)
+    return Box(x - gap if boxes else 0.0, above, below, tuple(items))
+
+
+@lru_cache(maxsize=16384)
+def typeset(nodes, font, size):
+    return _row([_node(node, font, size) for node in nodes], size)
+
+
+def _node(node, font, size):
+    kind = node[0]
+    if kind == "run":
+        _, text, shift = node
+        if shift == 0:
+            return _run(text, font, size)
+        rise = SUPERSCRIPT_RISE * size if shift > 0 else -SUBSCRIPT_DROP * size
+        return _run(text, font, size * SCRIPT_SCALE, rise)
+    if kind == "frac":
+        return _fraction(typeset(node[1], font, size * FRACTION_SCALE), typeset(node[2], font, size * FRACTION_SCALE), size)
+    if kind == "under":
+        return _under(_run(node[1], font, size), typeset(node[2], font, size * SCRIPT_SCALE), size)
+    return _fence(node[1], [[typeset(cell, font, size * MATRIX_SCALE) for cell in row] for row in node[2]], size)
+
+
+def _fraction(numerator, denominator, size):
+    pad, gap, rule, axis = 0.12 * size, 0.15 * size, RULE * size, MATH_AXIS * size
+    width = max(numerator.width, denominator.width) + 2 * pad
+    up = axis + rule / 2 + gap + numerator.below
+    down = axis - rule / 2 - gap - denominator.above
+    items = _moved(numerator.items, (width - numerator.width) / 2, up)
+    items += _moved(denominator.items, (width - denominator.width) / 2, down)
+    items.append(("hline", pad / 2, axis, width - pad / 2, rule))
+    return Box(width, up + numerator.above, denominator.below - down, tuple(items))
+
+
+def _under(base, script, size):
+    # ** lim with its approach set centred beneath
+    width = max(base.width, script.width)
+    down = -0.12 * size - script.above
+    items = _moved(base.items, (width - base.width) / 2, 0)
+    items += _moved(script.items, (width - script.width) / 2, down)
+    return Box(width, base.above, script.below - down, tuple(items))
+
+
+def _fence(kind, rows, size):
+    # ** Cells centred in their columns; the rows are centred on the maths axis between brackets or bars
+    columns = max(len(row) for row in rows)
+    widths = [max((row[column].width for row in rows if column < len(row)), default=0) for column in range(columns)]
+    gap, inner, lead, rule = 0.6 * size, 0.25 * size, 0.1 * size, RULE * 1.2 * size
+    heights = [max(cell.above for cell in row) + max(cell.below for cell in row) + lead for row in rows]
+    top = MATH_AXIS * size + sum(heights) / 2
+    bottom = top - sum(heights)
+
+    left = rule + inner
+    items, y = [], top
+    for row, height in zip(rows, heights):
+        baseline = y - lead / 2 - max(cell.above for cell in row)
+        x = left
+        for cell, width in zip(row, widths):
+            items.extend(_moved(cell.items, x + (width - cell.width) / 2, baseline))
+            x += width + gap
+        y -= height
+    width = left + sum(widths) + gap * (columns - 1) + inner + rule
+
+    for x in (rule / 2, width - rule / 2):
+        items.append(("vline", x, bottom, top - bottom, rule))
+    if kind == "matrix":
+        tick = 0.2 * size
+        for y in (bottom, top):
+            items.append(("hline", 0, y, tick, rule))
+            items.append(("hline", width - tick, y, width, rule))
+    outer = 0.1 * size
+    return Box(width + 2 * outer, top + rule, rule - bottom, tuple(_moved(items, outer, 0)))
+
+
+@dataclass(frozen=True, slots=True)
+class TextLine:
+    # ** A wrapped line; rise and drop are the room it needs above and below an ordinary line of text
+    width: float
+    rise: float
+    drop: float
+    items: tuple
+
+    def ops(self, x, y, font, color):
+        ops = []
+        for item in self.items:
+            if item[0] == "text":
+                ops.append(("text", x + item[1], y + item[2], font, item[3], color, item[4]))
+            elif item[0] == "hline":
+                ops.append(("hline", x + item[1], y + item[2], x + item[3], item[4], color))
+            else:
+                ops.append(("vline", x + item[1], y + item[2], item[3], item[4], color))
+        return ops
+
+
+@lru_cache(maxsize=16384)
+def text_lines(text, font, size, max_width, notation=True):
+    # ** Plain text wraps as before; codex notation is typeset word by word and wrapped on the box widths
+    plain = plain_text(str(text)) if notation else str(text)
+    if plain is not None:
+        return tuple(TextLine(text_width(line, font, size), 0, 0, (("text", 0, 0, size, line),))
+                     for line in wrap_text(plain, font, size, max_width))
+
+    space = text_width(" ", font, size)
+    lines = []
+    for paragraph in parse(str(text)):
+        words = []
+        for word in paragraph:
+            if len(word) == 1 and word[0][0] == "run" and word[0][2] == 0 \
+                    and text_width(word[0][1], font, size) > max_width:
+                words.extend(_run(piece, font, size) for piece in _split_word(word[0][1], font, size, max_width))
+            else:
+                words.append(typeset(word, font, size))
+        line, line_width = [], 0.0
+        for box in words:
+            if line and line_width + space + box.width > max_width:
+                lines.append(_text_line(line, space, size))
+                line, line_width = [], 0.0
+            line_width += (space if line else 0) + box.width
+            line.append(box)
+        if line or not lines:
+            lines.append(_text_line(line, space, size))
+    return tuple(lines)
+
+
+def _text_line(boxes, space, size):
+    box = _row(boxes, size, space)
+    return TextLine(box.width, max(0.0, box.above - LINE_ABOVE * size), max(0.0, box.below - LINE_BELOW * size), box.items)
+
+
+def _bubble(x, y, filled, label=None):
+    # ** An answer bubble, filled for the marked answer, with its option letter centred inside
+    ops = [("circle", x, y, 4, INK, None)]
+    if filled:
+        ops.append(("circle", x, y, 3, None, ANSWER_FILL))
+    if label:
+        ops.append(("text_centred", x, y - 0.36 * OPTION_LABEL_SIZE, FONT_BOLD, OPTION_LABEL_SIZE,
+                    ANSWER_LABEL if filled else INK, label))
+    return ops
+
+
+@dataclass(slots=True)
+class Line:
+    # ** One row of a block: its ops are relative to the cursor, which then moves down by advance
+    advance: float
+    ops: list = field(default_factory=list)
+    keep_with_next: bool = False
+
+
+@dataclass(slots=True)
+class Block:
+    lines: list
+    keep_together: bool = True
+    numbered: bool = False
+    number_dy: float = 0
+
+    @property
+    def height(self):
+        return sum(line.advance for line in self.lines)
+
+
+class PaperLayout:
+    def __init__(self, title, subject_details, instructions, questions, enrollment_no="______", logo_path=None,
+                 include_header=True, include_footer=True, show_answers=False, typeset_notation=True):
+        self.title = title
+        self.subject_details = subject_details
+        if isinstance(instructions, list):
+            instructions = "\n".join(instructions)
+        self.instructions = (instructions or "").strip()
+        self.questions = questions
+        self.enrollment_no = enrollment_no
+        self.logo_path = logo_path
+        self.include_header = include_header
+        self.include_footer = include_footer
+        self.show_answers = show_answers
+        # ** Off prints the question text exactly as typed, for papers where x_1 or 3/4 is literal
+        self.typeset_notation = typeset_notation
+
+    # ---------- pass 1: measure ----------
+
+    def measure(self):
+        blocks = []
+        if self.include_header and self.instructions:
+            blocks.append(self._instructions_block())
+        blocks.append(Block([Line(20, [("hline", MARGIN, 0, PAGE_WIDTH - MARGIN, 1, INK)])]))
+        blocks.extend(self.question_block(question) for question in self.questions)
+        return blocks
+
+    def _instructions_block(self):
+        lines = [Line(20, [("text", MARGIN, 0, FONT_BOLD, 12, HEADING, "Instructions:")], keep_with_next=True)]
+        for paragraph in self.instructions.split("\n"):
+            wrapped = wrap_text(paragraph, FONT_REGULAR, 11, PAGE_WIDTH - 60 - MARGIN)
+            for text in wrapped:
+                lines.append(Line(LINE_HEIGHT, [("text", 60, 0, FONT_REGULAR, 11, INK, text)]))
+            lines[-1].advance += 2
+        return Block(lines, keep_together=False)
+
+    def question_block(self, question):
+        # ** The number is added when the block is placed, so one measured block serves every position
+        text = text_lines(question['text'], FONT_BOLD, 12, MARKS_X - 10 - TEXT_X, self.typeset_notation)
+        lines = [Line(LINE_HEIGHT + line.rise + line.drop, line.ops(TEXT_X, -line.rise, FONT_BOLD, INK))
+                 for line in text]
+        lines.append(Line(QUESTION_GAP, [("text", MARKS_X, 0, FONT_REGULAR, 11, INK, f"{question['marks']}")]))
+
+        options = question.get('options') or []
+        correct = question.get('correct') if self.show_answers else None
+        if options:
+            lines.extend(self._option_lines(options, correct, labelled=question['type'] == 'MCQ'))
+        if question['type'] in ('One Word', 'True/False') and self.show_answers and 'correct' in question:
+            for line in text_lines(f"Answer: {question.get('correct', 'N/A')}", FONT_REGULAR, 11,
+                                   PAGE_WIDTH - MARGIN - MARGIN, self.typeset_notation):
+                lines.append(Line(LINE_HEIGHT + line.rise + line.drop, line.ops(MARGIN, -line.rise, FONT_REGULAR, INK)))
+        lines.append(Line(QUESTION_GAP))
+        # ** A tall first line moves the text down, and the number with it
+        return Block(lines, numbered=True, number_dy=-text[0].rise)
+
+    def _option_lines(self, options, correct, labelled=False):
+        labels = [OPTION_LABELS[index] if labelled and index < len(OPTION_LABELS) else None
+                  for index in range(len(options))]
+        single = [text_lines(option, FONT_REGULAR, 11, float("inf"), self.typeset_notation) for option in options]
+        widths = [lines[0].width for lines in single]
+        # ** Options share one row when they fit between the option column and the right margin
+        if all(len(lines) == 1 for lines in single) \
+                and OPTION_X + sum(widths) + 20 * (len(options) - 1) <= PAGE_WIDTH - MARGIN:
+            rise = max(lines[0].rise for lines in single)
+            drop = max(lines[0].drop for lines in single)
+            ops, x = [], OPTION_X
+            for index, (option, lines, width) in enumerate(zip(options, single, widths)):
+                ops.extend(_bubble(x - 10, 2 - rise, option == correct, labels[index]))
+                ops.extend(lines[0].ops(x, -rise, FONT_REGULAR, INK))
+                x += width + 20
+            return [Line(20 + rise + drop, ops)]
+
+        lines = []
+        for index, option in enumerate(options):
+            wrapped = text_lines(option, FONT_REGULAR, 11, PAGE_WIDTH - MARGIN - OPTION_TEXT_X, self.typeset_notation)
+            first = wrapped[0]
+            ops = _bubble(OPTION_X, -first.rise, option == correct, labels[index])
+            ops.extend(first.ops(OPTION_TEXT_X, -4 - first.rise, FONT_REGULAR, INK))
+            lines.append(Line(12 + OPTION_GAP + first.rise + first.drop, ops))
+            for line in wrapped[1:]:
+                lines.append(Line(12 + OPTION_GAP + line.rise + line.drop,
+                                  line.ops(OPTION_TEXT_X, -4 - line.rise, FONT_REGULAR, INK)))
+        return lines
+
+    # ---------- pass 2: paginate ----------
+
+    def header_ops(self):
+        if not self.include_header:
+            return [], PAGE_HEIGHT - 100
+        details = self.subject_details
+        right = PAGE_WIDTH - 150
+        ops = [
+            ("text_centred", PAGE_WIDTH / 2, PAGE_HEIGHT - 50, FONT_BOLD, 24, HEADING, self.title),
+            ("text", MARGIN, PAGE_HEIGHT - 110, FONT_BOLD, 12, HEADING, f"Subject Code: {details['subject_code']}"),
+            ("text", right, PAGE_HEIGHT - 110, FONT_BOLD, 12, HEADING, f"Date: {details['subject_date']}"),
+            ("text", MARGIN, PAGE_HEIGHT - 130, FONT_BOLD, 12, HEADING, f"Subject Name: {details['subject_name']}"),
+            ("text_right", PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 130, FONT_BOLD, 12, HEADING,
+             f"Enrollment No: {self.enrollment_no}"),
+            ("text", MARGIN, PAGE_HEIGHT - 150, FONT_BOLD, 12, HEADING, f"Time Duration: {details['time_duration']}"),
+            ("text", right, PAGE_HEIGHT - 150, FONT_BOLD, 12, HEADING, f"Total Marks: {details['total_marks']}"),
+            ("hline", MARGIN, PAGE_HEIGHT - 160, PAGE_WIDTH - MARGIN, 1, INK),
+        ]
+        return ops, PAGE_HEIGHT - 180
+
+    def footer_ops(self, page_number):
+        if not self.include_footer:
+            return []
+        ops = [
+            ("hline", MARGIN, 40, PAGE_WIDTH - MARGIN, 1, FOOTER_RULE),
+            ("text", MARGIN, 25, FONT_BOLD, 10, FOOTER_INK, f"Page {page_number}"),
+            ("text_right", PAGE_WIDTH - 100, 25, FONT_BOLD, 10, FOOTER_INK, "Generated by Brainy Studio"),
+        ]
+        if self.logo_path:
+            ops.append(("image", PAGE_WIDTH - 90, 10, 30, 30, self.logo_path))
+        return ops
+
+    def paginate(self, blocks, start=(0, 0), number=0):
+        # ** Yields Page bodies; each page records where it starts, so pagination can resume from any page
+        index, line_index = start
+        y = self.header_ops()[1] if start == (0, 0) else PAGE_TOP
+        usable = PAGE_TOP - PAGE_BOTTOM
+        page = Page(start, number)
+
+        while index < len(blocks):
+            block = blocks[index]
+            if line_index == 0:
+                if block.keep_together and y - block.height < PAGE_BOTTOM and block.height <= usable:
+                    yield page
+                    page, y = Page((index, 0), number), PAGE_TOP
+                if block.numbered:
+                    number += 1
+                    page.body.append(("text", NUMBER_X, y + block.number_dy, FONT_BOLD, 12, INK, f"{number}."))
+            for position in range(line_index, len(block.lines)):
+                line = block.lines[position]
+                needed = line.advance
+                if line.keep_with_next and position + 1 < len(block.lines):
+                    needed += block.lines[position + 1].advance
+                # ** Only blocks allowed to split, or too tall for any page, break between lines
+                if y - needed < PAGE_BOTTOM and y < PAGE_TOP:
+                    yield page
+                    page, y = Page((index, position), number), PAGE_TOP
+                page.body.extend((op[0], op[1], y + op[2]) + op[3:] for op in line.ops)
+                y -= line.advance
+            index, line_index = index + 1, 0
+        yield page
+
+    def page_ops(self, page, page_index):
+        header = self.header_ops()[0] if page_index == 0 else []
+        return header + page.body + self.footer_ops(page_index + 1)
+
+    def pages(self):
+        return [self.page_ops(page, page_index) for page_index, page in enumerate(self.paginate(self.measure()))]
+
+
+@dataclass(slots=True)
+class Page:
+    # ** start is (block index, line index) of the first line on the page; number counts questions before it
+    start: tuple
+    number: int
+    body: list = field(default_factory=list)
+
+
+class PageModel:
+    # ** Keeps a paper's measured blocks and pages, and re-lays out only what an option change touches
+    HEADER_OPTIONS = ("title", "subject_details", "enrollment_no")
+    FOOTER_OPTIONS = ("include_footer", "logo_path")
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.blocks = layout.measure()
+        self.top = layout.header_ops()[1]
+        self.pages = list(layout.paginate(self.blocks))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def page_ops(self, page_index):
+        return self.layout.page_ops(self.pages[page_index], page_index)
+
+    def update(self, **options):
+        # ** Returns the indexes of pages whose drawing changed; pages past the end were removed
+        layout = self.layout
+        options = {name: value for name, value in options.items() if getattr(layout, name) != value}
+        if not options:
+            return set()
+        old_header = layout.header_ops()
+        old_footer = layout.footer_ops(1)
+        for name, value in options.items():
+            setattr(layout, name, value)
+
+        changed = set()
+        if options.keys() - set(self.HEADER_OPTIONS) - set(self.FOOTER_OPTIONS):
+            changed |= self._relayout(layout.measure())
+        if layout.header_ops() != old_header:
+            changed.add(0)
+        if layout.footer_ops(1) != old_footer:
+            changed |= set(range(len(self.pages)))
+        return changed
+
+    def _relayout(self, blocks):
+        old_blocks, old_pages = self.blocks, self.pages
+        self.blocks = blocks
+        first = 0
+        while first < min(len(blocks), len(old_blocks)) and blocks[first] == old_blocks[first]:
+            first += 1
+        top = self.layout.header_ops()[1]
+        if first == len(blocks) == len(old_blocks) and top == self.top:
+            return set()
+        if top != self.top:
+            # ** The header moved where page 1 starts, so every page may move
+            first, self.top = 0, top
+
+        # ** Blocks at the end that did not change; a page starting among them with the same number lays out as before
+        same_tail = 0
+        while same_tail < min(len(blocks), len(old_blocks)) - first \
+                and blocks[-1 - same_tail] == old_blocks[-1 - same_tail]:
+            same_tail += 1
+        shift = len(blocks) - len(old_blocks)
+        old_starts = {(page.start, page.number): position for position, page in enumerate(old_pages)}
+
+        # ** Resume from the last page that starts before the first changed block
+        resume = 0
+        for position, page in enumerate(old_pages):
+            if page.start[0] < first and position:
+                resume = position
+        pages = old_pages[:resume]
+        for page in self.layout.paginate(blocks, old_pages[resume].start if resume else (0, 0),
+                                         old_pages[resume].number if resume else 0):
+            old_start = (page.start[0] - shift, page.start[1])
+            reuse = old_starts.get((old_start, page.number))
+            if len(pages) > resume and page.start[0] >= len(blocks) - same_tail and reuse is not None:
+                pages.extend(Page((old.start[0] + shift, old.start[1]), old.number, old.body) for old in old_pages[reuse:])
+                break
+            pages.append(page)
+        self.pages = pages
+
+        return {position for position, page in enumerate(pages)
+                if position >= len(old_pages) or page.body != old_pages[position].body} \
+            | set(range(len(pages), len(old_pages)))
@@ -0,0 +1,121 @@
+# ==========================================================
+#  * Module : pdf_preview.py - In-App Paper Preview
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Draws the pages of a pdf_layout.PageModel as thumbnails,
+#      from the same drawing ops the PDF is written from. Only
+#      the pages an update reports as changed are redrawn, a
+#      couple per event-loop turn, so the window stays usable
+#      while a long paper repaints.
+# ==========================================================
+
+import tkinter as tk
+import customtkinter as ctk
+from functools import lru_cache
+from PIL import Image, ImageTk
+from pdf_layout import PAGE_WIDTH, PAGE_HEIGHT
+from ui_components import Colors
+
+# ** Tk has no access to the TTF files reportlab embeds; the installed DejaVu families stand in for them
+TK_FONTS = {
+    "DejaVuSans": ("DejaVu Sans Condensed", "normal"),
+    "DejaVuSansCondensed-Bold": ("DejaVu Sans Condensed", "bold"),
+    "DejaVuSans-BoldOblique": ("DejaVu Sans", "bold italic"),
+}
+ANCHORS = {"text": "sw", "text_right": "se", "text_centred": "s"}
+PAGES_PER_TURN = 2
+DEFAULT_SCALE = 0.45
+
+
+@lru_cache(maxsize=8)
+def _scaled_image(path, width, height):
+    image = Image.open(path)
+    image.thumbnail((max(width, 1), max(height, 1)))
+    return image
+
+
+class PagePreview(ctk.CTkScrollableFrame):
+    def __init__(self, master, scale=DEFAULT_SCALE, **kwargs):
+        super().__init__(master, **kwargs)
+        self.scale = scale
+        self.model = None
+        self.canvases = []
+        self._photos = {}
+        self._pending = []
+        self._job = None
+
+    def show(self, model, changed=None):
+        # ** changed is the set PageModel.update returned; None redraws every page
+        self.model = model
+        pending = set(range(len(model))) if changed is None else {index for index in changed if index < len(model)}
+        while len(self.canvases) > len(model):
+            self.canvases.pop().destroy()
+        while len(self.canvases) < len(model):
+            canvas = tk.Canvas(self, width=PAGE_WIDTH * self.scale, height=PAGE_HEIGHT * self.scale,
+                               bg="white", highlightthickness=1, highlightbackground=Colors.Texts.BORDER)
+            canvas.pack(pady=6)
+            pending.add(len(self.canvases))
+            self.canvases.append(canvas)
+
+        self._pending = sorted(index for index in set(self._pending) | pending if index < len(model))
+        if self._pending and self._job is None:
+            self._job = self.after(0, self._draw_batch)
+
+    def clear(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        self._pending = []
+        while self.canvases:
+            self.canvases.pop().destroy()
+        self.model = None
+
+    def _draw_batch(self):
+        self._job = None
+        if not self.winfo_exists() or self.model is None:
+            return
+        batch, self._pending = self._pending[:PAGES_PER_TURN], self._pending[PAGES_PER_TURN:]
+        for index in batch:
+            self._draw_page(index)
+        if self._pending:
+            self._job = self.after(1, self._draw_batch)
+
+    def _font(self, face, size):
+        family, style = TK_FONTS.get(face, ("DejaVu Sans", "normal"))
+        # ** Negative sizes are pixels, so text scales with the page instead of the screen DPI
+        return (family, -max(round(size * self.scale), 1), style)
+
+    def _photo(self, path, width, height):
+        key = (path, round(width), round(height))
+        if key not in self._photos:
+            try:
+                self._photos[key] = ImageTk.PhotoImage(_scaled_image(*key))
+            except OSError:
+                self._photos[key] = None
+        return self._photos[key]
+
+    def _draw_page(self, index):
+        canvas, scale = self.canvases[index], self.scale
+        canvas.delete("all")
+        for op in self.model.page_ops(index):
+            kind, x, y = op[0], op[1] * scale, (PAGE_HEIGHT - op[2]) * scale
+            if kind in ANCHORS:
+                _, _, _, face, size, color, text = op
+                canvas.create_text(x, y, text=text, fill=color, font=self._font(face, size), anchor=ANCHORS[kind])
+            elif kind == "hline":
+                _, _, _, x2, line_width, color = op
+                canvas.create_line(x, y, x2 * scale, y, fill=color, width=max(line_width * scale, 1))
+            elif kind == "vline":
+                _, _, _, height, line_width, color = op
+                canvas.create_line(x, y, x, y - height * scale, fill=color, width=max(line_width * scale, 1))
+            elif kind == "circle":
+                _, _, _, radius, stroke, fill = op
+                radius *= scale
+                canvas.create_oval(x - radius, y - radius, x + radius, y + radius,
+                                   outline=stroke or "", fill=fill or "")
+            elif kind == "image":
+                _, _, _, width, height, path = op
+                photo = self._photo(path, width * scale, height * scale)
+                if photo is not None:
+                    canvas.create_image(x, y, image=photo, anchor="sw")
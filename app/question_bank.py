@@ -1,14 +1,12 @@
 import customtkinter as ctk
 from tkinter import filedialog, ttk, messagebox
 from utils import centerWindow, getPath
-import pandas as pd
-import os
+from question_store import QuestionStore, SORT_KEYS
+from ui_components import VirtualTreeview, SearchController
+from job_runner import run_with_progress
 import sys
 
 
-EXCEL_FILE = r"D:\github_projects\brainy-studio\app\database\question_bank.xlsx"
-
-
 class QuestionBank(ctk.CTkToplevel):
     def __init__(self, master, parent=None):
         super().__init__(master=master)
@@ -22,7 +20,7 @@ class QuestionBank(ctk.CTkToplevel):
             pass
         self.geometry(centerWindow(master, 900, 500, self._get_window_scaling()))
         self.configure(fg_color="#0F172A")
-        self.question_data = None
+        self.store = QuestionStore()
         self.lift()
         self.focus_force()
 
@@ -31,10 +29,10 @@ class QuestionBank(ctk.CTkToplevel):
 
         self.search_entry = ctk.CTkEntry(self.navbar, placeholder_text="Search Questions...", width=300, fg_color="#334155", text_color="white", corner_radius=8)
         self.search_entry.pack(side="left", padx=10, pady=10)
-        self.search_entry.bind("<KeyRelease>", self.filter_questions)
+        self.search_controller = SearchController(self.search_entry, self.filter_questions)
 
         self.sort_by = ctk.StringVar(value="Sort by")
-        self.sort_combobox = ctk.CTkComboBox(self.navbar, values=["Question ID", "Tags", "Marks", "Question Type"], variable=self.sort_by, fg_color="#334155", text_color="white", button_color="#6366F1", dropdown_text_color="white", corner_radius=8, command=self.sort_questions)
+        self.sort_combobox = ctk.CTkComboBox(self.navbar, values=list(SORT_KEYS), variable=self.sort_by, fg_color="#334155", text_color="white", button_color="#6366F1", dropdown_text_color="white", corner_radius=8, command=self.sort_questions)
         self.sort_combobox.pack(side="left", padx=10, pady=10)
 
         self.select_all_btn = ctk.CTkButton(
@@ -49,11 +47,14 @@ class QuestionBank(ctk.CTkToplevel):
         self.select_all_btn.pack(side="right", padx=10, pady=10)
         # self.select_all_btn.pack(side="right", padx=10, pady=10)
 
+        self.duplicates_btn = ctk.CTkButton(self.navbar, text="Find Duplicates", fg_color="#6366F1", hover_color="#818CF8", text_color="white", corner_radius=8, command=self.find_duplicates)
+        self.duplicates_btn.pack(side="right", padx=10, pady=10)
+
         self.upload_btn = ctk.CTkButton(self.navbar, text="Import Excel", fg_color="#6366F1", hover_color="#818CF8", text_color="white", corner_radius=8, command=self.import_excel)
         self.upload_btn.pack(side="right", padx=10, pady=10)
 
-        self.scroll_frame = ctk.CTkScrollableFrame(self, fg_color="#1E293B", corner_radius=10)
-        self.scroll_frame.pack(pady=10, padx=10, fill="both", expand=True)
+        self.list_frame = ctk.CTkFrame(self, fg_color="#1E293B", corner_radius=10)
+        self.list_frame.pack(pady=10, padx=10, fill="both", expand=True)
 
         style = ttk.Style()
         style.configure("Treeview",
@@ -66,29 +67,19 @@ class QuestionBank(ctk.CTkToplevel):
                         foreground="#333333",
                         fg_color="#1E293B",
                         font=("Arial", 14, "bold"))
-        
-        self.tree = ttk.Treeview(self.scroll_frame, 
-                         columns=("Question ID", "Question", "Tags", "Marks", "Options", "Question Type", "Answer"), 
-                         show="headings", selectmode="extended")
-
-        self.tree.heading("Question ID", text="ID", anchor="center")
-        self.tree.heading("Question", text="Question", anchor="w")
-        self.tree.heading("Tags", text="Tags", anchor="center")
-        self.tree.heading("Marks", text="Marks", anchor="center")
-        self.tree.heading("Question Type", text="Type", anchor="center")
-        self.tree.heading("Answer", text="Answer", anchor="center")
-        self.tree.heading("Options", text="Options", anchor="w")
-
-
-        self.tree.column("Question ID", width=120, anchor="center")
-        self.tree.column("Question", width=300, anchor="w")
-        self.tree.column("Tags", width=120, anchor="center")
-        self.tree.column("Marks", width=80, anchor="center")
-        self.tree.column("Question Type", width=100, anchor="center")
-        self.tree.column("Answer", width=120, anchor="center")
-        self.tree.column("Options", width=250, anchor="w")
-
 
+        self.tree = VirtualTreeview(
+            self.list_frame,
+            columns=[("Question ID", "ID", 120, "center"),
+                     ("Question", "Question", 300, "w"),
+                     ("Tags", "Tags", 120, "center"),
+                     ("Marks", "Marks", 80, "center"),
+                     ("Options", "Options", 250, "w"),
+                     ("Question Type", "Type", 100, "center"),
+                     ("Answer", "Answer", 120, "center")],
+            fetch=self.fetch_questions,
+            count=self.count_questions
+        )
         self.tree.pack(fill="both", expand=True, padx=10, pady=10)
 
         self.add_to_paper_btn = ctk.CTkButton(self, text="Add to Existing Paper", fg_color="#10B981", hover_color="#34D399", text_color="white", corner_radius=8, command=self.add_selected_questions)
@@ -98,68 +89,86 @@ class QuestionBank(ctk.CTkToplevel):
 
     def import_excel(self):
         self.attributes("-topmost", False)
-        file_path = filedialog.askopenfilename(filetypes=[("Excel Files", "*.xlsx")])
+        file_path = filedialog.askopenfilename(filetypes=[("Question Banks", "*.xlsx *.csv"), ("Excel Files", "*.xlsx"), ("CSV Files", "*.csv")])
         self.attributes("-topmost", True)
 
         if file_path:
-            try:
-                df = pd.read_excel(file_path, engine="openpyxl")
-
-                required_columns = {"Question ID", "Question", "Tags", "Marks", "Options", "Question Type", "Answer"}
-                if not required_columns.issubset(df.columns):
-                    messagebox.showerror("Invalid Format", "Invalid file format! Missing required columns.")
-                    return
+            # ** Exact duplicates are always skipped; reworded copies of bank questions only when asked
+            near_duplicates = "skip" if messagebox.askyesno(
+                "Import Questions", "Skip rows that are near-duplicates of questions already in the bank?", parent=self) else None
+            run_with_progress(
+                self, lambda job: self.store.import_file(file_path, job.report, near_duplicates=near_duplicates),
+                title="Importing", message="Importing questions...",
+                on_done=self._on_imported, on_error=self._on_import_failed, on_cancel=self.load_questions
+            )
+
+    def _on_imported(self, report):
+        self.load_questions()
+        if not report.problems:
+            messagebox.showinfo("Import Complete", report.summary())
+            return
 
-                output_file = EXCEL_FILE if EXCEL_FILE.endswith(".xlsx") else EXCEL_FILE + ".xlsx"
+        if messagebox.askyesno("Import Complete", report.summary() + "\n\nSave a report of the skipped rows?"):
+            self.attributes("-topmost", False)
+            report_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")],
+                                                       initialfile="import-report.csv", title="Save Import Report")
+            self.attributes("-topmost", True)
+            if report_path:
+                report.save(report_path)
+
+    def _on_import_failed(self, error):
+        if isinstance(error, ValueError):
+            messagebox.showerror("Invalid Format", str(error))
+        else:
+            messagebox.showerror("Something went Wrong!", f"Error loading file: {error}")
+
+    def find_duplicates(self):
+        run_with_progress(
+            self, lambda job: self.store.find_duplicates(progress=job.report),
+            title="Finding Duplicates", message="Comparing questions...",
+            on_done=self._show_duplicates,
+            on_error=lambda e: messagebox.showerror("Something went Wrong!", f"Error finding duplicates: {e}")
+        )
 
-                df.to_excel(output_file, index=False, engine="openpyxl")
-                self.load_questions()
+    def _show_duplicates(self, clusters):
+        if not clusters:
+            messagebox.showinfo("No Duplicates", "No near-duplicate questions were found.", parent=self)
+            return
+        DuplicateGroups(self, clusters, on_delete=self._delete_duplicates)
 
-            except Exception as e:
-                messagebox.showerror("Something went Wrong!", f"Error loading file: {e}")
+    def _delete_duplicates(self, question_ids):
+        self.store.delete_questions(question_ids)
+        self.tree.deselect(question_ids)
+        self.tree.refresh(keep_selection=True, keep_position=True)
 
     def load_questions(self):
-        if os.path.exists(EXCEL_FILE):
-            try:
-                self.question_data = pd.read_excel(EXCEL_FILE)
-                self.display_questions()
-            except Exception as e:
-                messagebox.showerror("Error Occurred!", f"Error loading questions: {e}")
-    
-    def display_questions(self, filtered_data=None):
-        self.tree.delete(*self.tree.get_children())  
-        data = filtered_data if filtered_data is not None else self.question_data
-    
-        for _, row in data.iterrows():
-            full_question = row["Question"]  
-            displayed_question = (full_question[:50] + "...") if len(full_question) > 50 else full_question
-    
-            self.tree.insert("", "end", values=(
-                row["Question ID"], full_question, row["Tags"], row["Marks"], row["Options"], row["Question Type"], row["Answer"]
-            ), tags=(displayed_question,))
+        try:
+            self.store.migrate_workbook()
+            self.tree.refresh()
+        except Exception as e:
+            messagebox.showerror("Error Occurred!", f"Error loading questions: {e}")
+
+    def fetch_questions(self, offset, limit):
+        return self.store.fetch_questions(
+            search_query=self.search_entry.get().strip() or None,
+            sort_by=self.sort_by.get(),
+            limit=limit,
+            offset=offset
+        )
+
+    def count_questions(self):
+        return self.store.count_questions(search_query=self.search_entry.get().strip() or None)
     
     def sort_questions(self, event=None):
-        selected_sort = self.sort_by.get()
-        if selected_sort in self.question_data.columns:
-            self.question_data = self.question_data.sort_values(by=[selected_sort], ascending=True)
-            self.display_questions()
+        self.tree.refresh(keep_selection=True)
     
-    def filter_questions(self, event=None):
-        query = self.search_entry.get().strip().lower()
-        filtered_data = self.question_data[self.question_data.apply(lambda row: query in str(row["Question"]).lower() or query in str(row["Tags"]).lower(), axis=1)]
-        self.display_questions(filtered_data)
+    def filter_questions(self, query=None):
+        self.tree.refresh(keep_selection=True)
 
     def add_selected_questions(self):
-        selected_items = self.tree.selection()
         selected_questions = [
-            (self.tree.item(item, "values")[0],  # & Question ID
-             self.tree.item(item, "values")[1],  # & Question Text
-             self.tree.item(item, "values")[2],  # & Tags
-             int(float(self.tree.item(item, "values")[3])),  # & Marks
-             self.tree.item(item, "values")[4],  # & Options
-             self.tree.item(item, "values")[5],  # & Question Type
-             self.tree.item(item, "values")[6])  # & Answer
-            for item in selected_items
+            (question_id, text, tags, int(marks), options, q_type, answer)
+            for question_id, text, tags, marks, options, q_type, answer in self.tree.selected_rows()
         ]
 
         if not selected_questions:
@@ -170,8 +179,57 @@ class QuestionBank(ctk.CTkToplevel):
         self.destroy()
 
     def select_all(self):
-        items = self.tree.get_children()
-        if items:
-            self.tree.selection_set(items)
+        if self.tree.total:
+            self.tree.select_all()
         else:
-            messagebox.showinfo("No Questions", "No questions available to select.")
\ No newline at end of file
+            messagebox.showinfo("No Questions", "No questions available to select.")
+
+
+class DuplicateGroups(ctk.CTkToplevel):
+    # ** One expandable row per group of near-duplicates; the copies picked here can be deleted from the bank
+    def __init__(self, master, clusters, on_delete):
+        super().__init__(master=master)
+        self.on_delete = on_delete
+        self.attributes("-topmost", True)
+        self.title("Near-Duplicate Questions")
+        self.geometry(centerWindow(master, 800, 450, self._get_window_scaling()))
+        self.configure(fg_color="#0F172A")
+
+        ctk.CTkLabel(self, text=f"{len(clusters)} groups of similar questions. Select the copies to remove.",
+                     text_color="white").pack(padx=10, pady=(10, 0), anchor="w")
+
+        frame = ctk.CTkFrame(self, fg_color="#1E293B", corner_radius=10)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tree = ttk.Treeview(frame, columns=("Question",), selectmode="extended")
+        self.tree.heading("#0", text="Question ID")
+        self.tree.heading("Question", text="Question")
+        self.tree.column("#0", width=160)
+        self.tree.column("Question", width=580)
+        scrollbar = ctk.CTkScrollbar(frame, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        for number, cluster in enumerate(clusters, start=1):
+            group = self.tree.insert("", "end", text=f"Group {number}", values=(f"{len(cluster)} questions",), open=number <= 20)
+            for question_id, text in cluster:
+                self.tree.insert(group, "end", iid=question_id, text=question_id, values=(" ".join(text.split()),))
+
+        self.delete_btn = ctk.CTkButton(self, text="Delete Selected", fg_color="#EF4444", hover_color="#F87171", text_color="white", corner_radius=8, command=self.delete_selected)
+        self.delete_btn.pack(pady=(0, 10))
+
+    def delete_selected(self):
+        # ** Group rows have no parent; only question rows can be deleted
+        question_ids = [item for item in self.tree.selection() if self.tree.parent(item)]
+        if not question_ids:
+            messagebox.showwarning("No Selection", "Please select the questions to delete.", parent=self)
+            return
+        if not messagebox.askyesno("Delete Questions", f"Delete {len(question_ids)} questions from the bank?", parent=self):
+            return
+
+        self.on_delete(question_ids)
+        for question_id in question_ids:
+            group = self.tree.parent(question_id)
+            self.tree.delete(question_id)
+            if len(self.tree.get_children(group)) < 2:
+                self.tree.delete(group)
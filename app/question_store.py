@@ -0,0 +1,554 @@
+# ==========================================================
+#  * Module : question_store.py - Question Bank Storage
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Keeps the question bank in brainy-studio.db. Questions
+#      live in `questions`, with their tags and MCQ options in
+#      `question_tags` and `question_options`. Excel imports
+#      are upserted by Question ID, so re-importing a sheet
+#      only touches the rows it contains. Imports stream the
+#      sheet row by row, validate each row, skip duplicates by
+#      ID and by normalised text, and collect every rejected
+#      row in an ImportReport. Near-duplicates (reworded
+#      copies) are found with the MinHash index in
+#      brainy_core.dedup and can be skipped or merged into the
+#      question they copy.
+#
+#      Search goes through an FTS5 index over question text,
+#      tags, options and answers, ranked with bm25. SQLite
+#      builds without FTS5 fall back to LIKE matching.
+#
+#      Sorting happens in SQL on composite indexes (type, then
+#      marks, then ID and so on). Pages after the first seek
+#      past the last row of the page before them (a keyset
+#      cursor) instead of counting through an OFFSET.
+# ==========================================================
+
+import csv
+import os
+import re
+import sqlite3
+from utils import getPath
+from brainy_core.model import text_key, validate_bank_row
+from brainy_core.serialization import BankReader
+from brainy_core.dedup import DuplicateIndex, DEFAULT_THRESHOLD, NEAR_DUPLICATE_MODES, SIGNATURE_BATCH, signature
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    question_id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    tags TEXT NOT NULL DEFAULT '',
+    marks INTEGER NOT NULL DEFAULT 0,
+    question_type TEXT NOT NULL,
+    answer TEXT NOT NULL DEFAULT '',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    text_key TEXT NOT NULL DEFAULT '',
+    tags_key TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS question_tags (
+    question_id TEXT NOT NULL REFERENCES questions(question_id) ON DELETE CASCADE,
+    tag TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (question_id, tag)
+);
+CREATE TABLE IF NOT EXISTS question_options (
+    question_id TEXT NOT NULL REFERENCES questions(question_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    option_text TEXT NOT NULL,
+    PRIMARY KEY (question_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_questions_sort_type ON questions(question_type, marks, question_id);
+CREATE INDEX IF NOT EXISTS idx_questions_sort_marks ON questions(marks, question_id);
+CREATE INDEX IF NOT EXISTS idx_question_tags_tag ON question_tags(tag);
+CREATE TABLE IF NOT EXISTS question_usage (
+    question_id TEXT NOT NULL REFERENCES questions(question_id) ON DELETE CASCADE,
+    used_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_question_usage_used_at ON question_usage(used_at, question_id);
+"""
+
+# ** Keyed by questions.rowid so index updates never scan the table
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    question, tags, options, answer,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+# ** bm25 column weights: question text first, then tags, then options and answer
+FTS_RANK = "bm25(questions_fts, 10.0, 5.0, 2.0, 2.0)"
+
+# ** Same column order as the bank sheet: (id, text, tags, marks, options, type, answer)
+SELECT_ROWS = """
+SELECT q.question_id, q.question, q.tags, q.marks,
+       COALESCE((SELECT group_concat(option_text, ', ')
+                 FROM (SELECT option_text FROM question_options o
+                       WHERE o.question_id = q.question_id ORDER BY position)), ''),
+       q.question_type, q.answer
+FROM questions q
+"""
+
+# ** Every sort ends on question_id, so the order is total and a page boundary is a unique cursor.
+# ** Each key list matches one of the idx_questions_sort_* indexes, so no sort ever reads the whole table.
+SORT_KEYS = {
+    "Question ID": ("q.question_id",),
+    "Tags": ("q.tags_key", "q.question_id"),
+    "Marks": ("q.marks", "q.question_id"),
+    "Question Type": ("q.question_type", "q.marks", "q.question_id"),
+}
+# ** Reads each sort column's value off a SELECT_ROWS row, to take the cursor from the last row of a page
+CURSOR_FIELDS = {
+    "q.question_id": lambda row: row[0],
+    "q.tags_key": lambda row: row[2].casefold(),
+    "q.marks": lambda row: row[3],
+    "q.question_type": lambda row: row[5],
+}
+CURSOR_QUERIES = 16
+# ** A tag on at least 1 in COMMON_TAG_SHARE questions is filtered row by row along the sort order
+COMMON_TAG_SHARE = 20
+
+LEGACY_WORKBOOK = r"database\question_bank.xlsx"
+IMPORT_BATCH_SIZE = 5000
+PROGRESS_EVERY = 250
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query):
+    return _TERM.findall(query.lower()) if query else []
+
+
+def fts_query(query):
+    # ** Every term must match, and each one also matches as a prefix so results follow the typing
+    return " ".join(f'"{term}"*' for term in search_terms(query))
+
+
+def split_tags(tags):
+    return list(dict.fromkeys(tag.strip() for tag in tags.split(",") if tag.strip()))
+
+
+def split_options(options):
+    return [option.strip() for option in options.split(", ")] if options else []
+
+
+def _chunks(values, size=500):
+    # ** Keeps IN (...) lists under SQLite's bound-parameter limit
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _marks(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class ImportReport:
+    def __init__(self, source_path):
+        self.source_path = source_path
+        self.rows = 0
+        self.added = 0
+        self.updated = 0
+        self.merged = 0
+        self.duplicates = 0
+        self.invalid = 0
+        # ** (sheet row, Question ID, column, problem) for every row that was not imported
+        self.problems = []
+
+    def reject(self, row_number, question_id, errors):
+        self.invalid += 1
+        for column, message in errors:
+            self.problems.append((row_number, question_id, column, message))
+
+    def duplicate(self, row_number, question_id, column, message):
+        self.duplicates += 1
+        self.problems.append((row_number, question_id, column, message))
+
+    def summary(self):
+        merged = f"{self.merged} merged into similar questions, " if self.merged else ""
+        return (f"{self.rows} rows read: {self.added} added, {self.updated} updated, {merged}"
+                f"{self.duplicates} duplicates skipped, {self.invalid} invalid rows skipped")
+
+    def save(self, path):
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Row", "Question ID", "Column", "Problem"])
+            writer.writerows(self.problems)
+
+
+class QuestionStore:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or getPath(r"database\brainy-studio.db")
+        # ** (filters, sort) -> {offset: sort key of the row just before offset}, for keyset paging
+        self._cursors = {}
+        self._tag_shares = {}
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+            self._upgrade(conn)
+            self.fts = self._create_fts(conn)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _upgrade(self, conn):
+        # ** Databases created before duplicate detection have no text_key column yet
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(questions)")]
+        if "text_key" not in columns:
+            with conn:
+                conn.execute("ALTER TABLE questions ADD COLUMN text_key TEXT NOT NULL DEFAULT ''")
+                conn.executemany("UPDATE questions SET text_key = ? WHERE rowid = ?",
+                                 [(text_key(text), rowid) for rowid, text in
+                                  conn.execute("SELECT rowid, question FROM questions").fetchall()])
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_text_key ON questions(text_key)")
+        # ** SQLite cannot seek a COLLATE NOCASE row value, so tags are sorted on a stored casefolded copy
+        if "tags_key" not in columns:
+            with conn:
+                conn.execute("ALTER TABLE questions ADD COLUMN tags_key TEXT NOT NULL DEFAULT ''")
+                conn.executemany("UPDATE questions SET tags_key = ? WHERE rowid = ?",
+                                 [(tags.casefold(), rowid) for rowid, tags in
+                                  conn.execute("SELECT rowid, tags FROM questions").fetchall()])
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_sort_tags ON questions(tags_key, question_id)")
+        # ** Single-column indexes from before multi-key sorting; the sort indexes cover them as prefixes
+        conn.execute("DROP INDEX IF EXISTS idx_questions_type")
+        conn.execute("DROP INDEX IF EXISTS idx_questions_marks")
+
+    def _create_fts(self, conn):
+        try:
+            conn.execute(FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            # ! This SQLite was built without FTS5; search falls back to LIKE
+            return False
+        indexed = conn.execute("SELECT COUNT(*) FROM questions_fts").fetchone()[0]
+        if indexed != conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]:
+            self._rebuild_fts(conn)
+        return True
+
+    def _rebuild_fts(self, conn):
+        with conn:
+            conn.execute("DELETE FROM questions_fts")
+            conn.execute(
+                """INSERT INTO questions_fts (rowid, question, tags, options, answer)
+                   SELECT q.rowid, q.question, q.tags,
+                          COALESCE((SELECT group_concat(option_text, ' ') FROM question_options o
+                                    WHERE o.question_id = q.question_id), ''),
+                          q.answer
+                   FROM questions q""")
+
+    def _index_questions(self, conn, rows, existing):
+        rowids = {}
+        for chunk in _chunks([row[0] for row in rows]):
+            rowids.update(conn.execute(
+                f"SELECT question_id, rowid FROM questions WHERE question_id IN ({','.join('?' * len(chunk))})", chunk))
+        conn.executemany("DELETE FROM questions_fts WHERE rowid = ?", [(rowids[question_id],) for question_id in existing])
+        conn.executemany("INSERT INTO questions_fts (rowid, question, tags, options, answer) VALUES (?, ?, ?, ?, ?)",
+                         [(rowids[question_id], text, tags, " ".join(split_options(options)), answer)
+                          for question_id, text, tags, marks, options, q_type, answer in rows])
+
+    def count(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+        finally:
+            conn.close()
+
+    def upsert_questions(self, rows):
+        # ** rows are bank tuples; returns (added, updated)
+        if not rows:
+            return 0, 0
+        # ** The last row wins when an ID repeats within one call
+        rows = list({row[0]: row for row in rows}.values())
+        ids = [row[0] for row in rows]
+        conn = self._connect()
+        try:
+            with conn:
+                existing = set()
+                for chunk in _chunks(ids):
+                    existing.update(question_id for (question_id,) in conn.execute(
+                        f"SELECT question_id FROM questions WHERE question_id IN ({','.join('?' * len(chunk))})", chunk))
+
+                conn.executemany(
+                    """INSERT INTO questions (question_id, question, tags, marks, question_type, answer, text_key, tags_key)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(question_id) DO UPDATE SET
+                           question = excluded.question, tags = excluded.tags, marks = excluded.marks,
+                           question_type = excluded.question_type, answer = excluded.answer,
+                           text_key = excluded.text_key, tags_key = excluded.tags_key,
+                           updated_at = CURRENT_TIMESTAMP""",
+                    [(question_id, text, tags, _marks(marks), q_type, answer, text_key(text), tags.casefold())
+                     for question_id, text, tags, marks, options, q_type, answer in rows])
+
+                # ** Only questions that were already stored have old tags and options to clear
+                stale = [(question_id,) for question_id in existing]
+                conn.executemany("DELETE FROM question_tags WHERE question_id = ?", stale)
+                conn.executemany("DELETE FROM question_options WHERE question_id = ?", stale)
+                conn.executemany("INSERT OR IGNORE INTO question_tags (question_id, tag) VALUES (?, ?)",
+                                 [(row[0], tag) for row in rows for tag in split_tags(row[2])])
+                conn.executemany("INSERT INTO question_options (question_id, position, option_text) VALUES (?, ?, ?)",
+                                 [(row[0], i, option) for row in rows for i, option in enumerate(split_options(row[4]))])
+                if self.fts:
+                    self._index_questions(conn, rows, existing)
+        finally:
+            conn.close()
+        self._cursors.clear()
+        self._tag_shares.clear()
+        added = len(set(ids) - existing)
+        return added, len(ids) - added
+
+    def import_file(self, file_path, progress=None, near_duplicates=None, threshold=DEFAULT_THRESHOLD):
+        # ** Streams .xlsx or .csv rows in batches; batches already written stay if progress() cancels
+        # ** near_duplicates="skip" drops rows similar to a bank question, "merge" updates that question instead
+        if near_duplicates not in (None,) + NEAR_DUPLICATE_MODES:
+            raise ValueError(f"Unknown near-duplicate mode {near_duplicates!r}")
+        reader = BankReader(file_path)
+        report = ImportReport(file_path)
+        seen_ids, seen_keys, batch = {}, {}, []
+        index = self.duplicate_index(threshold) if near_duplicates else None
+
+        for row_number, row in reader:
+            report.rows += 1
+            question_id = row[0]
+            errors = validate_bank_row(row)
+            if errors:
+                report.reject(row_number, question_id, errors)
+            elif question_id in seen_ids:
+                report.duplicate(row_number, question_id, "Question ID",
+                                 f"Question ID already used on row {seen_ids[question_id]}")
+            else:
+                key = text_key(row[1])
+                if key in seen_keys:
+                    report.duplicate(row_number, question_id, "Question",
+                                     f"Same question as {seen_keys[key]} earlier in the file")
+                else:
+                    owner = self._near_duplicate_owner(index, near_duplicates, row_number, row, report)
+                    if owner is not False:
+                        seen_ids[question_id] = row_number
+                        seen_keys[key] = question_id
+                        # ** A merged row is written under the ID of the bank question it is folded into
+                        batch.append((row_number, (owner,) + tuple(row[1:]) if owner else row, key, owner is not None))
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                self._import_batch(batch, report)
+                batch = []
+            if progress and report.rows % PROGRESS_EVERY == 0:
+                progress(report.rows, reader.total)
+
+        if batch:
+            self._import_batch(batch, report)
+        if progress:
+            progress(report.rows, report.rows)
+        return report
+
+    def _near_duplicate_owner(self, index, mode, row_number, row, report):
+        # ** None imports the row as it is, False skips it, and an ID means merge the row into that question
+        if index is None:
+            return None
+        sig = signature(row[1])
+        matches = index.query(row[1], sig, exclude=row[0])
+        if not matches:
+            # ** Accepted rows join the index so later rows in the same file are checked against them too
+            index.add(row[0], row[1], sig)
+            return None
+        owner, score = matches[0]
+        if mode == "skip":
+            report.duplicate(row_number, row[0], "Question", f"{score:.0%} similar to {owner}: {index.texts[owner][:60]}")
+            return False
+        return owner
+
+    def _import_batch(self, batch, report):
+        owners = {}
+        conn = self._connect()
+        try:
+            for keys in _chunks([key for _, _, key, _ in batch]):
+                owners.update(conn.execute(
+                    f"SELECT text_key, question_id FROM questions WHERE text_key IN ({','.join('?' * len(keys))})", keys))
+        finally:
+            conn.close()
+
+        rows = []
+        for row_number, row, key, merged in batch:
+            owner = owners.get(key)
+            if owner is not None and owner != row[0]:
+                report.duplicate(row_number, row[0], "Question", f"Same question as {owner} already in the bank")
+            else:
+                rows.append(row)
+                report.merged += merged
+        added, updated = self.upsert_questions(rows)
+        report.added += added
+        report.updated += updated
+
+    def duplicate_index(self, threshold=DEFAULT_THRESHOLD, progress=None):
+        index = DuplicateIndex(threshold)
+        conn = self._connect()
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+            cursor = conn.execute("SELECT question_id, question FROM questions ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(SIGNATURE_BATCH)
+                if not rows:
+                    break
+                index.add_many(rows)
+                if progress:
+                    progress(len(index), total)
+        finally:
+            conn.close()
+        return index
+
+    def find_duplicates(self, threshold=DEFAULT_THRESHOLD, progress=None):
+        # ** Returns clusters of bank rows, largest first, each a list of (question_id, question)
+        index = self.duplicate_index(threshold, progress)
+        return [[(question_id, index.texts[question_id]) for question_id in sorted(cluster)]
+                for cluster in index.clusters()]
+
+    def migrate_workbook(self, workbook_path=None):
+        # ** One-time move of the old question_bank.xlsx into the database
+        workbook_path = workbook_path or getPath(LEGACY_WORKBOOK)
+        if self.count() or not os.path.exists(workbook_path):
+            return None
+        return self.import_file(workbook_path)
+
+    def _filters(self, search_query, question_type, tag):
+        # ** Returns (join, where, params, ranked) shared by the row and count queries
+        join, clauses, params = "", [], []
+        terms = search_terms(search_query)
+        if terms and self.fts:
+            join = f" JOIN (SELECT rowid, {FTS_RANK} AS score FROM questions_fts WHERE questions_fts MATCH ?) f" \
+                   " ON f.rowid = q.rowid"
+            params.append(fts_query(search_query))
+        elif terms:
+            for term in terms:
+                clauses.append("(q.question LIKE ? OR q.tags LIKE ? OR q.answer LIKE ? OR q.question_id IN "
+                               "(SELECT question_id FROM question_options WHERE option_text LIKE ?))")
+                params += [f"%{term}%"] * 4
+        if question_type:
+            clauses.append("q.question_type = ?")
+            params.append(question_type)
+        if tag and self._tag_is_common(tag):
+            # ** Walk the sort index and probe each row's tags, instead of sorting every tagged row first
+            clauses.append("EXISTS (SELECT 1 FROM question_tags t WHERE t.question_id = q.question_id AND t.tag = ?)")
+            params.append(tag)
+        elif tag:
+            clauses.append("q.question_id IN (SELECT question_id FROM question_tags WHERE tag = ?)")
+            params.append(tag)
+
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return join, where, params, bool(join)
+
+    def _tag_is_common(self, tag):
+        key = tag.casefold()
+        if key not in self._tag_shares:
+            conn = self._connect()
+            try:
+                tagged = conn.execute("SELECT COUNT(*) FROM question_tags WHERE tag = ?", (tag,)).fetchone()[0]
+                total = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+            finally:
+                conn.close()
+            self._tag_shares[key] = tagged * COMMON_TAG_SHARE >= total
+        return self._tag_shares[key]
+
+    def sort_keys(self, sort_by):
+        # ** sort_by is one SORT_KEYS name or a list of them, applied in order; unknown names are ignored
+        names = [sort_by] if isinstance(sort_by, str) else list(sort_by or ())
+        columns = [column for name in names for column in SORT_KEYS.get(name, ())]
+        if not columns:
+            return ()
+        return tuple(dict.fromkeys(columns + ["q.question_id"]))
+
+    def fetch_questions(self, search_query=None, sort_by=None, question_type=None, tag=None, limit=None, offset=0):
+        # ** Without an explicit sort, search results come back best match first
+        join, where, params, ranked = self._filters(search_query, question_type, tag)
+        columns = self.sort_keys(sort_by)
+        if not columns:
+            # ** rowid breaks ties so pages never overlap or skip rows
+            sql = SELECT_ROWS + join + where + f" ORDER BY {'f.score, ' if ranked else ''}q.rowid"
+            if limit is not None:
+                sql += " LIMIT ? OFFSET ?"
+                params += [limit, offset]
+            return self._fetch(sql, params)
+
+        # ** Start from the nearest page boundary already seen, so deep pages skip by index seek instead of OFFSET
+        cursors = self._cursor_cache((join, where, tuple(params), columns))
+        start = max((known for known in cursors if known <= offset), default=0)
+        if start:
+            where += (" AND " if where else " WHERE ") + \
+                f"({', '.join(columns)}) > ({', '.join('?' * len(columns))})"
+            params += cursors[start]
+        sql = SELECT_ROWS + join + where + f" ORDER BY {', '.join(columns)}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset - start]
+
+        rows = self._fetch(sql, params)
+        if rows and limit is not None:
+            cursors[offset + len(rows)] = tuple(CURSOR_FIELDS[column](rows[-1]) for column in columns)
+        return rows
+
+    def _cursor_cache(self, query):
+        if query not in self._cursors and len(self._cursors) >= CURSOR_QUERIES:
+            self._cursors.pop(next(iter(self._cursors)))
+        return self._cursors.setdefault(query, {})
+
+    def _fetch(self, sql, params):
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def count_questions(self, search_query=None, question_type=None, tag=None):
+        join, where, params, _ = self._filters(search_query, question_type, tag)
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM questions q" + join + where, params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def candidate_pool(self, question_types=None, exclude_recent_days=0):
+        # ** (question_id, type, marks, tags) tuples for paper assembly, leaving out recently used questions
+        clauses, params = [], []
+        if question_types:
+            clauses.append(f"question_type IN ({','.join('?' * len(question_types))})")
+            params += list(question_types)
+        if exclude_recent_days:
+            clauses.append("question_id NOT IN (SELECT question_id FROM question_usage WHERE used_at >= datetime('now', ?))")
+            params.append(f"-{int(exclude_recent_days)} days")
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self._fetch("SELECT question_id, question_type, marks, tags_key FROM questions" + where, params)
+        return [(question_id, q_type, marks, frozenset(tag.strip() for tag in tags.split(",") if tag.strip()))
+                for question_id, q_type, marks, tags in rows]
+
+    def fetch_by_ids(self, question_ids):
+        # ** Bank rows in the order the IDs were given; IDs no longer in the bank are dropped
+        rows = {}
+        for chunk in _chunks(list(question_ids)):
+            rows.update((row[0], row) for row in self._fetch(
+                SELECT_ROWS + f" WHERE q.question_id IN ({','.join('?' * len(chunk))})", chunk))
+        return [rows[question_id] for question_id in question_ids if question_id in rows]
+
+    def record_usage(self, question_ids):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT INTO question_usage (question_id) SELECT question_id FROM questions "
+                                 "WHERE question_id = ?", [(question_id,) for question_id in question_ids])
+        finally:
+            conn.close()
+
+    def delete_questions(self, question_ids):
+        conn = self._connect()
+        try:
+            with conn:
+                for question_id in question_ids:
+                    if self.fts:
+                        conn.execute("DELETE FROM questions_fts WHERE rowid = "
+                                     "(SELECT rowid FROM questions WHERE question_id = ?)", (question_id,))
+                    conn.execute("DELETE FROM questions WHERE question_id = ?", (question_id,))
+        finally:
+            conn.close()
+        self._cursors.clear()
+        self._tag_shares.clear()
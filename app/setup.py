@@ -5,6 +5,9 @@ base = "Win32GUI"
 
 build_exe_options = {
     "packages": ["os", "reportlab"],
+    # ** main.py imports its pages by name on first use, which the module finder cannot see
+    "includes": ["create_paper", "generate_pdf", "cloud_export", "excel_export", "admin_panel",
+                 "codex_formatter", "pdf_template"],
     "include_files": [("assets", "assets"), ("database", "database"), ("workspace", "workspace")],
 }
 
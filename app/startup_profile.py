@@ -0,0 +1,134 @@
+# ==========================================================
+#  * Module : startup_profile.py - Startup Import Timing
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      A built-in equivalent of `python -X importtime` for the
+#      frozen app, where interpreter flags cannot be passed.
+#      A meta path finder times every module as it executes,
+#      split into self time and cumulative time (children
+#      included), and named milestones record wall-clock
+#      points such as the login window appearing.
+#
+#      Enable with the BRAINY_PROFILE_STARTUP environment
+#      variable: "1" prints the report to stderr, any other
+#      value is taken as a file path to write it to.
+# ==========================================================
+
+import os
+import sys
+import threading
+import time
+
+PROFILE_ENV = "BRAINY_PROFILE_STARTUP"
+REPORT_LIMIT = 40
+
+_started = time.perf_counter()
+_profiler = None
+
+
+class _TimedLoader:
+    # ** Delegates everything to the real loader and only wraps module execution
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.leave(self._name)
+
+
+class ImportProfiler:
+    def __init__(self):
+        self.records = []
+        self.milestones = []
+        # ** Pre-warm imports run on a worker thread, so each thread keeps its own nesting
+        self._local = threading.local()
+
+    @property
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def find_spec(self, fullname, path=None, target=None):
+        # ** Ask the finders behind this one, then hand back the spec with a timed loader
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self, fullname)
+                return spec
+        return None
+
+    def enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self, name):
+        _, started, children = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.records.append((name, cumulative - children, cumulative, len(self._stack)))
+
+    def mark(self, label):
+        self.milestones.append((label, time.perf_counter() - _started))
+
+    def report(self, limit=REPORT_LIMIT):
+        lines = ["Brainy Studio startup profile", ""]
+        for label, at in self.milestones:
+            lines.append(f"  {at * 1000:9.1f} ms  {label}")
+
+        top_level = sum(cumulative for _, _, cumulative, depth in self.records if depth == 0)
+        lines += ["", f"{len(self.records)} modules imported, {top_level * 1000:.1f} ms in top-level imports", "",
+                  "import time:       self [us] |  cumulative | imported package"]
+        slowest = sorted(self.records, key=lambda record: record[2], reverse=True)[:limit]
+        for name, self_time, cumulative, depth in slowest:
+            lines.append(f"import time: {self_time * 1e6:12.0f} | {cumulative * 1e6:11.0f} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+def install():
+    global _profiler
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+    return _profiler
+
+
+def install_from_env():
+    if os.getenv(PROFILE_ENV):
+        install()
+
+
+def enabled():
+    return _profiler is not None
+
+
+def mark(label):
+    if _profiler is not None:
+        _profiler.mark(label)
+
+
+def write_report():
+    if _profiler is None:
+        return
+    target = os.getenv(PROFILE_ENV)
+    text = _profiler.report()
+    if target and target != "1":
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text, file=sys.stderr)
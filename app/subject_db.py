@@ -1,63 +1,10 @@
-import sqlite3
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 from utils import getPath, centerWindow
-from ui_components import PrimaryButton, ErrorButton, SearchButton, Colors
+from ui_components import PrimaryButton, ErrorButton, SearchButton, Colors, VirtualTreeview
+from subject_store import SubjectDBManager
 import sys
 
-class SubjectDBManager:
-    def __init__(self):
-        self.db_path = getPath(r"database\brainy-studio.db")
-
-    def get_subject_name(self, subject_code):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT subject_name FROM subjects WHERE subject_code = ?", (subject_code, ))
-        results = cursor.fetchone()
-        conn.close()
-        return results
-    
-    def get_instructions(self, subject_code):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT instructions FROM subjects WHERE subject_code = ?", (subject_code, ))
-        results = cursor.fetchone()
-        conn.close()
-        return results[0]
-
-
-    def fetch_data(self, search_query=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        if search_query:
-            cursor.execute("SELECT * FROM subjects WHERE subject_name LIKE ?", (f"%{search_query}%",))
-        else:
-            cursor.execute("SELECT subject_code, subject_name FROM subjects")
-        results = cursor.fetchall()
-        conn.close()
-        return results
-
-    def add_subject(self, subject_code, subject_name, instructions):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''INSERT INTO subjects (subject_code, subject_name, instructions) VALUES (?, ?, ?)''',
-                           (subject_code, subject_name, instructions))
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
-        finally:
-            cursor.close()
-            conn.close()
-
-    def delete_subject(self, subject_code):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM subjects WHERE subject_code = ?", (subject_code,))
-        conn.commit()
-        conn.close()
-
 class SubjectManagerUI(ctk.CTkToplevel):
     def __init__(self, parent, frame):
         super().__init__(parent)
@@ -103,15 +50,16 @@ class SubjectManagerUI(ctk.CTkToplevel):
                         fg_color="#1E293B",
                         font=("Arial", 14, "bold"))
         
-        self.scroll_frame = ctk.CTkScrollableFrame(self, fg_color="#1E293B", corner_radius=10)
-        self.scroll_frame.pack(pady=10, padx=10, fill="both", expand=True)
-
-        tree_frame = ctk.CTkFrame(self.scroll_frame)
+        tree_frame = ctk.CTkFrame(self, fg_color="#1E293B", corner_radius=10)
         tree_frame.pack(pady=10, padx=10, fill='both', expand=True)
-        
-        self.tree = ttk.Treeview(tree_frame, columns=("Code", "Name", "Instructions"), show="headings")
-        self.tree.heading("Code", text="Subject Code")
-        self.tree.heading("Name", text="Subject Name")
+
+        self.search_query = None
+        self.tree = VirtualTreeview(
+            tree_frame,
+            columns=[("Code", "Subject Code", 150, "w"), ("Name", "Subject Name", 250, "w"), ("Instructions", "", 300, "w")],
+            fetch=lambda offset, limit: self.db_manager.fetch_page(offset, limit, self.search_query),
+            count=lambda: self.db_manager.count_subjects(self.search_query)
+        )
         self.tree.pack(fill='both', expand=True, padx=10, pady=5)
         
         button_frame = ctk.CTkFrame(self, fg_color=Colors.PRIMARY)
@@ -124,23 +72,20 @@ class SubjectManagerUI(ctk.CTkToplevel):
         self.delete_button.pack(side='left', padx=5)
 
     def load_data(self):
-        self.tree.delete(*self.tree.get_children())
-        for row in self.db_manager.fetch_data():
-            self.tree.insert("", "end", values=row)
+        self.search_query = None
+        self.tree.refresh()
     
     def search_subjects(self):
-        query = self.search_entry.get()
-        self.tree.delete(*self.tree.get_children())
-        for row in self.db_manager.fetch_data(query):
-            self.tree.insert("", "end", values=row)
+        self.search_query = self.search_entry.get()
+        self.tree.refresh()
     
     def delete_selected(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
+        selected_rows = self.tree.selected_rows()
+        if not selected_rows:
             messagebox.showwarning("Warning", "No subject selected!")
             return
         
-        subject_code = self.tree.item(selected_item, "values")[0]
+        subject_code = selected_rows[0][0]
         self.db_manager.delete_subject(subject_code)
         self.load_data()
         self.parent_frame.get_subject_codes()
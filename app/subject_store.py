@@ -0,0 +1,72 @@
+import sqlite3
+from utils import getPath
+
+class SubjectDBManager:
+    def __init__(self):
+        self.db_path = getPath(r"database\brainy-studio.db")
+
+    def get_subject_name(self, subject_code):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT subject_name FROM subjects WHERE subject_code = ?", (subject_code, ))
+        results = cursor.fetchone()
+        conn.close()
+        return results
+    
+    def get_instructions(self, subject_code):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT instructions FROM subjects WHERE subject_code = ?", (subject_code, ))
+        results = cursor.fetchone()
+        conn.close()
+        return results[0]
+
+
+    def fetch_data(self, search_query=None):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        if search_query:
+            cursor.execute("SELECT * FROM subjects WHERE subject_name LIKE ?", (f"%{search_query}%",))
+        else:
+            cursor.execute("SELECT subject_code, subject_name FROM subjects")
+        results = cursor.fetchall()
+        conn.close()
+        return results
+
+    def count_subjects(self, search_query=None):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM subjects WHERE subject_name LIKE ?", (f"%{search_query or ''}%",))
+        results = cursor.fetchone()[0]
+        conn.close()
+        return results
+
+    def fetch_page(self, offset, limit, search_query=None):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT subject_code, subject_name, instructions FROM subjects WHERE subject_name LIKE ? "
+                       "ORDER BY subject_code LIMIT ? OFFSET ?", (f"%{search_query or ''}%", limit, offset))
+        results = cursor.fetchall()
+        conn.close()
+        return results
+
+    def add_subject(self, subject_code, subject_name, instructions):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''INSERT INTO subjects (subject_code, subject_name, instructions) VALUES (?, ?, ?)''',
+                           (subject_code, subject_name, instructions))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+    def delete_subject(self, subject_code):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM subjects WHERE subject_code = ?", (subject_code,))
+        conn.commit()
+        conn.close()
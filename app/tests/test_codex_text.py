@@ -0,0 +1,55 @@
+# ==========================================================
+#  * Module : tests/test_codex_text.py - Codex Notation Tests
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      What parse() typesets, and the prose it must leave as
+#      typed. Run from app/ with: python -m pytest tests
+# ==========================================================
+
+import pytest
+from codex_text import parse, plain_text
+
+
+def _word(text):
+    paragraph, = parse(text)
+    word, = paragraph
+    return word
+
+
+@pytest.mark.parametrize("text, nodes", [
+    ("x^2", (("run", "x", 0), ("run", "2", 1))),
+    ("a_1", (("run", "a", 0), ("run", "1", -1))),
+    ("x_{ij}", (("run", "x", 0), ("run", "ij", -1))),
+    ("x_(ij)", (("run", "x", 0), ("run", "ij", -1))),
+    ("H2O", (("run", "H", 0), ("run", "2", -1), ("run", "O", 0))),
+    ("CO2", (("run", "CO", 0), ("run", "2", -1))),
+    ("CH3COOH", (("run", "CH", 0), ("run", "3", -1), ("run", "COOH", 0))),
+    ("Fe2(SO4)3", (("run", "Fe", 0), ("run", "2", -1), ("run", "(SO", 0), ("run", "4", -1),
+                   ("run", ")", 0), ("run", "3", -1))),
+    ("3/4", (("frac", (("run", "3", 0),), (("run", "4", 0),)),)),
+    ("(x+1)/(x-1)", (("frac", (("run", "x+1", 0),), (("run", "x-1", 0),)),)),
+    ("d/dx", (("frac", (("run", "d", 0),), (("run", "dx", 0),)),)),
+    ("matrix((1,2),(3,4))", (("fence", "matrix", (((("run", "1", 0),), (("run", "2", 0),)),
+                                                  ((("run", "3", 0),), (("run", "4", 0),)))),)),
+])
+def test_notation_is_typeset(text, nodes):
+    assert _word(text) == nodes
+
+
+@pytest.mark.parametrize("text", [
+    "snake_case_name",
+    "file_name.txt",
+    "a_b@x.com",
+    "my_var",
+    "Support is 24/7",
+    "B2B sales",
+    "H1N1 virus",
+    "POP3 and IMAP",
+    "Speed in m/s",
+    "Answer T/F",
+    "Vitamin B12",
+    "R = 1/273.16",
+])
+def test_prose_is_left_as_typed(text):
+    assert plain_text(text) == text
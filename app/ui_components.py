@@ -1,4 +1,7 @@
 import customtkinter as ctk
+from collections import OrderedDict
+from tkinter import ttk
+from utils import centerWindow
 
 class Colors:
 
@@ -172,3 +175,285 @@ class SearchButton(ctk.CTkButton):
             font=("DejaVuSansCondensed-Bold", 14, "bold"),
             **kwargs
         )
+
+
+class ProgressDialog(ctk.CTkToplevel):
+    SHOW_DELAY_MS = 250
+
+    def __init__(self, parent, title="Please wait", message="Working...", on_cancel=None):
+        super().__init__(parent)
+        self.withdraw()
+        self.title(title)
+        self.geometry(centerWindow(parent, 420, 170, self._get_window_scaling()))
+        self.resizable(False, False)
+        self.configure(fg_color=Colors.BACKGROUND)
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.on_cancel = on_cancel
+        self.closed = False
+
+        self.message_label = ctk.CTkLabel(self, text=message, font=("Segoe UI", 14),
+                                          text_color=Colors.Texts.HEADERS)
+        self.message_label.pack(pady=(20, 10), padx=20)
+
+        self.progress_bar = ctk.CTkProgressBar(self, width=360, mode="indeterminate",
+                                               progress_color=Colors.HIGHLIGHT)
+        self.progress_bar.pack(pady=5, padx=20)
+        self.progress_bar.start()
+
+        self.cancel_btn = ErrorButton(self, text="Cancel", width=120, height=36, command=self.cancel)
+        self.cancel_btn.pack(pady=(15, 10))
+
+        # ** Quick jobs finish before the dialog shows, so it never flashes on screen
+        self.after(self.SHOW_DELAY_MS, self._show)
+
+    def _show(self):
+        if not self.closed:
+            self.deiconify()
+            self.attributes("-topmost", True)
+
+    def update_progress(self, done, total=None):
+        if self.closed or not total:
+            return
+        if self.progress_bar.cget("mode") != "determinate":
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate")
+        self.progress_bar.set(min(done / total, 1.0))
+
+    def cancel(self):
+        if self.closed:
+            return
+        self.message_label.configure(text="Cancelling...")
+        self.cancel_btn.configure(state="disabled")
+        if self.on_cancel:
+            self.on_cancel()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.progress_bar.stop()
+        self.destroy()
+
+
+class VirtualTreeview(ctk.CTkFrame):
+    # ** Only the rows on screen exist as Treeview items; the rest are paged in from fetch() on scroll
+    CACHE_PAGES = 8
+    WHEEL_ROWS = 3
+
+    def __init__(self, master, columns, fetch, count, page_size=200, key_column=0, **kwargs):
+        # ** columns are (name, heading, width, anchor); fetch(offset, limit) returns rows in that order
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.fetch = fetch
+        self.count = count
+        self.page_size = page_size
+        self.key_column = key_column
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = 1
+        self._pages = OrderedDict()
+        self._shown = {}
+        self._selected = {}
+
+        names = [column[0] for column in columns]
+        self.tree = ttk.Treeview(self, columns=names, show="headings", selectmode="extended")
+        for name, heading, width, anchor in columns:
+            self.tree.heading(name, text=heading, anchor=anchor)
+            self.tree.column(name, width=width, anchor=anchor)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Button-1>", self._on_click, add="+")
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-self.WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(self.WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible_rows) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible_rows) or "break")
+
+    def refresh(self, keep_selection=False, keep_position=False):
+        self.total = self.count()
+        self._pages.clear()
+        if not keep_selection:
+            self._selected.clear()
+        self.scroll_to(self.offset if keep_position else 0)
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(int(offset), self.total - self.visible_rows))
+        self._render()
+
+    def row(self, index):
+        page, slot = divmod(index, self.page_size)
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self.fetch(page * self.page_size, self.page_size)
+            self._pages[page] = rows
+            if len(self._pages) > self.CACHE_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return rows[slot] if slot < len(rows) else None
+
+    def selected_rows(self):
+        return list(self._selected.values())
+
+    def deselect(self, keys):
+        for key in keys:
+            self._selected.pop(key, None)
+
+    def select_all(self):
+        self._selected = {row[self.key_column]: row for row in self.fetch(0, self.total)}
+        self._render()
+
+    def _render(self):
+        items = self.tree.get_children()
+        wanted = max(0, min(self.visible_rows, self.total - self.offset))
+        for iid in items[wanted:]:
+            self.tree.delete(iid)
+        for i in range(len(items), wanted):
+            self.tree.insert("", "end", iid=str(i))
+
+        self._shown = {}
+        reselect = []
+        for i in range(wanted):
+            row = self.row(self.offset + i)
+            iid = str(i)
+            self.tree.item(iid, values=row if row is not None else ())
+            if row is not None:
+                self._shown[iid] = row
+                if row[self.key_column] in self._selected:
+                    reselect.append(iid)
+        self.tree.selection_set(reselect)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self.total <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / self.total, (self.offset + self.visible_rows) / self.total)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(value) * self.total)
+        elif action == "scroll":
+            self.scroll(int(value) * (self.visible_rows if unit == "pages" else 1))
+
+    def _on_wheel(self, event):
+        # ** Windows reports multiples of 120 per notch, macOS reports small raw deltas
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-notches * self.WHEEL_ROWS)
+        return "break"
+
+    def _on_arrow(self, step):
+        focus = self.tree.focus()
+        edge = "0" if step < 0 else str(len(self.tree.get_children()) - 1)
+        if focus != edge:
+            return None
+        self.scroll(step)
+        self.tree.focus(edge)
+        self.tree.selection_set(edge)
+        return "break"
+
+    def _on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        first = self.tree.bbox("0") if self.tree.exists("0") else None
+        heading = first[1] if first else row_height
+        rows = max(1, (event.height - heading) // row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.scroll_to(self.offset)
+
+    def _on_click(self, event):
+        # ** A plain click starts a new selection, including rows scrolled out of view
+        if not event.state & 0x0005:
+            self._selected.clear()
+
+    def _on_select(self, event=None):
+        selected = set(self.tree.selection())
+        for iid, row in self._shown.items():
+            key = row[self.key_column]
+            if iid in selected:
+                self._selected[key] = row
+            else:
+                self._selected.pop(key, None)
+
+
+class SearchController:
+    # ** Waits for typing to pause before searching; each keystroke cancels the query still waiting
+    DELAY_MS = 200
+
+    def __init__(self, entry, on_search, delay=DELAY_MS):
+        self.entry = entry
+        self.on_search = on_search
+        self.delay = delay
+        self.query = None
+        self._pending = None
+        entry.bind("<KeyRelease>", self._on_key, add="+")
+        entry.bind("<Return>", lambda e: self.flush(), add="+")
+
+    def _on_key(self, event=None):
+        self.cancel()
+        self._pending = self.entry.after(self.delay, self._run)
+
+    def cancel(self):
+        if self._pending is not None:
+            self.entry.after_cancel(self._pending)
+            self._pending = None
+
+    def flush(self, force=False):
+        self.cancel()
+        self._run(force)
+
+    def _run(self, force=False):
+        self._pending = None
+        query = self.entry.get().strip().lower()
+        # ** Arrow keys and modifiers fire key events too; only a changed query is worth a search
+        if query == self.query and not force:
+            return
+        self.query = query
+        self.on_search(query)
+
+
+class BatchBuilder:
+    # ** Runs build(item) a batch per event-loop turn, so long widget builds keep the window responsive
+    BATCH_SIZE = 15
+
+    def __init__(self, parent, items, build, on_done=None, batch_size=BATCH_SIZE, title="Please wait", message="Working..."):
+        self.parent = parent
+        self.items = list(items)
+        self.build = build
+        self.on_done = on_done
+        self.batch_size = batch_size
+        self.position = 0
+        self.cancelled = False
+        self.dialog = ProgressDialog(parent, title=title, message=message, on_cancel=self.cancel)
+        parent.after(0, self._run_batch)
+
+    def cancel(self):
+        # ** Items already built stay; the rest are dropped
+        self.cancelled = True
+
+    def _run_batch(self):
+        if self.cancelled or self.position >= len(self.items) or not self.parent.winfo_exists():
+            self._finish()
+            return
+        for item in self.items[self.position:self.position + self.batch_size]:
+            self.build(item)
+        self.position = min(self.position + self.batch_size, len(self.items))
+        self.dialog.update_progress(self.position, len(self.items))
+        self.parent.after(1, self._run_batch)
+
+    def _finish(self):
+        if self.dialog.winfo_exists():
+            self.dialog.close()
+        if self.on_done and self.parent.winfo_exists():
+            self.on_done(self.position)
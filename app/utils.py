@@ -15,13 +15,16 @@
 #  & CustomTkinter Docs (https://customtkinter.tomschimansky.com/)
 # ==========================================================
 
-import customtkinter as ctk
-from typing import Tuple
+from typing import Tuple, TYPE_CHECKING
 import os
 import sys
 
+if TYPE_CHECKING:
+    # ** Only needed for the annotation; keeps getPath importable on headless machines
+    import customtkinter as ctk
 
-def centerWindow(parent: ctk.CTk, width: int, height: int, scale_factor: float = 1.0, variation: Tuple[int, int] = (0, 0)):
+
+def centerWindow(parent: "ctk.CTk", width: int, height: int, scale_factor: float = 1.0, variation: Tuple[int, int] = (0, 0)):
     # ! Credits | References : StakeOverFlow
     screen_width = parent.winfo_screenwidth()
     screen_height = parent.winfo_screenheight()
@@ -46,8 +49,11 @@ def getPath(*args):
         base_path = sys._MEIPASS if hasattr(sys, '_MEIPASS') else os.path.dirname(sys.executable)
     else:
         base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    return os.path.join(base_path, *args)
+
+    # ** Paths are written Windows style throughout the app; map them for other platforms
+    if os.sep != "\\":
+        args = [arg.replace("\\", os.sep) for arg in args]
+    return os.path.normpath(os.path.join(base_path, *args))
 
 
 
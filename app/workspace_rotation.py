@@ -0,0 +1,180 @@
+# ==========================================================
+#  * Module : workspace_rotation.py - Workspace Passcode Rotation
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Re-encrypts every .enc paper under a workspace folder,
+#      either with a new passcode or with the current key
+#      derivation settings. Papers are spread over a process
+#      pool so key derivation runs on every core. Each paper is
+#      written atomically by write_paper, so an interrupted run
+#      leaves every file either fully old or fully new; running
+#      again picks up where it stopped.
+#
+#      Usage:
+#        python workspace_rotation.py "workspace/Bhatt Akshat"
+#        python workspace_rotation.py <folder> --rotate --report report.json
+# ==========================================================
+
+import argparse
+import getpass
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from brainy_core.crypto import (CIPHER_AES_GCM, KDF_NAMES, InvalidPasscode, calibrate_kdf, default_kdf,
+                                iter_workspace_papers, load_kdf_settings, load_questions, read_header,
+                                validate_kdf, verify_passcode, write_paper)
+
+STATUS_ROTATED = "rotated"
+STATUS_UNCHANGED = "unchanged"
+STATUS_ALREADY_ROTATED = "already rotated"
+STATUS_FAILED = "failed"
+
+
+class RotationReport:
+    def __init__(self, folder, kdf, new_passcode):
+        self.folder = folder
+        self.kdf = kdf
+        self.new_passcode = new_passcode
+        self.results = []
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.elapsed = 0.0
+
+    def add(self, path, status, detail="", seconds=0.0):
+        self.results.append({"path": path, "status": status, "detail": detail, "seconds": round(seconds, 3)})
+
+    def counts(self):
+        counts = {STATUS_ROTATED: 0, STATUS_UNCHANGED: 0, STATUS_ALREADY_ROTATED: 0, STATUS_FAILED: 0}
+        for result in self.results:
+            counts[result["status"]] += 1
+        return counts
+
+    @property
+    def failures(self):
+        return [result for result in self.results if result["status"] == STATUS_FAILED]
+
+    def summary(self):
+        counts = self.counts()
+        lines = [
+            f"Workspace: {self.folder}",
+            f"Papers found: {len(self.results)} in {self.elapsed:.1f}s",
+            f"Rotated: {counts[STATUS_ROTATED]}",
+            f"Already up to date: {counts[STATUS_UNCHANGED] + counts[STATUS_ALREADY_ROTATED]}",
+            f"Failed: {counts[STATUS_FAILED]}",
+        ]
+        for failure in self.failures:
+            lines.append(f"  - {os.path.relpath(failure['path'], self.folder)}: {failure['detail']}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "folder": self.folder,
+            "started_at": self.started_at,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "kdf": {"name": KDF_NAMES[self.kdf.kdf], "cost": self.kdf.cost,
+                    "memory": self.kdf.memory, "lanes": self.kdf.lanes},
+            "new_passcode": self.new_passcode,
+            "counts": self.counts(),
+            "papers": self.results,
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+
+def _rotate_paper(path, password, new_password, kdf):
+    started = time.perf_counter()
+    try:
+        header = read_header(path)
+        if new_password is None and header is not None and header.cipher == CIPHER_AES_GCM \
+                and header.kdf_params == kdf:
+            return path, STATUS_UNCHANGED, "", time.perf_counter() - started
+
+        try:
+            questions = load_questions(path, password)
+        except InvalidPasscode:
+            # ** A previous run that was cut short may have already moved this paper over
+            if new_password and verify_passcode(path, new_password):
+                return path, STATUS_ALREADY_ROTATED, "", time.perf_counter() - started
+            raise
+
+        write_paper(path, questions, new_password or password, kdf=kdf)
+        return path, STATUS_ROTATED, "", time.perf_counter() - started
+    except (OSError, ValueError) as e:
+        return path, STATUS_FAILED, str(e) or type(e).__name__, time.perf_counter() - started
+
+
+def rotate_workspace(folder, password, new_password=None, kdf=None, workers=None, progress=None):
+    # ! Worker processes do not share this process's settings, so resolve the parameters here
+    kdf = validate_kdf(kdf or default_kdf())
+    report = RotationReport(folder, kdf, new_password is not None)
+    papers = list(iter_workspace_papers(folder))
+    started = time.perf_counter()
+
+    if progress:
+        progress(0, len(papers))
+    if papers:
+        executor = ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(papers)))
+        try:
+            futures = [executor.submit(_rotate_paper, path, password, new_password, kdf) for path in papers]
+            for done, future in enumerate(as_completed(futures), start=1):
+                report.add(*future.result())
+                if progress:
+                    progress(done, len(papers))
+        finally:
+            # ** Papers already being written finish cleanly; queued ones are dropped on cancel
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    report.results.sort(key=lambda result: result["path"])
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _kdf_from_args(args):
+    if args.kdf == "calibrated":
+        return load_kdf_settings(args.kdf_settings) or default_kdf()
+    kdf = {name: kdf for kdf, name in KDF_NAMES.items()}[args.kdf]
+    return calibrate_kdf(kdf, args.target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-encrypt every paper in a Brainy Studio workspace.")
+    parser.add_argument("folder", help="workspace folder to walk")
+    parser.add_argument("--rotate", action="store_true", help="prompt for a new passcode and switch every paper to it")
+    parser.add_argument("--kdf", default="calibrated", choices=["calibrated"] + list(KDF_NAMES.values()),
+                        help="key derivation for the rewritten papers (default: this machine's saved settings)")
+    parser.add_argument("--target", type=float, default=0.5, help="derivation time in seconds when calibrating --kdf")
+    parser.add_argument("--kdf-settings", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "kdf.json"),
+                        help="saved calibration to use with --kdf calibrated")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--report", help="also write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        parser.error(f"{args.folder} is not a folder")
+
+    password = getpass.getpass("Current passcode: ")
+    new_password = None
+    if args.rotate:
+        new_password = getpass.getpass("New passcode: ")
+        if new_password != getpass.getpass("Repeat new passcode: "):
+            print("Passcodes do not match.", file=sys.stderr)
+            return 2
+
+    def show_progress(done, total):
+        print(f"\r{done}/{total} papers", end="", flush=True)
+
+    report = rotate_workspace(args.folder, password, new_password, _kdf_from_args(args), args.workers, show_progress)
+    print()
+    print(report.summary())
+    if args.report:
+        report.save(args.report)
+        print(f"Report written to {args.report}")
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# ==========================================================
+#  * Module : workspace_watcher.py - Workspace File Watcher
+#  * Project : Brainy Studio - Question Paper Generator
+#  * License : MIT License
+#  * Description:
+#      Refreshes the recent projects list when papers are
+#      added to or removed from the user's workspace. Kept out
+#      of main.py so watchdog is only imported after login.
+# ==========================================================
+
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+import threading
+import os
+
+
+class WorkspaceEventHandler(FileSystemEventHandler):
+    def __init__(self, app, observer):
+        self.app = app
+        self.observer = observer
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.app.after(0, self.app.load_recent_projects)
+
+    def on_deleted(self, event):
+        workspace_path = self.app.user_manager.user[3]
+
+        if not os.path.exists(workspace_path):
+            self.observer.stop()
+        else:
+            self.app.after(0, self.app.load_recent_projects)
+
+    def on_modified(self, event):
+        pass
+
+
+def watch_workspace(app, user):
+    workspace_path = user[3]
+
+    if not os.path.exists(workspace_path):
+        return
+
+    observer = Observer()
+    event_handler = WorkspaceEventHandler(app, observer)
+    observer.schedule(event_handler, workspace_path, recursive=True)
+    observer.start()
+
+    def run_observer():
+        try:
+            observer.join()
+        except KeyboardInterrupt:
+            observer.stop()
+
+    thread = threading.Thread(target=run_observer, daemon=True)
+    thread.start()